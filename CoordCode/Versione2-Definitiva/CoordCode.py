@@ -6,12 +6,18 @@
 #  --------------------
 #  L'applicazione consente di:
 #   • Inserire punti 3D (X,Y,Z), proiettarli sul piano immagine (u,v) con il modello pinhole
-#     (u = f*X/Z + cx,  v = f*Y/Z + cy).
+#     (u = f*X/Z + cx,  v = f*Y/Z + cy), dopo averli portati nel riferimento camera con la posa
+#     (R, t) impostabile dall'utente.
 #   • Visualizzare sia la vista 2D (piano immagine) sia la vista 3D (piano dei punti 3D),
 #     con zoom e pan tramite toolbar di Matplotlib.
-#   • Collegare i punti automaticamente in ordine (con opzione “chiudi poligono”).
-#   • Aggiungere “spigoli manuali” tra qualunque coppia di punti (i, j).
-#   • Esportare e importare dati da/verso file .txt con struttura leggibile in italiano.
+#   • Collegare i punti automaticamente in ordine (con opzione “chiudi poligono”) o con grafi
+#     calcolati sui punti 3D (k vicini, raggio, reticolo dell'inviluppo convesso).
+#   • Nascondere nella vista 2D i punti e i tratti di linea coperti dalle facce della mesh
+#     (o dell'inviluppo convesso dei punti), con un buffer di profondità.
+#   • Aggiungere “spigoli manuali” tra qualunque coppia di punti (i, j), anche cliccando i due
+#     punti nelle viste (il punto o lo spigolo sotto il mouse viene evidenziato).
+#   • Esportare e importare dati da/verso file .txt con struttura leggibile in italiano e
+#     importare mesh e nuvole di punti (Wavefront OBJ, PLY ascii/binario, XYZ/CSV).
 #
 #  ORGANIZZAZIONE DEL CODICE
 #  -------------------------
@@ -22,31 +28,91 @@
 #       - conferma_cx_cy          : validazione Cx,Cy e transizione alla pagina 2.
 #       - mostra_pagina2 / costruisci_pagina2
 #                                : seconda pagina (inserimento punti, tabella, grafici e opzioni).
-#       - proietta_punto          : calcolo (u,v) dal punto 3D (X,Y,Z).
+#       - proietta_punto          : calcolo (u,v) dal punto 3D (X,Y,Z) (wrapper di proietta_punti).
 #       - aggiungi_punto          : parsing input X,Y,Z, proiezione e aggiornamento UI.
 #       - aggiungi_spigolo        : aggiunge collegamento manuale (i,j).
 #       - annulla_spigolo         : rimuove l’ultimo collegamento manuale.
 #       - svuota_spigoli          : cancella tutti i collegamenti manuali.
+#       - genera_spigoli_automatici
+#                                : collega in blocco i punti (k vicini, raggio, inviluppo convesso).
 #       - coord_polilinea         : utilità per ottenere lista di punti con eventuale chiusura.
+#       - segmenti_spigoli        : segmenti degli spigoli manuali (per le LineCollection 2D/3D).
+#       - buffer_profondita       : z-buffer delle facce (in cache) per nascondere linee e punti coperti.
 #       - ridisegna_corrente      : dispatch verso ridisegna_2d o ridisegna_3d.
+#       - configura_cursori_intrinseci / al_movimento_cursore / applica_intrinseci_cursori
+#                                : cursori f, cx, cy con riproiezione dal vivo (aggiornamenti fusi a ~30 FPS).
+#       - applica_posa / applica_distorsione / imposta_camera
+#                                : impostano posa (R, t) e distorsione della camera e riproiettano i punti.
+#       - inizializza_artisti_2d  : crea gli artisti persistenti della vista 2D.
+#       - al_draw_2d / aggiorna_canvas_2d
+#                                : rendering 2D in blitting (sfondo statico + artisti dinamici).
+#       - aggiorna_etichette_2d / aggiorna_etichette_3d
+#                                : etichette con level-of-detail, ricalcolate su zoom/pan/rotazione.
 #       - ridisegna_2d / ridisegna_3d
-#                                : aggiornano rispettivamente vista 2D/3D (punti, etichette, linee).
+#                                : aggiornano rispettivamente vista 2D (in place) e 3D (punti, etichette, linee).
 #       - autoscale_2d / autoscale_3d
 #                                : adattano i limiti degli assi con margine.
+#       - indici_vista / bersaglio_picking
+#                                : indici spaziali a griglia (in pixel) per il picking di punti e spigoli.
+#       - al_movimento_mouse / al_rilascio_mouse / annulla_selezione
+#                                : evidenziazione al passaggio e collegamento di due punti con due clic.
 #       - mostra_vista_2d / mostra_vista_3d / cambia_vista
 #                                : gestione dello switch di vista e toolbar.
 #       - reset_totale            : pulizia completa di punti, spigoli e tabella.
-#       - esporta_txt             : salvataggio su file .txt (formato descrittivo in italiano).
+#       - esporta_txt             : salvataggio su file .txt (anche .gz/.zst) in un thread separato.
+#       - esegui_in_background    : esegue import/export in un thread con avanzamento in etichetta_stato.
+#       - annulla_operazione      : interrompe il lavoro in background in corso.
 #       - importa_txt             : carica da file .txt (camera, punti e spigoli) e ridisegna le viste.
+#       - esporta_binario / importa_binario
+#                                : salvataggio/caricamento (memory-mapped) nel formato binario .ccb.
+#       - importa_mesh            : carica vertici, spigoli e facce da .obj, .ply (anche binario) o .xyz/.csv.
+#       - calibra_da_file         : stima f, cx, cy (e posa) dalle corrispondenze di un .txt (DLT + LM).
+#       - stima_posa_da_file      : stima la posa a intrinseci correnti (PnP con RANSAC).
+#       - triangola_da_file       : ricostruisce i punti 3D da più viste (.txt) con camere diverse.
+#       - applica_scena           : sostituisce la scena corrente e aggiorna tabella e viste.
+#       - righe_tabella           : righe formattate della finestra visibile della tabella virtuale.
+#   • Classe TabellaVirtuale: Treeview a righe virtuali (solo le righe visibili esistono in Tk).
+#   • Il modello dati (Camera, Scena), la proiezione vettoriale e l'I/O .txt sono nel modulo
+#     CoordCodeCore, importabile senza Tkinter/Matplotlib; calibrazione e altri problemi inversi
+#     sono in CoordCodeGeometria, la generazione automatica degli spigoli in CoordCodeSpigoli,
+#     il buffer di profondità e il disegno di immagini senza Matplotlib in CoordCodeRaster.
+#   • Con argomenti da riga di comando, main() avvia la modalità batch di CoordCodeBatch.
 # =============================================================================
 
 import math
+import os
+import queue
+import sys
+import threading
 import tkinter as tk
+from dataclasses import replace
 from tkinter import ttk, messagebox, filedialog
 
+from matplotlib.collections import LineCollection
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import numpy as np
 from mpl_toolkits.mplot3d import Axes3D  # noqa: F401  # necessario per attivare il backend 3D
+from mpl_toolkits.mplot3d import proj3d
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+from CoordCodeCore import (
+    ArchivioPunti,
+    Camera,
+    IndiceGriglia,
+    IndiceSegmenti,
+    Scena,
+    leggi_binario,
+    leggi_corrispondenze,
+    leggi_mesh,
+    leggi_txt,
+    scrivi_binario,
+    scrivi_txt,
+    seleziona_etichette,
+)
+from CoordCodeGeometria import calibra, risolvi_pnp, triangola_viste
+from CoordCodeRaster import RISOLUZIONE_PROFONDITA, RISOLUZIONE_PROFONDITA_DAL_VIVO, BufferProfondita
+from CoordCodeSpigoli import K_VICINI, inviluppo_convesso, spigoli_inviluppo, spigoli_knn, spigoli_raggio
 
 TITOLO_APP = "CoordCode"
 DESCRIZIONE_APP = (
@@ -54,6 +120,113 @@ DESCRIZIONE_APP = (
     "a piano immagine (modello pinhole)."
 )
 
+# Level-of-detail delle etichette: al più una per cella della griglia in pixel, fino al budget
+CELLA_ETICHETTE_PX = 28
+BUDGET_ETICHETTE = 200
+
+# Lavori in background: frequenza di controllo della coda (~60 Hz)
+INTERVALLO_CONTROLLO_MS = 16
+
+# Cursori degli intrinseci: al più un ridisegno ogni 33 ms (~30 FPS); le etichette tornano
+# quando il cursore resta fermo per ATTESA_FINE_CURSORE_MS
+INTERVALLO_CURSORI_MS = 33
+ATTESA_FINE_CURSORE_MS = 200
+# Punti disegnati durante il trascinamento (sottocampionamento uniforme): i marker Agg costano ~2 µs l'uno
+BUDGET_PUNTI_DAL_VIVO = 10_000
+
+# Picking con il mouse: raggio di cattura (pixel) e spostamento massimo perché un rilascio valga come clic
+RAGGIO_PICKING_PX = 8
+TOLLERANZA_CLIC_PX = 4
+
+# Spigoli automatici: metodi proposti e limite di coppie per il grafo di raggio
+METODI_SPIGOLI = ("k vicini", "raggio", "inviluppo convesso")
+SPIGOLI_RAGGIO_MASSIMI = 5_000_000
+
+
+class OperazioneAnnullata(Exception):
+    """Sollevata dalla callback di avanzamento quando l'utente annulla un lavoro in background."""
+
+
+class TabellaVirtuale(tk.Frame):
+    """Tabella a righe virtuali: Treeview con un pool fisso di righe + scrollbar.
+
+    Il Treeview contiene solo le righe visibili; scorrere cambia `primo` (indice della prima
+    riga mostrata) e riscrive i valori del pool chiedendo a `fornitore(inizio, fine)` le sole
+    righe della finestra. Il costo di aggiornamento dipende dall'altezza, non dal numero di righe.
+    """
+
+    def __init__(self, master, colonne: tuple[str, ...], conteggio, fornitore, **opzioni) -> None:
+        super().__init__(master, **opzioni)
+        self.conteggio = conteggio          # () -> numero totale di righe
+        self.fornitore = fornitore          # (inizio, fine) -> lista di tuple di valori
+        self.primo = 0
+        self.righe: list[str] = []          # id degli item del pool, dall'alto in basso
+
+        self.albero = ttk.Treeview(self, columns=colonne, show="headings", height=16, selectmode="none")
+        for c in colonne:
+            self.albero.heading(c, text=c)
+            self.albero.column(c, anchor="center", width=60 if c == "#" else 90)
+        self.barra = ttk.Scrollbar(self, orient="vertical", command=self.scorri)
+        self.barra.pack(side="right", fill="y")
+        self.albero.pack(side="left", fill="both", expand=True)
+
+        self.albero.bind("<Configure>", lambda _e: self.aggiorna())
+        self.albero.bind("<MouseWheel>", lambda e: self.sposta(-1 if e.delta > 0 else 1, "units"))
+        self.albero.bind("<Button-4>", lambda _e: self.sposta(-1, "units"))
+        self.albero.bind("<Button-5>", lambda _e: self.sposta(1, "units"))
+
+    def righe_visibili(self) -> int:
+        """Righe che entrano nell'altezza attuale del widget (intestazione esclusa)."""
+        altezza_riga = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        altezza = self.albero.winfo_height()
+        if altezza <= 1:  # widget non ancora mappato
+            return int(self.albero.cget("height"))
+        return max(1, altezza // altezza_riga - 1)
+
+    def scorri(self, azione: str, quantita: str, unita: str | None = None) -> None:
+        """Callback della scrollbar: ("moveto", frazione) oppure ("scroll", n, "units"/"pages")."""
+        if azione == "moveto":
+            self.primo = int(float(quantita) * self.conteggio())
+            self.aggiorna()
+        else:
+            self.sposta(int(quantita), unita)
+
+    def sposta(self, n: int, unita: str) -> None:
+        """Scorre di `n` righe ("units") o pagine ("pages")."""
+        self.primo += n * (self.righe_visibili() if unita == "pages" else 1)
+        self.aggiorna()
+
+    def aggiorna(self) -> None:
+        """Riallinea pool di righe, valori e scrollbar a `primo` e al conteggio corrente."""
+        totale = self.conteggio()
+        visibili = self.righe_visibili()
+        self.primo = max(0, min(self.primo, totale - visibili))
+
+        valori = self.fornitore(self.primo, min(self.primo + visibili, totale))
+        # Il pool cresce/cala solo quando cambia l'altezza o ci sono meno righe che spazio
+        while len(self.righe) < len(valori):
+            self.righe.append(self.albero.insert("", "end"))
+        if len(self.righe) > len(valori):
+            self.albero.delete(*self.righe[len(valori):])
+            del self.righe[len(valori):]
+        for item, riga in zip(self.righe, valori):
+            self.albero.item(item, values=riga)
+
+        if totale:
+            self.barra.set(self.primo / totale, (self.primo + len(valori)) / totale)
+        else:
+            self.barra.set(0.0, 1.0)
+
+    def mostra_ultima(self) -> None:
+        """Scorre in fondo (es. dopo l'inserimento di un nuovo punto)."""
+        self.primo = self.conteggio()
+        self.aggiorna()
+
+    def vai_in_cima(self) -> None:
+        """Torna alla prima riga (es. dopo un import o un reset)."""
+        self.primo = 0
+        self.aggiorna()
+
 
 class ApplicazioneCoordCode:
     """Controller principale dell'applicazione.
@@ -76,33 +249,65 @@ class ApplicazioneCoordCode:
         self.radice.minsize(980, 560)
         self.radice.option_add("*Font", ("Segoe UI", 11))
 
-        # Parametri intrinseci della camera (f, cx, cy)
+        # Focale inserita in pagina 1 (in attesa di Cx,Cy)
         self.focale: float | None = None
-        self.cx: float | None = None
-        self.cy: float | None = None
 
-        # Dataset principale
-        self.punti_3d: list[tuple[float, float, float]] = []   # lista di (X,Y,Z)
-        self.punti_2d: list[tuple[float, float]] = []          # lista di (u,v) proiettati
-        self.spigoli_manuali: list[tuple[int, int]] = []       # lista di (i,j) 1-based
+        # Dataset principale: camera, punti 3D/2D e spigoli manuali (creato in conferma_cx_cy)
+        self.scena: Scena | None = None
 
         # Stato di visualizzazione
         self.collega_in_ordine_var = tk.BooleanVar(value=False)   # collega in ordine di inserimento
         self.chiudi_poligono_var = tk.BooleanVar(value=False)     # collega anche ultimo->primo
         self.mostra_spigoli_manuali_var = tk.BooleanVar(value=True)
+        self.nascondi_linee_var = tk.BooleanVar(value=False)      # linee e punti coperti dalle facce
         self.modalita_vista = tk.StringVar(value="2D")            # "2D" oppure "3D"
 
         # Variabili/UI condivise
         self.var_intrinseci_testo = tk.StringVar()
         self.var_punto = tk.StringVar()
         self.var_spigolo = tk.StringVar()
+        self.var_metodo_spigoli = tk.StringVar(value=METODI_SPIGOLI[0])
+        self.var_parametro_spigoli = tk.StringVar(value=str(K_VICINI))
+        self.var_posa = tk.StringVar()
+        self.var_distorsione = tk.StringVar()
         self.etichetta_stato: tk.Label | None = None
-        self.albero_punti: ttk.Treeview | None = None
+        self.pulsante_annulla: ttk.Button | None = None
+        self.tabella_punti: TabellaVirtuale | None = None
+
+        # Lavoro in background in corso (None se inattivo)
+        self.annullamento: threading.Event | None = None
+
+        # Cursori degli intrinseci (pagina 2): valori, widget e ridisegni pianificati
+        self.var_f = tk.DoubleVar()
+        self.var_cx = tk.DoubleVar()
+        self.var_cy = tk.DoubleVar()
+        self.cursori_intrinseci: dict[str, tk.Scale] = {}
+        self.aggiornamento_cursori_pianificato = False
+        self.fine_cursore_id: str | None = None
 
         # Oggetti Matplotlib (inizializzati in costruisci_pagina2)
         self.figura_2d = self.assi_2d = self.canvas_2d = self.widget_canvas_2d = self.toolbar_2d = None
+        # Artisti persistenti della vista 2D (aggiornati in place da ridisegna_2d)
+        self.artista_principale_2d = self.artista_punti_2d = self.artista_polilinea_2d = None
+        self.etichette_2d: list = []            # pool di Annotation (al più BUDGET_ETICHETTE)
+        self.etichette_3d: list = []            # Text 3D attualmente visibili
+        self.ridisegno_in_corso = False         # sospende le callback di zoom/pan durante i ridisegni
+        self.sfondo_2d = None                   # parte statica della figura 2D (assi, griglia, legenda) per il blitting
+        self.sfondo_dati_2d = None              # sfondo statico + dati, per ridisegnare solo l'evidenziazione
+        self.collezione_spigoli_2d: LineCollection | None = None  # tutti gli spigoli manuali in un solo artista
+        # Linee nascoste: (chiave, BufferProfondita) e (chiave, facce dell'inviluppo) dell'ultimo calcolo
+        self.profondita_2d: tuple | None = None
+        self.facce_inviluppo: tuple | None = None
         self.figura_3d = self.assi_3d = self.canvas_3d = self.widget_canvas_3d = self.toolbar_3d = None
 
+        # Picking: indici spaziali per vista ("2D"/"3D"), ricostruiti quando cambiano vista o dati
+        self.indici_picking: dict[str, dict] = {}
+        self.evidenziato: tuple[str, int] | None = None     # ("punto", k) o ("spigolo", e) sotto il mouse
+        self.punto_selezionato: int | None = None           # primo estremo (0-based) del collegamento con clic
+        self.pressione_mouse: tuple[float, float] | None = None
+        self.artista_evidenziato_2d = self.artista_spigolo_evidenziato_2d = self.artista_selezionato_2d = None
+        self.artista_evidenziato_3d = self.artista_spigolo_evidenziato_3d = self.artista_selezionato_3d = None
+
         # Contenitori-pagina
         self.pagina1 = tk.Frame(self.radice)
         self.pagina2 = tk.Frame(self.radice)
@@ -176,11 +381,15 @@ class ApplicazioneCoordCode:
             messagebox.showerror("Formato non corretto", "Usa Cx,Cy (es. 320,240).")
             return
         try:
-            self.cx, self.cy = float(parti[0]), float(parti[1])
+            cx, cy = float(parti[0]), float(parti[1])
         except Exception:
             messagebox.showerror("Valori non validi", "Cx e Cy devono essere numerici.")
             return
 
+        self.scena = Scena(Camera(self.focale, cx, cy))
+        self.var_posa.set(self.testo_posa(self.scena.camera))
+        self.var_distorsione.set(",".join(f"{k:.6g}" for k in self.scena.camera.distorsione))
+
         self.mostra_pagina2()
 
     def mostra_pagina2(self) -> None:
@@ -206,7 +415,7 @@ class ApplicazioneCoordCode:
         tk.Label(sinistra, text="Inserimento punti 3D", font=("Segoe UI Semibold", 14)).pack(anchor="w")
 
         # Stringa dinamica con gli intrinseci correnti
-        self.var_intrinseci_testo.set(f"f={self.focale:.4g}, cx={self.cx:.4g}, cy={self.cy:.4g}")
+        self.var_intrinseci_testo.set(self.scena.camera.descrizione())
         tk.Label(sinistra, textvariable=self.var_intrinseci_testo, fg="#666").pack(anchor="w", pady=(0, 8))
 
         tk.Label(
@@ -227,19 +436,56 @@ class ApplicazioneCoordCode:
         ingresso_punto.bind("<Return>", self.aggiungi_punto)
         ttk.Button(riga, text="Aggiungi", command=self.aggiungi_punto).pack(side="left", padx=(8, 0))
 
-        # Tabella dei punti
-        colonne = ("#", "X", "Y", "Z", "u", "v")
-        self.albero_punti = ttk.Treeview(sinistra, columns=colonne, show="headings", height=16)
-        for c in colonne:
-            self.albero_punti.heading(c, text=c)
-            self.albero_punti.column(c, anchor="center", width=60 if c == "#" else 90)
-        self.albero_punti.pack(fill="both", expand=True, pady=(10, 6))
+        # Cursori degli intrinseci: riproiezione e ridisegno 2D in tempo reale
+        intrinseci_box = tk.LabelFrame(sinistra, text="Intrinseci (modifica dal vivo)", padx=8, pady=2)
+        intrinseci_box.pack(fill="x", pady=(4, 0))
+        intrinseci_box.columnconfigure(1, weight=1)
+        for riga_cursore, (nome, variabile) in enumerate((("f", self.var_f), ("cx", self.var_cx), ("cy", self.var_cy))):
+            tk.Label(intrinseci_box, text=nome).grid(row=riga_cursore, column=0, sticky="w", padx=(0, 8))
+            cursore = tk.Scale(
+                intrinseci_box, variable=variabile, orient="horizontal", showvalue=True,
+                command=self.al_movimento_cursore, highlightthickness=0,
+            )
+            cursore.grid(row=riga_cursore, column=1, sticky="ew")
+            self.cursori_intrinseci[nome] = cursore
+        self.configura_cursori_intrinseci()
+
+        # Posa della camera (estrinseci): rotazione in gradi e traslazione
+        riga_posa = tk.Frame(intrinseci_box)
+        riga_posa.grid(row=3, column=0, columnspan=2, sticky="w", pady=(2, 4))
+        tk.Label(riga_posa, text="Posa (rx,ry,rz,tx,ty,tz):").pack(side="left")
+        ingresso_posa = tk.Entry(riga_posa, textvariable=self.var_posa, width=28)
+        ingresso_posa.pack(side="left", padx=(8, 0))
+        ingresso_posa.bind("<Return>", self.applica_posa)
+        ttk.Button(riga_posa, text="Applica", command=self.applica_posa).pack(side="left", padx=(8, 0))
+
+        # Distorsione dell'obiettivo (Brown–Conrady)
+        riga_distorsione = tk.Frame(intrinseci_box)
+        riga_distorsione.grid(row=4, column=0, columnspan=2, sticky="w", pady=(0, 4))
+        tk.Label(riga_distorsione, text="Distorsione (k1,k2,p1,p2,k3):").pack(side="left")
+        ingresso_distorsione = tk.Entry(riga_distorsione, textvariable=self.var_distorsione, width=24)
+        ingresso_distorsione.pack(side="left", padx=(8, 0))
+        ingresso_distorsione.bind("<Return>", self.applica_distorsione)
+        ttk.Button(riga_distorsione, text="Applica", command=self.applica_distorsione).pack(side="left", padx=(8, 0))
+
+        # Tabella dei punti (virtuale: materializza solo le righe visibili)
+        self.tabella_punti = TabellaVirtuale(
+            sinistra, ("#", "X", "Y", "Z", "u", "v"),
+            conteggio=lambda: len(self.scena), fornitore=self.righe_tabella,
+        )
+        self.tabella_punti.pack(fill="both", expand=True, pady=(10, 6))
 
         # Utility: esporta/importa/reset
         strumenti = tk.Frame(sinistra)
         strumenti.pack(fill="x", pady=(2, 0))
         ttk.Button(strumenti, text="Esporta txt…", command=self.esporta_txt).pack(side="left")
         ttk.Button(strumenti, text="Importa txt…", command=self.importa_txt).pack(side="left", padx=(6, 0))
+        ttk.Button(strumenti, text="Esporta .ccb…", command=self.esporta_binario).pack(side="left", padx=(12, 0))
+        ttk.Button(strumenti, text="Importa .ccb…", command=self.importa_binario).pack(side="left", padx=(6, 0))
+        ttk.Button(strumenti, text="Importa mesh…", command=self.importa_mesh).pack(side="left", padx=(6, 0))
+        ttk.Button(strumenti, text="Calibra da file…", command=self.calibra_da_file).pack(side="left", padx=(12, 0))
+        ttk.Button(strumenti, text="Stima posa da file…", command=self.stima_posa_da_file).pack(side="left", padx=(6, 0))
+        ttk.Button(strumenti, text="Triangola da file…", command=self.triangola_da_file).pack(side="left", padx=(6, 0))
         ttk.Button(strumenti, text="Reset", command=self.reset_totale).pack(side="right")
 
         # ------------------ COLONNA DESTRA (grafici + opzioni) ------------------
@@ -273,6 +519,10 @@ class ApplicazioneCoordCode:
             opzioni_linee, text="Mostra spigoli manuali", variable=self.mostra_spigoli_manuali_var,
             command=lambda: self.ridisegna_corrente(autoscale=False)
         ).pack(side="left", padx=(12, 0))
+        ttk.Checkbutton(
+            opzioni_linee, text="Nascondi linee nascoste", variable=self.nascondi_linee_var,
+            command=lambda: self.ridisegna_corrente(autoscale=False)
+        ).pack(side="left", padx=(12, 0))
 
         # Pannello per collegamenti manuali
         spigoli_box = tk.LabelFrame(destra, text="Collega punti (manuale)", padx=8, pady=6)
@@ -285,6 +535,18 @@ class ApplicazioneCoordCode:
         ttk.Button(spigoli_box, text="Annulla ultimo", command=self.annulla_spigolo).pack(side="left", padx=(6, 0))
         ttk.Button(spigoli_box, text="Svuota spigoli", command=self.svuota_spigoli).pack(side="left", padx=(6, 0))
 
+        # Pannello per collegamenti automatici (grafi sui punti 3D)
+        automatici_box = tk.LabelFrame(destra, text="Collega punti (automatico)", padx=8, pady=6)
+        automatici_box.pack(fill="x", pady=(0, 8))
+        ttk.Combobox(
+            automatici_box, textvariable=self.var_metodo_spigoli, values=METODI_SPIGOLI, state="readonly", width=18
+        ).pack(side="left")
+        tk.Label(automatici_box, text="k o raggio:").pack(side="left", padx=(8, 0))
+        ingresso_parametro = tk.Entry(automatici_box, textvariable=self.var_parametro_spigoli, width=10)
+        ingresso_parametro.pack(side="left", padx=(8, 0))
+        ingresso_parametro.bind("<Return>", self.genera_spigoli_automatici)
+        ttk.Button(automatici_box, text="Genera", command=self.genera_spigoli_automatici).pack(side="left", padx=(8, 0))
+
         # Contenitore per le due canvas (2D e 3D)
         contenitore_plot = tk.Frame(destra)
         contenitore_plot.pack(fill="both", expand=True)
@@ -295,13 +557,18 @@ class ApplicazioneCoordCode:
         self.assi_2d.set_xlabel("u (pixel)")
         self.assi_2d.set_ylabel("v (pixel)")
         self.assi_2d.grid(True, alpha=0.25)
-        self.assi_2d.plot(self.cx, self.cy, marker="+", markersize=12, linestyle="None", label="Principal point")
-        self.assi_2d.legend(loc="best")
+        self.inizializza_artisti_2d()
 
         self.canvas_2d = FigureCanvasTkAgg(self.figura_2d, master=contenitore_plot)
         self.widget_canvas_2d = self.canvas_2d.get_tk_widget()
         self.toolbar_2d = NavigationToolbar2Tk(self.canvas_2d, destra)
         self.toolbar_2d.update()
+        # Le etichette visibili dipendono da zoom/pan e dimensione della finestra
+        self.assi_2d.callbacks.connect("xlim_changed", self.al_cambio_vista_2d)
+        self.assi_2d.callbacks.connect("ylim_changed", self.al_cambio_vista_2d)
+        self.canvas_2d.mpl_connect("resize_event", self.al_cambio_vista_2d)
+        # Dopo ogni draw completo si salva lo sfondo statico per gli aggiornamenti in blitting
+        self.canvas_2d.mpl_connect("draw_event", self.al_draw_2d)
 
         # ----- VISTA 3D -----
         self.figura_3d = Figure(figsize=(5, 4), dpi=100)
@@ -319,13 +586,28 @@ class ApplicazioneCoordCode:
         self.widget_canvas_3d = self.canvas_3d.get_tk_widget()
         self.toolbar_3d = NavigationToolbar2Tk(self.canvas_3d, destra)
         self.toolbar_3d.update()
+        # Rotazione (rilascio del mouse), zoom con rotella/toolbar e resize cambiano le etichette visibili
+        self.canvas_3d.mpl_connect("button_release_event", self.al_cambio_vista_3d)
+        self.canvas_3d.mpl_connect("scroll_event", self.al_cambio_vista_3d)
+        self.canvas_3d.mpl_connect("resize_event", self.al_cambio_vista_3d)
+
+        # Picking con il mouse in entrambe le viste: evidenziazione al passaggio e collegamento con clic
+        for canvas in (self.canvas_2d, self.canvas_3d):
+            canvas.mpl_connect("motion_notify_event", self.al_movimento_mouse)
+            canvas.mpl_connect("button_press_event", self.al_pressione_mouse)
+            canvas.mpl_connect("button_release_event", self.al_rilascio_mouse)
+        self.radice.bind("<Escape>", self.annulla_selezione)
 
         # Avvio sulla vista 2D
         self.mostra_vista_2d()
 
-        # Barra di stato in basso
-        self.etichetta_stato = tk.Label(frame, text="", anchor="w", fg="#555")
-        self.etichetta_stato.grid(row=1, column=0, columnspan=2, sticky="ew", padx=12, pady=(0, 8))
+        # Barra di stato in basso (con annullamento dei lavori in background)
+        barra_stato = tk.Frame(frame)
+        barra_stato.grid(row=1, column=0, columnspan=2, sticky="ew", padx=12, pady=(0, 8))
+        self.etichetta_stato = tk.Label(barra_stato, text="", anchor="w", fg="#555")
+        self.etichetta_stato.pack(side="left", fill="x", expand=True)
+        self.pulsante_annulla = ttk.Button(barra_stato, text="Annulla", command=self.annulla_operazione, state="disabled")
+        self.pulsante_annulla.pack(side="right")
 
     # ------------------------------------------------------------------ #
     # LOGICA DATI: PROIEZIONE E INSERIMENTO
@@ -336,11 +618,7 @@ class ApplicazioneCoordCode:
         Raises:
             ValueError: se z <= 0 (punto dietro il piano dell'immagine / dietro la camera).
         """
-        if z <= 0:
-            raise ValueError("Z deve essere > 0 (il punto deve trovarsi davanti alla camera).")
-        u = self.focale * (x / z) + self.cx
-        v = self.focale * (y / z) + self.cy
-        return u, v
+        return self.scena.proietta_punto(x, y, z)
 
     def aggiungi_punto(self, _evento=None) -> None:
         """Parsa l'input 'X,Y,Z', calcola (u,v), aggiorna tabella e ridisegna le viste."""
@@ -356,18 +634,16 @@ class ApplicazioneCoordCode:
             messagebox.showerror("Valori non validi", "X, Y, Z devono essere numerici.")
             return
 
-        # Proiezione (u,v)
+        # Proiezione (u,v) e aggiornamento dataset
         try:
-            u, v = self.proietta_punto(x, y, z)
+            u, v = self.scena.aggiungi_punto(x, y, z)
         except Exception as e:
             messagebox.showerror("Proiezione non valida", str(e))
             return
 
-        # Aggiorna dataset e tabella
-        self.punti_3d.append((x, y, z))
-        self.punti_2d.append((u, v))
-        indice = len(self.punti_2d)
-        self.albero_punti.insert("", "end", values=(indice, f"{x:.6g}", f"{y:.6g}", f"{z:.6g}", f"{u:.4f}", f"{v:.4f}"))
+        # Aggiorna tabella
+        indice = len(self.scena)
+        self.tabella_punti.mostra_ultima()
 
         # Pulizia input e refresh
         self.var_punto.set("")
@@ -379,7 +655,7 @@ class ApplicazioneCoordCode:
     # ------------------------------------------------------------------ #
     def aggiungi_spigolo(self, _evento=None) -> None:
         """Aggiunge un collegamento manuale tra due indici (i,j) 1-based."""
-        if len(self.punti_2d) < 2:
+        if len(self.scena) < 2:
             messagebox.showinfo("Pochi punti", "Inserisci almeno due punti prima di collegarli.")
             return
 
@@ -394,58 +670,105 @@ class ApplicazioneCoordCode:
             return
 
         i, j = map(int, parti)
-        n = len(self.punti_2d)
-        if not (1 <= i <= n and 1 <= j <= n):
-            messagebox.showerror("Indici non validi", f"Gli indici devono essere tra 1 e {n}.")
-            return
-        if i == j:
-            messagebox.showerror("Indici identici", "Scegli due punti diversi.")
-            return
-
-        chiave = (min(i, j), max(i, j))  # spigolo non orientato (evita duplicati)
-        if chiave in self.spigoli_manuali:
-            messagebox.showinfo("Già presente", f"Lo spigolo {i}-{j} è già stato aggiunto.")
+        try:
+            self.scena.aggiungi_spigolo(i, j)
+        except ValueError as e:
+            messagebox.showerror("Spigolo non valido", str(e))
             return
 
-        self.spigoli_manuali.append(chiave)
         self.var_spigolo.set("")
         self.etichetta_stato.configure(text=f"Collegati i punti {i} e {j}.")
         self.ridisegna_corrente(autoscale=False)
 
     def annulla_spigolo(self) -> None:
         """Elimina l'ultimo spigolo manuale inserito (se presente)."""
-        if not self.spigoli_manuali:
+        ultimo = self.scena.annulla_spigolo()
+        if ultimo is None:
             messagebox.showinfo("Nessuno spigolo", "Non ci sono spigoli manuali da annullare.")
             return
-        ultimo = self.spigoli_manuali.pop()
         self.etichetta_stato.configure(text=f"Rimosso ultimo spigolo {ultimo[0]}-{ultimo[1]}.")
         self.ridisegna_corrente(autoscale=False)
 
     def svuota_spigoli(self) -> None:
         """Cancella tutti gli spigoli manuali."""
-        if not self.spigoli_manuali:
+        if not self.scena.spigoli_manuali:
             return
-        self.spigoli_manuali.clear()
+        self.scena.svuota_spigoli()
         self.etichetta_stato.configure(text="Spigoli manuali svuotati.")
         self.ridisegna_corrente(autoscale=False)
 
+    def genera_spigoli_automatici(self, _evento=None) -> None:
+        """Collega in blocco i punti con il grafo dei k vicini, di raggio o con l'inviluppo convesso.
+
+        Il calcolo (indice spaziale a griglia sui punti 3D) gira in background; gli spigoli
+        trovati si aggiungono agli spigoli manuali in un'unica operazione (i presenti restano).
+        """
+        punti = self.scena.punti_3d.array.copy()
+        if len(punti) < 2:
+            messagebox.showinfo("Pochi punti", "Inserisci almeno due punti prima di collegarli.")
+            return
+
+        metodo = self.var_metodo_spigoli.get()
+        testo = self.var_parametro_spigoli.get().strip()
+        try:
+            if metodo == "k vicini":
+                k = int(testo)
+                if k < 1:
+                    raise ValueError
+
+                def lavoro(avanzamento):
+                    return spigoli_knn(punti, k, avanzamento)
+            elif metodo == "raggio":
+                raggio = float(testo)
+                if not raggio > 0:
+                    raise ValueError
+
+                def lavoro(avanzamento):
+                    return spigoli_raggio(punti, raggio, SPIGOLI_RAGGIO_MASSIMI, avanzamento)
+            else:
+                def lavoro(avanzamento):
+                    return spigoli_inviluppo(punti, avanzamento)
+        except ValueError:
+            messagebox.showerror(
+                "Parametro non valido", "Per \"k vicini\" indica un intero ≥ 1, per \"raggio\" un numero > 0."
+            )
+            return
+        scena = self.scena
+
+        def al_termine(coppie, errore: Exception | None) -> None:
+            if errore is not None:
+                self.etichetta_stato.configure(text="Generazione degli spigoli non riuscita.")
+                messagebox.showerror("Errore negli spigoli automatici", str(errore))
+                return
+            if scena is not self.scena:
+                self.etichetta_stato.configure(text="Spigoli automatici scartati: la scena è cambiata.")
+                return
+            aggiunti = scena.aggiungi_spigoli(coppie + 1)
+            self.mostra_spigoli_manuali_var.set(True)
+            self.etichetta_stato.configure(
+                text=f"Spigoli automatici ({metodo}): {len(coppie)} calcolati, {aggiunti} nuovi."
+            )
+            self.ridisegna_corrente(autoscale=False)
+
+        self.esegui_in_background(lavoro, al_termine, "Spigoli automatici")
+
     # ------------------------------------------------------------------ #
     # RENDERING E UTILITY GRAFICHE
     # ------------------------------------------------------------------ #
     @staticmethod
-    def coord_polilinea(coordinate: list, chiudi: bool) -> list:
-        """Ritorna una copia della lista `coordinate`, eventualmente chiusa (append del primo).
+    def coord_polilinea(coordinate: np.ndarray, chiudi: bool) -> np.ndarray:
+        """Ritorna l'array `coordinate`, eventualmente chiuso (riga del primo punto in coda).
 
         Args:
-            coordinate: lista di punti 2D o 3D (tuples).
+            coordinate: array Nx2 o Nx3 di punti.
             chiudi: se True e ci sono ≥3 punti, aggiunge coordinate[0] in coda.
 
         Returns:
-            list: lista di coordinate pronta da plottare come polilinea.
+            np.ndarray: coordinate pronte da plottare come polilinea.
         """
-        if not coordinate:
-            return []
-        return list(coordinate) + [coordinate[0]] if (chiudi and len(coordinate) >= 3) else list(coordinate)
+        if chiudi and len(coordinate) >= 3:
+            return np.concatenate((coordinate, coordinate[:1]))
+        return coordinate
 
     def ridisegna_corrente(self, autoscale: bool = False) -> None:
         """Redraw dispatcher: chiama ridisegna_2d o ridisegna_3d in base alla vista selezionata."""
@@ -454,48 +777,362 @@ class ApplicazioneCoordCode:
         else:
             self.ridisegna_3d(autoscale=autoscale)
 
-    def ridisegna_2d(self, autoscale: bool = False) -> None:
-        """Aggiorna completamente la vista 2D (assi, punti, etichette, collegamenti)."""
+    def configura_cursori_intrinseci(self) -> None:
+        """Centra gli intervalli dei cursori sugli intrinseci correnti della scena e ne imposta i valori."""
+        cam = self.scena.camera
+        ampiezza = max(abs(cam.cx), abs(cam.cy), cam.focale, 100.0)
+        intervalli = {
+            "f": (max(1.0, cam.focale / 5), cam.focale * 5, cam.focale),
+            "cx": (cam.cx - ampiezza, cam.cx + ampiezza, cam.cx),
+            "cy": (cam.cy - ampiezza, cam.cy + ampiezza, cam.cy),
+        }
+        for nome, variabile in (("f", self.var_f), ("cx", self.var_cx), ("cy", self.var_cy)):
+            minimo, massimo, valore = intervalli[nome]
+            # resolution=0: nessun arrotondamento, il valore impostato coincide con la camera
+            self.cursori_intrinseci[nome].configure(from_=minimo, to=massimo, resolution=0)
+            variabile.set(valore)
+
+    def al_movimento_cursore(self, _valore=None) -> None:
+        """Callback dei cursori: pianifica un solo aggiornamento per frame (gli eventi si fondono)."""
+        if not self.aggiornamento_cursori_pianificato:
+            self.aggiornamento_cursori_pianificato = True
+            self.radice.after(INTERVALLO_CURSORI_MS, self.applica_intrinseci_cursori)
+
+    def applica_intrinseci_cursori(self) -> None:
+        """Applica alla scena i valori correnti dei cursori e aggiorna la vista 2D in blitting.
+
+        Durante il trascinamento le etichette sono nascoste (sono parte dello sfondo statico e
+        costringerebbero a un draw completo a ogni frame) e i punti oltre BUDGET_PUNTI_DAL_VIVO
+        sono sottocampionati; la vista completa torna quando il cursore si ferma.
+        """
+        self.aggiornamento_cursori_pianificato = False
+        cam = self.scena.camera
+        nuova = replace(cam, focale=self.var_f.get(), cx=self.var_cx.get(), cy=self.var_cy.get())
+        if nuova == cam or not nuova.focale > 0:
+            return  # es. valori impostati da configura_cursori_intrinseci
+
+        self.scena.camera = nuova  # le proiezioni (u,v) sono ricalcolate in blocco dalla cache
+        self.var_intrinseci_testo.set(nuova.descrizione())
+        self.tabella_punti.aggiorna()
+        if self.modalita_vista.get() == "2D":
+            self.ridisegna_2d(dal_vivo=True)
+
+        if self.fine_cursore_id is not None:
+            self.radice.after_cancel(self.fine_cursore_id)
+        self.fine_cursore_id = self.radice.after(ATTESA_FINE_CURSORE_MS, self.fine_movimento_cursore)
+
+    def fine_movimento_cursore(self) -> None:
+        """Cursore fermo: ridisegno completo con le etichette."""
+        self.fine_cursore_id = None
+        self.etichetta_stato.configure(text=f"Intrinseci aggiornati: {self.scena.camera.descrizione()}")
+        self.ridisegna_corrente(autoscale=False)
+
+    @staticmethod
+    def testo_posa(camera: Camera) -> str:
+        """Posa della camera nel formato del campo di input: 'rx,ry,rz,tx,ty,tz'."""
+        return ",".join(f"{v:.6g}" for v in (*camera.rotazione, *camera.traslazione))
+
+    def applica_posa(self, _evento=None) -> None:
+        """Parsa 'rx,ry,rz,tx,ty,tz', imposta la posa della camera e riproietta tutti i punti.
+
+        La posa è rifiutata se porta qualche punto dietro la camera (Z <= 0 nel riferimento camera).
+        """
+        parti = [p.strip() for p in self.var_posa.get().strip().split(",")]
+        if len(parti) != 6:
+            messagebox.showerror("Formato non corretto", "Usa rx,ry,rz,tx,ty,tz (angoli in gradi, es. 0,10,0,0,0,0).")
+            return
+        try:
+            valori = [float(p) for p in parti]
+            assert all(map(math.isfinite, valori))
+        except Exception:
+            messagebox.showerror("Valori non validi", "Rotazione e traslazione devono essere numeriche.")
+            return
+
+        nuova = replace(self.scena.camera, rotazione=tuple(valori[:3]), traslazione=tuple(valori[3:]))
+        _, valido = nuova.proietta(self.scena.punti_3d.array)
+        if not valido.all():
+            messagebox.showerror(
+                "Posa non valida",
+                f"Con questa posa {int((~valido).sum())} punti avrebbero Z <= 0 (dietro la camera).",
+            )
+            return
+        self.imposta_camera(nuova, "Posa aggiornata")
+
+    def applica_distorsione(self, _evento=None) -> None:
+        """Parsa 'k1,k2,p1,p2,k3' e imposta la distorsione dell'obiettivo (tutti zero = pinhole ideale)."""
+        parti = [p.strip() for p in self.var_distorsione.get().strip().split(",")]
+        if len(parti) != 5:
+            messagebox.showerror("Formato non corretto", "Usa k1,k2,p1,p2,k3 (es. -0.2,0.05,0,0,0).")
+            return
+        try:
+            valori = tuple(float(p) for p in parti)
+            assert all(map(math.isfinite, valori))
+        except Exception:
+            messagebox.showerror("Valori non validi", "I coefficienti di distorsione devono essere numerici.")
+            return
+        self.imposta_camera(replace(self.scena.camera, distorsione=valori), "Distorsione aggiornata")
+
+    def imposta_camera(self, camera: Camera, messaggio: str) -> None:
+        """Sostituisce la camera della scena (proiezioni dalla cache) e aggiorna campi, tabella e viste."""
+        self.scena.camera = camera
+        self.aggiorna_campi_camera()
+        self.tabella_punti.aggiorna()
+        self.etichetta_stato.configure(text=f"{messaggio}: {camera.descrizione()}")
+        self.ridisegna_corrente(autoscale=True)
+
+    def inizializza_artisti_2d(self) -> None:
+        """Crea una sola volta gli artisti della vista 2D, poi aggiornati in place da ridisegna_2d."""
         assi = self.assi_2d
-        assi.clear()
-        assi.set_xlabel("u (pixel)")
-        assi.set_ylabel("v (pixel)")
-        assi.grid(True, alpha=0.25)
+        (self.artista_principale_2d,) = assi.plot(
+            [], [], marker="+", markersize=12, linestyle="None", color="C0", label="Principal point"
+        )
+        (self.artista_punti_2d,) = assi.plot([], [], "o", linestyle="None", color="C1", zorder=3)
+        (self.artista_polilinea_2d,) = assi.plot([], [], "-", linewidth=1.8, color="C2", zorder=2)
+        self.etichette_2d = []
+        self.sfondo_dati_2d = None
+        self.collezione_spigoli_2d = LineCollection([], linestyles="--", linewidths=1.8, colors="C3", zorder=2)
+        assi.add_collection(self.collezione_spigoli_2d, autolim=False)
+        (self.artista_spigolo_evidenziato_2d,) = assi.plot([], [], "-", linewidth=4, color="C3", alpha=0.5, zorder=4)
+        (self.artista_evidenziato_2d,) = assi.plot(
+            [], [], "o", markersize=14, markerfacecolor="none", markeredgecolor="C3", markeredgewidth=2, zorder=5
+        )
+        (self.artista_selezionato_2d,) = assi.plot([], [], "o", markersize=10, color="C3", zorder=5)
+        # Posizione fissa: "best" ricalcolerebbe la posizione scandendo tutti i punti a ogni draw
+        assi.legend(loc="upper right")
+        self.sfondo_2d = None
+
+        # Gli artisti dinamici sono "animated": esclusi dal draw della figura, li disegna al_draw_2d
+        for artista in self.artisti_dinamici_2d() + self.artisti_evidenziazione_2d():
+            artista.set_animated(True)
+
+    def artisti_dinamici_2d(self) -> list:
+        """Artisti della vista 2D che cambiano con i dati, nell'ordine di disegno (zorder)."""
+        artisti = [self.artista_principale_2d, self.artista_punti_2d, self.artista_polilinea_2d,
+                   self.collezione_spigoli_2d]
+        return sorted(artisti, key=lambda a: a.get_zorder())
+
+    def artisti_evidenziazione_2d(self) -> list:
+        """Artisti del picking (sopra ai dati): cambiano col mouse, non con i dati."""
+        return [self.artista_spigolo_evidenziato_2d, self.artista_evidenziato_2d, self.artista_selezionato_2d]
+
+    def al_draw_2d(self, evento) -> None:
+        """Callback del draw completo: salva lo sfondo statico e vi disegna sopra gli artisti dinamici.
+
+        Viene eseguita anche per i salvataggi da toolbar (renderer diverso), così i dati non
+        mancano mai nell'immagine esportata.
+        """
+        if evento.canvas is self.canvas_2d:
+            self.sfondo_2d = self.canvas_2d.copy_from_bbox(self.figura_2d.bbox)
+        for artista in self.artisti_dinamici_2d():
+            artista.draw(evento.renderer)
+        # L'evidenziazione del picking non finisce nelle immagini salvate dalla toolbar
+        if evento.canvas is self.canvas_2d:
+            self.sfondo_dati_2d = self.canvas_2d.copy_from_bbox(self.figura_2d.bbox)
+            for artista in self.artisti_evidenziazione_2d():
+                artista.draw(evento.renderer)
+
+    def aggiorna_canvas_2d(self, completo: bool = False, solo_evidenziazione: bool = False) -> None:
+        """Aggiorna lo schermo: in blitting (sfondo salvato + artisti dinamici) se possibile,
+        altrimenti con un draw completo (limiti cambiati, resize o sfondo non ancora disponibile).
+
+        Con `solo_evidenziazione` (movimento del mouse) si riparte dallo sfondo che contiene già
+        i dati e si ridisegnano solo gli artisti del picking: il costo non dipende da N.
+        """
+        sfondo = self.sfondo_2d
+        estensione = tuple(int(round(c)) for c in self.figura_2d.bbox.extents)
+        if completo or sfondo is None or sfondo.get_extents() != estensione:
+            self.canvas_2d.draw_idle()
+            return
+
+        if solo_evidenziazione and self.sfondo_dati_2d is not None:
+            self.canvas_2d.restore_region(self.sfondo_dati_2d)
+        else:
+            self.canvas_2d.restore_region(sfondo)
+            for artista in self.artisti_dinamici_2d():
+                self.assi_2d.draw_artist(artista)
+            self.sfondo_dati_2d = self.canvas_2d.copy_from_bbox(self.figura_2d.bbox)
+        for artista in self.artisti_evidenziazione_2d():
+            self.assi_2d.draw_artist(artista)
+        self.canvas_2d.blit(self.figura_2d.bbox)
+
+    def aggiorna_etichette_2d(self) -> bool:
+        """Mostra le etichette numeriche scelte da `seleziona_etichette` per lo zoom corrente.
+
+        Gli artisti sono un pool riutilizzato: si modificano solo testo/posizione di quelli
+        cambiati e i rimanenti vengono nascosti, quindi il costo non dipende dal numero di punti.
+        Le etichette fanno parte dello sfondo statico (il testo è costoso da ridisegnare).
+
+        Returns:
+            bool: True se almeno un'etichetta è cambiata (lo sfondo salvato non è più valido).
+        """
+        assi = self.assi_2d
+        uv = self.scena.punti_2d.array
+        buffer = self.buffer_profondita()
+        if buffer is not None:  # niente numeri sui punti coperti
+            uv = np.where(buffer.punti_visibili()[:, None], uv, np.nan)
+        scelti = []
+        if len(uv):
+            scelti = seleziona_etichette(
+                assi.transData.transform(uv), assi.bbox.extents, CELLA_ETICHETTE_PX, BUDGET_ETICHETTE
+            ).tolist()
+
+        while len(self.etichette_2d) < len(scelti):
+            self.etichette_2d.append(
+                assi.annotate("", (0, 0), textcoords="offset points", xytext=(4, 4),
+                              fontsize=9, color="#444", zorder=4, visible=False)
+            )
+        cambiate = False
+        for etichetta, k in zip(self.etichette_2d, scelti):
+            testo, posizione = str(k + 1), (uv[k, 0], uv[k, 1])
+            if etichetta.get_text() != testo or etichetta.xy != posizione or not etichetta.get_visible():
+                etichetta.set_text(testo)
+                etichetta.xy = posizione
+                etichetta.set_visible(True)
+                cambiate = True
+        for etichetta in self.etichette_2d[len(scelti):]:
+            if etichetta.get_visible():
+                etichetta.set_visible(False)
+                cambiate = True
+        return cambiate
+
+    def al_cambio_vista_2d(self, _evento=None) -> None:
+        """Callback di zoom/pan/resize: ricalcola le etichette visibili della vista 2D."""
+        if self.ridisegno_in_corso or self.scena is None:
+            return
+        self.aggiorna_etichette_2d()
+
+    def aggiorna_etichette_3d(self) -> None:
+        """Ricrea le etichette 3D (al più BUDGET_ETICHETTE) scelte sulla proiezione a schermo corrente."""
+        assi = self.assi_3d
+        for testo in self.etichette_3d:
+            testo.remove()
+        self.etichette_3d = []
+
+        punti = self.scena.punti_3d.array
+        if not len(punti):
+            return
+        px, py, _ = proj3d.proj_transform(punti[:, 0], punti[:, 1], punti[:, 2], assi.get_proj())
+        xy = assi.transData.transform(np.column_stack((px, py)))
+        for k in seleziona_etichette(xy, assi.bbox.extents, CELLA_ETICHETTE_PX, BUDGET_ETICHETTE).tolist():
+            x, y, z = punti[k]
+            self.etichette_3d.append(assi.text(x, y, z, str(k + 1), fontsize=9, color="#333"))
+
+    def al_cambio_vista_3d(self, _evento=None) -> None:
+        """Callback di rotazione/zoom/resize: aggiorna le etichette della vista 3D e ridisegna."""
+        if self.ridisegno_in_corso or self.scena is None:
+            return
+        self.aggiorna_etichette_3d()
+        self.canvas_3d.draw_idle()
+
+    def segmenti_spigoli(self, punti: np.ndarray, buffer: BufferProfondita | None = None) -> np.ndarray:
+        """Ritorna i segmenti Ex2xD degli spigoli manuali visibili, indicizzando in blocco `punti` (NxD).
+
+        Con `buffer` (solo 2D) ritorna invece i tratti degli spigoli non coperti dalle facce.
+        """
+        if not self.mostra_spigoli_manuali_var.get() or not self.scena.spigoli_manuali:
+            return np.empty((0, 2, punti.shape[1]))
+        if buffer is not None:
+            return buffer.segmenti_visibili(self.scena.spigoli_manuali.indici)
+        return punti[self.scena.spigoli_manuali.indici]
+
+    def buffer_profondita(self, dal_vivo: bool = False) -> BufferProfondita | None:
+        """Z-buffer delle facce per nascondere linee e punti coperti (None se l'opzione è spenta).
+
+        Le facce sono quelle della mesh importata o, in loro assenza, quelle dell'inviluppo
+        convesso dei punti. Buffer e inviluppo sono ricalcolati solo se cambiano camera, punti
+        o facce; durante il trascinamento dei cursori il buffer ha una risoluzione ridotta.
+        """
+        scena = self.scena
+        if not self.nascondi_linee_var.get() or not scena.punti_3d:
+            return None
+        punti, facce = scena.punti_3d, scena.facce
+        if facce:
+            triangoli = facce.array - 1
+        else:
+            chiave = (punti, punti.generazione, len(punti))
+            if self.facce_inviluppo is None or self.facce_inviluppo[0] != chiave:
+                try:
+                    triangoli = inviluppo_convesso(punti.array)
+                except ValueError:  # meno di quattro punti o complanari: nessuna faccia
+                    triangoli = np.empty((0, 3), dtype=np.int64)
+                self.facce_inviluppo = (chiave, triangoli)
+            triangoli = self.facce_inviluppo[1]
+
+        risoluzione = RISOLUZIONE_PROFONDITA_DAL_VIVO if dal_vivo else RISOLUZIONE_PROFONDITA
+        chiave = (scena.camera, punti, punti.generazione, len(punti), facce, facce.generazione, len(facce), risoluzione)
+        if self.profondita_2d is None or self.profondita_2d[0] != chiave:
+            buffer = BufferProfondita(scena.punti_2d.array, scena.camera.profondita(punti.array), triangoli, risoluzione)
+            self.profondita_2d = (chiave, buffer)
+        return self.profondita_2d[1]
+
+    def ridisegna_2d(self, autoscale: bool = False, dal_vivo: bool = False) -> None:
+        """Aggiorna la vista 2D modificando in place gli artisti persistenti (punti, etichette, collegamenti).
+
+        Con `dal_vivo=True` (trascinamento dei cursori) le etichette vengono nascoste invece che
+        ricalcolate e i punti sono sottocampionati a BUDGET_PUNTI_DAL_VIVO. Con "Nascondi linee
+        nascoste" punti, polilinea e spigoli coperti dalle facce non sono disegnati.
+        """
+        scena = self.scena
+        uv = scena.punti_2d.array
+        buffer = self.buffer_profondita(dal_vivo)
 
         # Punto principale
-        assi.plot(self.cx, self.cy, marker="+", markersize=12, linestyle="None", label="Principal point")
+        self.artista_principale_2d.set_data([scena.camera.cx], [scena.camera.cy])
 
-        # Punti (u,v) e numerazione
-        if self.punti_2d:
-            us, vs = zip(*self.punti_2d)
-            assi.plot(us, vs, "o", linestyle="None", zorder=3)
-            for k, (u, v) in enumerate(self.punti_2d, start=1):
-                assi.annotate(str(k), (u, v), textcoords="offset points", xytext=(4, 4),
-                              fontsize=9, color="#444", zorder=4)
+        # Punti (u,v)
+        visibili = uv if buffer is None else uv[buffer.punti_visibili()]
+        passo = -(-len(visibili) // BUDGET_PUNTI_DAL_VIVO) if dal_vivo else 1
+        self.artista_punti_2d.set_data(visibili[::passo, 0], visibili[::passo, 1])
 
         # Collegamenti automatici
-        if self.collega_in_ordine_var.get() and len(self.punti_2d) >= 2:
-            pts = self.coord_polilinea(self.punti_2d, self.chiudi_poligono_var.get())
-            xs, ys = zip(*pts)
-            assi.plot(xs, ys, "-", linewidth=1.8, zorder=2)
-
-        # Spigoli manuali (linea tratteggiata)
-        if self.mostra_spigoli_manuali_var.get():
-            for (i, j) in self.spigoli_manuali:
-                (u1, v1) = self.punti_2d[i - 1]
-                (u2, v2) = self.punti_2d[j - 1]
-                assi.plot([u1, u2], [v1, v2], linestyle="--", linewidth=1.8, zorder=2)
-
-        assi.legend(loc="best")
+        if self.collega_in_ordine_var.get() and len(uv) >= 2:
+            if buffer is None:
+                pts = self.coord_polilinea(uv, self.chiudi_poligono_var.get())
+            else:
+                # Tratti visibili dei lati, separati da NaN (la Line2D si interrompe)
+                indici = self.coord_polilinea(np.arange(len(uv)), self.chiudi_poligono_var.get())
+                tratti = buffer.segmenti_visibili(np.column_stack((indici[:-1], indici[1:])))
+                pts = np.full((3 * len(tratti), 2), np.nan)
+                pts[0::3], pts[1::3] = tratti[:, 0], tratti[:, 1]
+            self.artista_polilinea_2d.set_data(pts[:, 0], pts[:, 1])
+        else:
+            self.artista_polilinea_2d.set_data([], [])
+
+        # Spigoli manuali (linea tratteggiata): un'unica LineCollection
+        self.collezione_spigoli_2d.set_segments(self.segmenti_spigoli(uv, buffer))
+
+        limiti = (self.assi_2d.get_xlim(), self.assi_2d.get_ylim())
         if autoscale:
-            self.autoscale_2d(assi)
-        self.canvas_2d.draw_idle()
+            self.ridisegno_in_corso = True
+            try:
+                self.autoscale_2d(self.assi_2d)
+            finally:
+                self.ridisegno_in_corso = False
+
+        # Numerazione con level-of-detail (dipende dai limiti appena fissati)
+        if not dal_vivo:
+            etichette_cambiate = self.aggiorna_etichette_2d()
+        else:
+            etichette_cambiate = False
+            for etichetta in self.etichette_2d:
+                if etichetta.get_visible():
+                    etichetta.set_visible(False)
+                    etichette_cambiate = True
+
+        # I dati sono cambiati: l'evidenziazione al passaggio si ricalcola al prossimo movimento del mouse
+        self.evidenziato = None
+        self.aggiorna_evidenziazione("2D")
+
+        # Se limiti ed etichette (parte dello sfondo) non cambiano basta il blitting degli artisti dinamici
+        limiti_cambiati = limiti != (self.assi_2d.get_xlim(), self.assi_2d.get_ylim())
+        self.aggiorna_canvas_2d(completo=limiti_cambiati or etichette_cambiate)
 
     @staticmethod
     def autoscale_2d(assi, rapporto_margine: float = 0.10) -> None:
         """Autoscale per la vista 2D: adatta i limiti con un margine percentuale."""
         assi.relim()
-        assi.autoscale_view()
+        # Gli assi sono persistenti: set_xlim/ylim (qui sotto o da zoom) disattivano l'autoscale
+        assi.autoscale(enable=True)
         x0, x1 = assi.get_xlim()
         y0, y1 = assi.get_ylim()
         dx = (x1 - x0) or 1.0
@@ -513,48 +1150,61 @@ class ApplicazioneCoordCode:
         assi.set_ylabel("Y")
         assi.set_zlabel("Z")
         assi.grid(True)
+        scena = self.scena
 
-        # Punti 3D e numerazione
-        if self.punti_3d:
-            xs, ys, zs = zip(*self.punti_3d)
+        self.etichette_3d = []  # rimosse da clear()
+
+        # Punti 3D
+        if scena.punti_3d:
+            xs, ys, zs = scena.punti_3d.colonne
             assi.scatter(xs, ys, zs, s=30, depthshade=True)
-            for k, (x, y, z) in enumerate(self.punti_3d, start=1):
-                assi.text(x, y, z, str(k), fontsize=9, color="#333")
 
         # Collegamenti automatici
-        if self.collega_in_ordine_var.get() and len(self.punti_3d) >= 2:
-            pts = self.coord_polilinea(self.punti_3d, self.chiudi_poligono_var.get())
-            xs, ys, zs = zip(*pts)
-            assi.plot(xs, ys, zs, linewidth=1.8)
-
-        # Spigoli manuali (tratteggiati)
-        if self.mostra_spigoli_manuali_var.get():
-            for (i, j) in self.spigoli_manuali:
-                (x1, y1, z1) = self.punti_3d[i - 1]
-                (x2, y2, z2) = self.punti_3d[j - 1]
-                assi.plot([x1, x2], [y1, y2], [z1, z2], linestyle="--", linewidth=1.8)
+        if self.collega_in_ordine_var.get() and len(scena.punti_3d) >= 2:
+            pts = self.coord_polilinea(scena.punti_3d.array, self.chiudi_poligono_var.get())
+            assi.plot(pts[:, 0], pts[:, 1], pts[:, 2], linewidth=1.8)
+
+        # Spigoli manuali (tratteggiati): un'unica Line3DCollection
+        segmenti = self.segmenti_spigoli(scena.punti_3d.array)
+        if len(segmenti):
+            assi.add_collection3d(Line3DCollection(segmenti, linestyles="--", linewidths=1.8, colors="C3"))
+
+        # Centro ottico, se la camera non è nell'origine (escluso dall'autoscale)
+        if scena.camera.ha_posa:
+            c = scena.camera.centro
+            assi.scatter([c[0]], [c[1]], [c[2]], marker="^", s=60, color="k", depthshade=False)
+
+        # Punto evidenziato, spigolo evidenziato e punto selezionato (artisti ricreati dopo clear())
+        (self.artista_spigolo_evidenziato_3d,) = assi.plot([], [], [], "-", linewidth=4, color="C3", alpha=0.5)
+        (self.artista_evidenziato_3d,) = assi.plot(
+            [], [], [], "o", markersize=14, markerfacecolor="none", markeredgecolor="C3", markeredgewidth=2
+        )
+        (self.artista_selezionato_3d,) = assi.plot([], [], [], "o", markersize=10, color="C3")
+        self.evidenziato = None
+        self.aggiorna_evidenziazione("3D")
 
         if autoscale:
-            self.autoscale_3d(assi, self.punti_3d)
+            self.autoscale_3d(assi, scena.punti_3d.array)
         try:
             assi.set_box_aspect((1, 1, 1))
         except Exception:
             pass
 
+        # Numerazione con level-of-detail (dipende da limiti e punto di vista)
+        self.aggiorna_etichette_3d()
         self.canvas_3d.draw_idle()
 
     @staticmethod
-    def autoscale_3d(assi, punti_3d: list[tuple[float, float, float]], rapporto_margine: float = 0.10) -> None:
-        """Autoscale isotropo per il 3D, basato esclusivamente sui `punti_3d`."""
-        if not punti_3d:
+    def autoscale_3d(assi, punti_3d: np.ndarray, rapporto_margine: float = 0.10) -> None:
+        """Autoscale isotropo per il 3D, basato esclusivamente sui `punti_3d` (array Nx3)."""
+        if not len(punti_3d):
             assi.set_xlim(-1, 1)
             assi.set_ylim(-1, 1)
             assi.set_zlim(0, 2)
             return
 
-        xs, ys, zs = zip(*punti_3d)
-        min_x, min_y, min_z = min(xs), min(ys), min(zs)
-        max_x, max_y, max_z = max(xs), max(ys), max(zs)
+        min_x, min_y, min_z = punti_3d.min(axis=0).tolist()
+        max_x, max_y, max_z = punti_3d.max(axis=0).tolist()
         range_x, range_y, range_z = max_x - min_x, max_y - min_y, max_z - min_z
         max_range = max(range_x, range_y, range_z) or 1.0
 
@@ -569,6 +1219,185 @@ class ApplicazioneCoordCode:
         assi.set_ylim(cy - half - margine, cy + half + margine)
         assi.set_zlim(cz - half - margine, cz + half + margine)
 
+    # ------------------------------------------------------------------ #
+    # PICKING CON IL MOUSE
+    # ------------------------------------------------------------------ #
+    def coordinate_vista(self, vista: str) -> np.ndarray:
+        """Coordinate dati dei punti nella vista: (u,v) nella 2D, (X,Y,Z) nella 3D."""
+        return self.scena.punti_2d.array if vista == "2D" else self.scena.punti_3d.array
+
+    def coordinate_schermo(self, vista: str, punti: np.ndarray) -> np.ndarray:
+        """Coordinate display (pixel) di punti della vista: uv Nx2 nella 2D, XYZ Nx3 nella 3D."""
+        if vista == "2D":
+            return self.assi_2d.transData.transform(punti)
+        px, py, _ = proj3d.proj_transform(punti[:, 0], punti[:, 1], punti[:, 2], self.assi_3d.get_proj())
+        return self.assi_3d.transData.transform(np.column_stack((px, py)))
+
+    def indici_vista(self, vista: str) -> dict:
+        """Indici di picking (punti e spigoli) della vista, ricostruiti o estesi solo se necessario.
+
+        La chiave raccoglie ciò che sposta i punti sullo schermo: trasformazione degli assi
+        (zoom, pan, resize), punto di vista 3D, camera (nella 2D) e archivio dei punti. A chiave
+        invariata i punti e gli spigoli aggiunti nel frattempo sono indicizzati in coda.
+        Sono indicizzati solo i punti sullo schermo (con un margine pari al raggio di cattura).
+        """
+        assi = self.assi_2d if vista == "2D" else self.assi_3d
+        scena = self.scena
+        chiave = (assi.transData.get_affine().get_matrix().tobytes(), scena.punti_3d, scena.punti_3d.generazione)
+        chiave += (scena.camera,) if vista == "2D" else (assi.get_proj().tobytes(),)
+        x0, y0, x1, y1 = assi.bbox.extents
+        riquadro = (x0 - RAGGIO_PICKING_PX, y0 - RAGGIO_PICKING_PX, x1 + RAGGIO_PICKING_PX, y1 + RAGGIO_PICKING_PX)
+
+        def sullo_schermo(xy: np.ndarray) -> np.ndarray:
+            return np.flatnonzero(
+                (xy[:, 0] >= riquadro[0]) & (xy[:, 0] <= riquadro[2]) & (xy[:, 1] >= riquadro[1]) & (xy[:, 1] <= riquadro[3])
+            )
+
+        punti = self.coordinate_vista(vista)
+        voce = self.indici_picking.get(vista)
+        if voce is None or voce["chiave"] != chiave or voce["n_punti"] > len(punti):
+            xy = self.coordinate_schermo(vista, punti)
+            visibili = sullo_schermo(xy)
+            voce = {
+                "chiave": chiave, "xy": xy, "n_punti": len(punti),
+                "punti": IndiceGriglia(xy[visibili], RAGGIO_PICKING_PX, visibili),
+                "spigoli": None, "chiave_spigoli": None, "n_spigoli": 0,
+            }
+            self.indici_picking[vista] = voce
+        elif voce["n_punti"] < len(punti):
+            nuovi = self.coordinate_schermo(vista, punti[voce["n_punti"]:])
+            visibili = sullo_schermo(nuovi)
+            voce["punti"].estendi(nuovi[visibili], visibili + voce["n_punti"])
+            voce["xy"] = np.concatenate((voce["xy"], nuovi))
+            voce["n_punti"] = len(punti)
+
+        spigoli = scena.spigoli_manuali
+        if not self.mostra_spigoli_manuali_var.get() or not spigoli:
+            voce["spigoli"] = voce["chiave_spigoli"] = None
+            return voce
+        chiave_spigoli = (spigoli, spigoli.generazione)
+        if voce["spigoli"] is None or voce["chiave_spigoli"] != chiave_spigoli or voce["n_spigoli"] > len(spigoli):
+            voce["spigoli"] = IndiceSegmenti(voce["xy"][spigoli.indici], RAGGIO_PICKING_PX, riquadro)
+        elif voce["n_spigoli"] < len(spigoli):
+            voce["spigoli"].estendi(voce["xy"][spigoli.indici[voce["n_spigoli"]:]])
+        voce["chiave_spigoli"], voce["n_spigoli"] = chiave_spigoli, len(spigoli)
+        return voce
+
+    def bersaglio_picking(self, vista: str, x: float, y: float) -> tuple[str, int] | None:
+        """Punto (prioritario) o spigolo più vicino alla posizione (x, y) in pixel, entro RAGGIO_PICKING_PX."""
+        voce = self.indici_vista(vista)
+        trovato = voce["punti"].piu_vicino((x, y), RAGGIO_PICKING_PX)
+        if trovato is not None:
+            return ("punto", trovato[0])
+        if voce["spigoli"] is not None:
+            trovato = voce["spigoli"].piu_vicino((x, y), RAGGIO_PICKING_PX)
+            if trovato is not None:
+                return ("spigolo", trovato[0])
+        return None
+
+    def vista_evento(self, evento) -> str | None:
+        """Vista ("2D"/"3D") interessata da un evento del mouse, o None se il picking non si applica
+        (fuori dagli assi, scena vuota, zoom/pan della toolbar attivi)."""
+        if self.scena is None or not len(self.scena):
+            return None
+        if evento.inaxes is self.assi_2d:
+            vista, toolbar = "2D", self.toolbar_2d
+        elif evento.inaxes is self.assi_3d:
+            vista, toolbar = "3D", self.toolbar_3d
+        else:
+            return None
+        return None if toolbar.mode else vista
+
+    def aggiorna_evidenziazione(self, vista: str, disegna: bool = False) -> None:
+        """Posiziona gli artisti di evidenziazione (punto/spigolo sotto il mouse, punto selezionato)."""
+        if self.punto_selezionato is not None and self.punto_selezionato >= len(self.scena):
+            self.punto_selezionato = None
+        coordinate = self.coordinate_vista(vista)
+        vuoto = coordinate[:0]
+        tipo, k = self.evidenziato or (None, None)
+        posizioni = (
+            coordinate[self.scena.spigoli_manuali.indici[k]] if tipo == "spigolo" else vuoto,
+            coordinate[[k]] if tipo == "punto" else vuoto,
+            coordinate[[self.punto_selezionato]] if self.punto_selezionato is not None else vuoto,
+        )
+        if vista == "2D":
+            artisti = (self.artista_spigolo_evidenziato_2d, self.artista_evidenziato_2d, self.artista_selezionato_2d)
+            for artista, xy in zip(artisti, posizioni):
+                artista.set_data(xy[:, 0], xy[:, 1])
+            if disegna:
+                self.aggiorna_canvas_2d(solo_evidenziazione=True)
+        elif self.artista_evidenziato_3d is not None:
+            artisti = (self.artista_spigolo_evidenziato_3d, self.artista_evidenziato_3d, self.artista_selezionato_3d)
+            for artista, xyz in zip(artisti, posizioni):
+                artista.set_data_3d(xyz[:, 0], xyz[:, 1], xyz[:, 2])
+            if disegna:
+                self.canvas_3d.draw_idle()
+
+    def al_movimento_mouse(self, evento) -> None:
+        """Evidenzia il punto o lo spigolo sotto il mouse (ridisegnando solo se cambia)."""
+        vista = self.vista_evento(evento)
+        bersaglio = None
+        if vista is not None and evento.button is None:  # niente picking durante i trascinamenti
+            bersaglio = self.bersaglio_picking(vista, evento.x, evento.y)
+        if bersaglio != self.evidenziato and self.scena is not None:
+            self.evidenziato = bersaglio
+            self.aggiorna_evidenziazione(vista or self.modalita_vista.get(), disegna=True)
+
+    def al_pressione_mouse(self, evento) -> None:
+        self.pressione_mouse = (evento.x, evento.y) if evento.button == 1 else None
+
+    def al_rilascio_mouse(self, evento) -> None:
+        """Clic (rilascio senza trascinamento): seleziona un punto e lo collega al successivo cliccato.
+
+        Un clic su uno spigolo ne mostra gli estremi; un clic nel vuoto annulla la selezione.
+        """
+        pressione, self.pressione_mouse = self.pressione_mouse, None
+        vista = self.vista_evento(evento)
+        if vista is None or pressione is None or evento.button != 1:
+            return
+        if math.hypot(evento.x - pressione[0], evento.y - pressione[1]) > TOLLERANZA_CLIC_PX:
+            return  # trascinamento (es. rotazione della vista 3D)
+
+        bersaglio = self.bersaglio_picking(vista, evento.x, evento.y)
+        if bersaglio is None:
+            self.annulla_selezione()
+            return
+        tipo, k = bersaglio
+        if tipo == "spigolo":
+            i, j = (self.scena.spigoli_manuali.indici[k] + 1).tolist()
+            self.etichetta_stato.configure(text=f"Spigolo manuale {i}-{j}.")
+            return
+
+        if self.punto_selezionato is None or self.punto_selezionato == k:
+            self.punto_selezionato = None if self.punto_selezionato == k else k
+            if self.punto_selezionato is None:
+                self.etichetta_stato.configure(text="Selezione annullata.")
+            else:
+                self.etichetta_stato.configure(
+                    text=f"Punto {k + 1} selezionato: clicca un altro punto per collegarli (Esc per annullare)."
+                )
+            self.aggiorna_evidenziazione(vista, disegna=True)
+            return
+
+        i, j = self.punto_selezionato + 1, k + 1
+        self.punto_selezionato = None
+        try:
+            self.scena.aggiungi_spigolo(i, j)
+        except ValueError as e:
+            self.etichetta_stato.configure(text=str(e))
+            self.aggiorna_evidenziazione(vista, disegna=True)
+            return
+        self.etichetta_stato.configure(text=f"Collegati i punti {i} e {j}.")
+        self.ridisegna_corrente(autoscale=False)
+
+    def annulla_selezione(self, _evento=None) -> None:
+        """Annulla il collegamento con clic in corso (tasto Esc o clic nel vuoto)."""
+        if self.punto_selezionato is None:
+            return
+        self.punto_selezionato = None
+        self.etichetta_stato.configure(text="Selezione annullata.")
+        self.aggiorna_evidenziazione(self.modalita_vista.get(), disegna=True)
+
     # ------------------------------------------------------------------ #
     # SWITCH VISTE E RESET
     # ------------------------------------------------------------------ #
@@ -603,11 +1432,9 @@ class ApplicazioneCoordCode:
 
     def reset_totale(self) -> None:
         """Pulisce completamente i dati (punti e spigoli) e svuota la tabella."""
-        self.punti_3d.clear()
-        self.punti_2d.clear()
-        self.spigoli_manuali.clear()
-        for item in self.albero_punti.get_children():
-            self.albero_punti.delete(item)
+        self.scena.svuota()
+        self.punto_selezionato = None
+        self.tabella_punti.vai_in_cima()
         self.ridisegna_corrente(autoscale=True)
         self.etichetta_stato.configure(text="")
 
@@ -616,162 +1443,369 @@ class ApplicazioneCoordCode:
     # ------------------------------------------------------------------ #
     def esporta_txt(self) -> None:
         """Esporta su .txt: intrinseci, punti (X,Y,Z,u,v) e spigoli manuali con formato leggibile."""
-        if not self.punti_3d:
+        if not self.scena.punti_3d:
             messagebox.showinfo("Nessun dato", "Non ci sono punti da esportare.")
             return
 
         percorso = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("File di testo", "*.txt"), ("Tutti i file", "*.*")],
+            filetypes=[
+                ("File di testo", "*.txt"),
+                ("File di testo compresso (gzip)", "*.txt.gz"),
+                ("File di testo compresso (zstd)", "*.txt.zst"),
+                ("Tutti i file", "*.*"),
+            ],
             title="Esporta dati come file .txt",
         )
         if not percorso:
             return
 
-        try:
-            with open(percorso, "w", encoding="utf-8") as f:
-                f.write("==================== COORDCODE — ESPORTAZIONE DATI ====================\n")
-                f.write("Descrizione: punti 3D, proiezioni (u,v) sul piano immagine e collegamenti definiti dall’utente.\n")
-                f.write("Nota: i punti sono elencati nell’ordine di inserimento; le coordinate u,v sono in pixel.\n\n")
-
-                f.write("[Camera]\n")
-                f.write(f"  f  = {self.focale:.6g}        # focale in pixel\n")
-                f.write(f"  cx = {self.cx:.6g}        # coordinata u del punto principale\n")
-                f.write(f"  cy = {self.cy:.6g}        # coordinata v del punto principale\n\n")
-
-                f.write("[Punti]\n")
-                f.write("  # indice | X | Y | Z || u | v\n")
-                for i, ((x, y, z), (u, v)) in enumerate(zip(self.punti_3d, self.punti_2d), start=1):
-                    # Larghezza prima della precisione (FIX al formato)
-                    f.write(f"  {i:>2})  X={x:<10.6g} Y={y:<10.6g} Z={z:<10.6g}  ==>  u={u:<10.4f} v={v:.4f}\n")
-
-                f.write("\n[SpigoliManuali]\n")
-                f.write("  # elenco di coppie (i, j) che collegano i punti con indici i e j\n")
-                if self.spigoli_manuali:
-                    for (i, j) in self.spigoli_manuali:
-                        f.write(f"  ({i}, {j})\n")
-                else:
-                    f.write("  (nessuno)\n")
-
-                f.write("=========================== FINE ESPORTAZIONE =========================\n")
+        # Copia della scena: l'utente può continuare a modificarla mentre il thread scrive
+        scena = self.scena.copia()
 
+        def lavoro(avanzamento) -> None:
+            try:
+                scrivi_txt(scena, percorso, avanzamento=avanzamento)
+            except OperazioneAnnullata:
+                os.remove(percorso)  # niente file troncati su disco
+                raise
+
+        def al_termine(_risultato, errore: Exception | None) -> None:
+            if errore is not None:
+                self.etichetta_stato.configure(text="Esportazione non riuscita.")
+                messagebox.showerror("Errore di scrittura", str(errore))
+                return
+            self.etichetta_stato.configure(text=f"Esportati {len(scena)} punti.")
             messagebox.showinfo("Esportazione completata", f"Dati salvati in:\n{percorso}")
-        except Exception as e:
-            messagebox.showerror("Errore di scrittura", str(e))
+
+        self.esegui_in_background(lavoro, al_termine, "Esportazione")
+
+    def esegui_in_background(self, lavoro, al_termine, descrizione: str) -> None:
+        """Esegue `lavoro(avanzamento)` in un thread e ne riporta l'esito nel main loop di Tk.
+
+        Il thread non tocca mai i widget: avanzamento ed esito passano da una coda che il main
+        loop svuota ogni INTERVALLO_CONTROLLO_MS con `radice.after`, dove vengono aggiornati
+        `etichetta_stato` e chiamato `al_termine(risultato, errore)`. Il pulsante "Annulla" fa
+        sollevare OperazioneAnnullata alla successiva chiamata di `avanzamento`; in quel caso
+        `al_termine` non viene chiamato.
+        """
+        if self.annullamento is not None:
+            messagebox.showinfo("Operazione in corso", "Attendi il termine (o annulla) dell'operazione in corso.")
+            return
+
+        coda: queue.Queue = queue.Queue()
+        annullamento = self.annullamento = threading.Event()
+
+        def avanzamento(fatto: int, totale: int) -> None:
+            if annullamento.is_set():
+                raise OperazioneAnnullata
+            coda.put(("avanzamento", 100 * fatto // max(totale, 1)))
+
+        def esegui() -> None:
+            try:
+                coda.put(("fine", lavoro(avanzamento), None))
+            except Exception as e:
+                coda.put(("fine", None, e))
+
+        def controlla() -> None:
+            # Si svuota tutta la coda e si mostra solo l'ultimo avanzamento
+            percentuale = None
+            try:
+                while True:
+                    messaggio = coda.get_nowait()
+                    if messaggio[0] == "fine":
+                        break
+                    percentuale = messaggio[1]
+            except queue.Empty:
+                if percentuale is not None:
+                    self.etichetta_stato.configure(text=f"{descrizione}… {percentuale}%")
+                self.radice.after(INTERVALLO_CONTROLLO_MS, controlla)
+                return
+
+            self.annullamento = None
+            self.pulsante_annulla.configure(state="disabled")
+            _, risultato, errore = messaggio
+            if isinstance(errore, OperazioneAnnullata):
+                self.etichetta_stato.configure(text=f"{descrizione} annullata.")
+                return
+            al_termine(risultato, errore)
+
+        self.etichetta_stato.configure(text=f"{descrizione}… 0%")
+        self.pulsante_annulla.configure(state="normal")
+        threading.Thread(target=esegui, daemon=True).start()
+        self.radice.after(INTERVALLO_CONTROLLO_MS, controlla)
+
+    def annulla_operazione(self) -> None:
+        """Richiede l'interruzione del lavoro in background in corso (se presente)."""
+        if self.annullamento is not None:
+            self.annullamento.set()
+            self.etichetta_stato.configure(text="Annullamento in corso…")
 
     def importa_txt(self) -> None:
         """Importa da .txt: riconosce le sezioni [Camera], [Punti], [SpigoliManuali] e ricarica tutto."""
         percorso = filedialog.askopenfilename(
-            filetypes=[("File di testo", "*.txt"), ("Tutti i file", "*.*")],
+            filetypes=[("File di testo", "*.txt *.txt.gz *.txt.zst"), ("Tutti i file", "*.*")],
             title="Importa dati da file .txt",
         )
         if not percorso:
             return
 
-        try:
-            nuovi_punti_3d: list[tuple[float, float, float]] = []
-            nuovi_punti_2d: list[tuple[float, float]] = []
-            nuovi_spigoli: list[tuple[int, int]] = []
-
-            nuova_f, nuovo_cx, nuovo_cy = self.focale, self.cx, self.cy
-            sezione = None
-
-            with open(percorso, "r", encoding="utf-8") as f:
-                for riga in f:
-                    s = riga.strip()
-                    if not s or s.startswith("#") or s.startswith("="):
-                        continue
-                    if s.startswith("[") and s.endswith("]"):
-                        sezione = s[1:-1]  # nome della sezione
-                        continue
-
-                    if sezione == "Camera":
-                        # Righe del tipo: "cx = 320.0   # commento"
-                        if "=" in s:
-                            chiave, valore = s.split("=", 1)
-                            chiave = chiave.strip().lower()
-                            valore = valore.split("#")[0].strip().replace(",", ".")
-                            try:
-                                if chiave == "f":
-                                    nuova_f = float(valore)
-                                elif chiave == "cx":
-                                    nuovo_cx = float(valore)
-                                elif chiave == "cy":
-                                    nuovo_cy = float(valore)
-                            except Exception:
-                                pass
-
-                    elif sezione == "Punti":
-                        # Righe del tipo: "1)  X=...  Y=...  Z=...  ==>  u=...  v=..."
-                        if "X=" in s and "Y=" in s and "Z=" in s:
-                            try:
-                                token = s.replace(")", "").split()
-                                mappa = {}
-                                for t in token:
-                                    if "=" in t:
-                                        k, v = t.split("=", 1)
-                                        mappa[k.strip().lower()] = v.strip().replace(",", ".")
-                                x = float(mappa["x"]); y = float(mappa["y"]); z = float(mappa["z"])
-                                u = float(mappa["u"]); v = float(mappa["v"])
-                                nuovi_punti_3d.append((x, y, z))
-                                nuovi_punti_2d.append((u, v))
-                            except Exception:
-                                continue
-                        else:
-                            # Formato alternativo tollerato: "1 | X | Y | Z | u | v"
-                            campi = [c.strip() for c in s.replace(";", "|").split("|")]
-                            if len(campi) >= 6 and campi[0][0].isdigit():
-                                try:
-                                    _, x, y, z, u, v = campi[:6]
-                                    x = float(x); y = float(y); z = float(z); u = float(u); v = float(v)
-                                    nuovi_punti_3d.append((x, y, z)); nuovi_punti_2d.append((u, v))
-                                except Exception:
-                                    pass
-
-                    elif sezione == "SpigoliManuali":
-                        # Righe tipo "(i, j)" o "i-j" o "i,j"
-                        s2 = s.replace("(", "").replace(")", "").replace(" ", "").replace("-", ",")
-                        parti = s2.split(",")
-                        if len(parti) == 2 and all(p.isdigit() for p in parti):
-                            i, j = map(int, parti)
-                            if i != j:
-                                chiave = (min(i, j), max(i, j))
-                                if chiave not in nuovi_spigoli:
-                                    nuovi_spigoli.append(chiave)
-
-            # Validazione minima
-            if not nuovi_punti_3d or not nuovi_punti_2d or len(nuovi_punti_3d) != len(nuovi_punti_2d):
-                messagebox.showerror("Importazione fallita", "Il file non contiene una sezione [Punti] valida.")
+        # Intrinseci correnti come valori predefiniti se il file non li riporta
+        camera = self.scena.camera
+
+        def lavoro(avanzamento) -> Scena:
+            return leggi_txt(percorso, camera=camera, avanzamento=avanzamento)
+
+        def al_termine(scena: Scena | None, errore: Exception | None) -> None:
+            if errore is not None:
+                self.etichetta_stato.configure(text="Importazione non riuscita.")
+                messagebox.showerror("Errore di importazione", str(errore))
                 return
+            self.applica_scena(scena, f"Importate {len(scena)} righe dal file selezionato.")
 
-            # Applica i nuovi dati
-            self.punti_3d = nuovi_punti_3d
-            self.punti_2d = nuovi_punti_2d
-            self.spigoli_manuali = nuovi_spigoli
+        self.esegui_in_background(lavoro, al_termine, "Importazione")
 
-            # Aggiorna intrinseci se presenti
-            self.focale = nuova_f
-            self.cx = nuovo_cx
-            self.cy = nuovo_cy
-            self.var_intrinseci_testo.set(f"f={self.focale:.4g}, cx={self.cx:.4g}, cy={self.cy:.4g}")
+    def esporta_binario(self) -> None:
+        """Esporta la scena nel formato binario .ccb (intestazione + blocchi XYZ, uv e spigoli)."""
+        if not self.scena.punti_3d:
+            messagebox.showinfo("Nessun dato", "Non ci sono punti da esportare.")
+            return
 
-            # Ricostruzione tabella
-            for item in self.albero_punti.get_children():
-                self.albero_punti.delete(item)
-            for i, ((x, y, z), (u, v)) in enumerate(zip(self.punti_3d, self.punti_2d), start=1):
-                self.albero_punti.insert("", "end", values=(i, f"{x:.6g}", f"{y:.6g}", f"{z:.6g}", f"{u:.4f}", f"{v:.4f}"))
+        percorso = filedialog.asksaveasfilename(
+            defaultextension=".ccb",
+            filetypes=[("Scena CoordCode binaria", "*.ccb"), ("Tutti i file", "*.*")],
+            title="Esporta scena binaria .ccb",
+        )
+        if not percorso:
+            return
 
-            self.etichetta_stato.configure(text=f"Importate {len(self.punti_3d)} righe dal file selezionato.")
-            self.ridisegna_corrente(autoscale=True)
+        scena = self.scena.copia()
 
-        except Exception as e:
-            messagebox.showerror("Errore di importazione", str(e))
+        def al_termine(_risultato, errore: Exception | None) -> None:
+            if errore is not None:
+                self.etichetta_stato.configure(text="Esportazione non riuscita.")
+                messagebox.showerror("Errore di scrittura", str(errore))
+                return
+            self.etichetta_stato.configure(text=f"Esportati {len(scena)} punti.")
+            messagebox.showinfo("Esportazione completata", f"Dati salvati in:\n{percorso}")
+
+        self.esegui_in_background(
+            lambda avanzamento: scrivi_binario(scena, percorso, avanzamento), al_termine, "Esportazione"
+        )
+
+    def importa_binario(self) -> None:
+        """Importa una scena .ccb mappandola in memoria (apertura a tempo costante)."""
+        percorso = filedialog.askopenfilename(
+            filetypes=[("Scena CoordCode binaria", "*.ccb"), ("Tutti i file", "*.*")],
+            title="Importa scena binaria .ccb",
+        )
+        if not percorso:
+            return
+
+        def al_termine(scena: Scena | None, errore: Exception | None) -> None:
+            if errore is not None:
+                self.etichetta_stato.configure(text="Importazione non riuscita.")
+                messagebox.showerror("Errore di importazione", str(errore))
+                return
+            self.applica_scena(scena, f"Importati {len(scena)} punti dalla scena binaria.")
+
+        self.esegui_in_background(
+            lambda avanzamento: leggi_binario(percorso, avanzamento=avanzamento), al_termine, "Importazione"
+        )
+
+    def importa_mesh(self) -> None:
+        """Importa vertici, spigoli e facce da una mesh o nuvola di punti (.obj, .ply, .xyz, .csv).
+
+        Il file non ha una camera: si tengono gli intrinseci correnti e, se la scena non è tutta
+        davanti alla camera, la camera viene traslata per inquadrarla.
+        """
+        percorso = filedialog.askopenfilename(
+            filetypes=[
+                ("Mesh e nuvole di punti", "*.obj *.ply *.xyz *.csv *.pts *.obj.gz *.xyz.gz *.csv.gz"),
+                ("Wavefront OBJ", "*.obj *.obj.gz *.obj.zst"), ("PLY", "*.ply"),
+                ("Nuvole XYZ/CSV", "*.xyz *.csv *.pts"), ("Tutti i file", "*.*"),
+            ],
+            title="Importa mesh o nuvola di punti",
+        )
+        if not percorso:
+            return
+        camera = self.scena.camera
+
+        def al_termine(scena: Scena | None, errore: Exception | None) -> None:
+            if errore is not None:
+                self.etichetta_stato.configure(text="Importazione non riuscita.")
+                messagebox.showerror("Errore di importazione", str(errore))
+                return
+            messaggio = (
+                f"Importati {len(scena)} vertici, {len(scena.spigoli_manuali)} spigoli e {len(scena.facce)} facce "
+                f"da {os.path.basename(percorso)}."
+            )
+            if scena.camera != camera:
+                messaggio += " Camera traslata per inquadrare la scena."
+            self.applica_scena(scena, messaggio)
+
+        self.esegui_in_background(
+            lambda avanzamento: leggi_mesh(percorso, camera, avanzamento=avanzamento), al_termine, "Importazione"
+        )
+
+    def calibra_da_file(self) -> None:
+        """Stima la camera dalle coppie (X,Y,Z) ↔ (u,v) di un .txt e propone di applicarla alla scena.
+
+        Con almeno 6 punti si stimano intrinseci e posa (DLT + raffinamento); se la DLT fallisce
+        (es. punti complanari) si ripiega sui soli intrinseci con la posa corrente.
+        """
+        percorso = filedialog.askopenfilename(
+            filetypes=[("File di testo", "*.txt *.txt.gz *.txt.zst"), ("Tutti i file", "*.*")],
+            title="Calibra la camera dalle corrispondenze di un file .txt",
+        )
+        if not percorso:
+            return
+        camera_corrente = self.scena.camera
+
+        def lavoro(avanzamento):
+            punti_3d, uv = leggi_corrispondenze(percorso, avanzamento=avanzamento)
+            try:
+                return calibra(punti_3d, uv, camera_iniziale=replace(camera_corrente, rotazione=(0.0,) * 3, traslazione=(0.0,) * 3))
+            except (ValueError, np.linalg.LinAlgError):
+                return calibra(punti_3d, uv, stima_posa=False, camera_iniziale=camera_corrente)
+
+        def al_termine(risultato, errore: Exception | None) -> None:
+            if errore is not None:
+                self.etichetta_stato.configure(text="Calibrazione non riuscita.")
+                messagebox.showerror("Errore di calibrazione", str(errore))
+                return
+            self.etichetta_stato.configure(text=f"Calibrazione: {risultato.descrizione()}")
+            if messagebox.askyesno(
+                "Calibrazione completata",
+                f"Camera stimata:\n{risultato.camera.descrizione()}\n\n"
+                f"Errore di riproiezione RMS: {risultato.rms:.4g} px\n\nApplicarla alla scena corrente?",
+            ):
+                self.imposta_camera(risultato.camera, "Camera calibrata")
+
+        self.esegui_in_background(lavoro, al_termine, "Calibrazione")
+
+    def stima_posa_da_file(self) -> None:
+        """Stima la posa (PnP con RANSAC) dalle corrispondenze di un .txt con gli intrinseci correnti."""
+        percorso = filedialog.askopenfilename(
+            filetypes=[("File di testo", "*.txt *.txt.gz *.txt.zst"), ("Tutti i file", "*.*")],
+            title="Stima la posa della camera dalle corrispondenze di un file .txt",
+        )
+        if not percorso:
+            return
+        camera_corrente = self.scena.camera
+
+        def lavoro(avanzamento):
+            punti_3d, uv = leggi_corrispondenze(percorso, avanzamento=avanzamento)
+            return risolvi_pnp(punti_3d, uv, camera_corrente, avanzamento=avanzamento)
+
+        def al_termine(risultato, errore: Exception | None) -> None:
+            if errore is not None:
+                self.etichetta_stato.configure(text="Stima della posa non riuscita.")
+                messagebox.showerror("Errore nella stima della posa", str(errore))
+                return
+            self.etichetta_stato.configure(text=f"Posa: {risultato.descrizione()}")
+            scartati = len(risultato.consenso) - int(risultato.consenso.sum())
+            if messagebox.askyesno(
+                "Stima della posa completata",
+                f"Camera stimata:\n{risultato.camera.descrizione()}\n\n"
+                f"Errore di riproiezione RMS: {risultato.rms:.4g} px ({scartati} corrispondenze scartate)\n\n"
+                "Applicarla alla scena corrente?",
+            ):
+                self.imposta_camera(risultato.camera, "Posa stimata")
+
+        self.esegui_in_background(lavoro, al_termine, "Stima della posa")
+
+    def triangola_da_file(self) -> None:
+        """Ricostruisce i punti 3D da due o più .txt degli stessi punti ripresi con camere diverse.
+
+        Riporta residui di riproiezione e scarto dalle coordinate del primo file; se tutti i
+        punti sono triangolabili propone di caricarli come nuova scena (camera della prima vista).
+        """
+        percorsi = filedialog.askopenfilenames(
+            filetypes=[("File di testo", "*.txt *.txt.gz *.txt.zst"), ("Tutti i file", "*.*")],
+            title="Scegli due o più viste degli stessi punti (da pose diverse)",
+        )
+        if not percorsi:
+            return
+        if len(percorsi) < 2:
+            messagebox.showerror("Errore", "Per la triangolazione servono almeno due file.")
+            return
+
+        def lavoro(avanzamento):
+            return triangola_viste(list(percorsi), avanzamento=avanzamento)
+
+        def al_termine(esito, errore: Exception | None) -> None:
+            if errore is not None:
+                self.etichetta_stato.configure(text="Triangolazione non riuscita.")
+                messagebox.showerror("Errore di triangolazione", str(errore))
+                return
+            risultato, camere, riferimento = esito
+            self.etichetta_stato.configure(text=f"Triangolazione: {risultato.descrizione()}")
+            testo = risultato.descrizione() + "."
+            validi = risultato.valido
+            if validi.any():
+                scarto = np.linalg.norm(risultato.punti_3d[validi] - riferimento[validi], axis=1)
+                peggiori = np.flatnonzero(validi)[np.argsort(risultato.rms[validi])[::-1][:5]] + 1
+                testo += (
+                    f"\nScarto dalle coordinate del primo file: medio {scarto.mean():.4g}, max {scarto.max():.4g}."
+                    f"\nPunti con residuo maggiore: {', '.join(map(str, peggiori))}."
+                )
+            if not validi.all():
+                testo += (
+                    f"\n{int((~validi).sum())} punti non triangolabili (raggi quasi paralleli, "
+                    f"parallasse massima {risultato.parallasse.max():.3g}°): le viste devono avere centri ottici diversi, "
+                    "cioè pose (rx..tz) diverse e non solo intrinseci diversi."
+                    "\nEsempio: Esempi/CuboVistaSinistra.txt con Esempi/CuboVistaDestra.txt."
+                )
+                messagebox.showinfo("Triangolazione", testo)
+                return
+            if messagebox.askyesno("Triangolazione", testo + "\n\nCaricare i punti ricostruiti come nuova scena?"):
+                self.applica_scena(
+                    Scena(camere[0], ArchivioPunti.da_array(risultato.punti_3d)),
+                    f"Caricati {len(risultato.punti_3d)} punti triangolati da {len(camere)} viste.",
+                )
+
+        self.esegui_in_background(lavoro, al_termine, "Triangolazione")
+
+    def aggiorna_campi_camera(self) -> None:
+        """Riporta la camera della scena in tutti i campi della pagina 2: testo, cursori, posa e distorsione."""
+        cam = self.scena.camera
+        self.var_intrinseci_testo.set(cam.descrizione())
+        self.configura_cursori_intrinseci()
+        self.var_posa.set(self.testo_posa(cam))
+        self.var_distorsione.set(",".join(f"{k:.6g}" for k in cam.distorsione))
+
+    def applica_scena(self, scena: Scena, messaggio: str) -> None:
+        """Sostituisce la scena corrente con una importata e aggiorna intrinseci, tabella e viste."""
+        self.scena = scena
+        self.punto_selezionato = None
+        self.profondita_2d = self.facce_inviluppo = None
+        self.aggiorna_campi_camera()
+
+        self.tabella_punti.vai_in_cima()
+        self.etichetta_stato.configure(text=messaggio)
+        self.ridisegna_corrente(autoscale=True)
+
+    def righe_tabella(self, inizio: int, fine: int) -> list[tuple]:
+        """Valori formattati delle righe [inizio, fine) della tabella, letti dall'archivio punti."""
+        xyz = self.scena.punti_3d.array[inizio:fine].tolist()
+        uv = self.scena.punti_2d.array[inizio:fine].tolist()
+        return [
+            (i, f"{x:.6g}", f"{y:.6g}", f"{z:.6g}", f"{u:.4f}", f"{v:.4f}")
+            for i, ((x, y, z), (u, v)) in enumerate(zip(xyz, uv), start=inizio + 1)
+        ]
 
 # =============================================================================
 # AVVIO APPLICAZIONE
 # =============================================================================
 def main() -> None:
-    """Entry point: crea la finestra Tk e lancia l'applicazione."""
+    """Entry point: senza argomenti crea la finestra Tk e lancia l'applicazione;
+    con argomenti da riga di comando esegue la modalità batch (vedi CoordCodeBatch).
+    """
+    if len(sys.argv) > 1:
+        import CoordCodeBatch
+        sys.exit(CoordCodeBatch.main(sys.argv[1:]))
+
     radice = tk.Tk()
     app = ApplicazioneCoordCode(radice)
     radice.mainloop()
@@ -0,0 +1,270 @@
+# =============================================================================
+#  CoordCodeBatch — Elaborazione da riga di comando di molti file CoordCode
+#  Autore: Alessio de Dato - Ingegneria Informatica UniPi
+#
+#  DESCRIZIONE GENERALE
+#  --------------------
+#  Carica uno o più file .txt di CoordCode (cartelle o pattern glob), eventualmente
+#  sostituisce gli intrinseci (f, cx, cy), ricalcola le proiezioni (u,v) e scrive i
+#  risultati in una cartella di uscita. I file sono distribuiti su un pool di processi
+#  così da sfruttare tutti i core; per ogni file viene riportato il throughput.
+#  Con --pose N ogni scena è invece proiettata da N pose su un'orbita attorno ai suoi punti
+#  (dataset sintetici di punti di vista) e salvata in un archivio .npz.
+#  Con --immagini png|npy si salvano anche le immagini (punti e spigoli disegnati con il
+#  rasterizzatore NumPy di CoordCodeRaster, senza Matplotlib): una per file o una per posa.
+#
+#  Esempi:
+#      python CoordCodeBatch.py Esempi "Test2/*.txt" -o uscita --cx 640
+#      python CoordCodeBatch.py Esempi -o pose --pose 1000 --elevazione 15
+#      python CoordCodeBatch.py Esempi -o fotogrammi --pose 1000 --immagini png
+#
+#  ORGANIZZAZIONE DEL CODICE
+#  -------------------------
+#   • raccogli_file  : espande cartelle e pattern glob in un elenco ordinato di .txt.
+#   • conflitti_uscita: uscite che sovrascriverebbero una sorgente o si sovrapporrebbero
+#                      (stesso nome da cartelle diverse), rifiutate prima di iniziare.
+#   • elabora_file   : lavoro di un singolo processo (import, riproiezione, export).
+#   • giro_pose      : proiezione di una scena da N pose in orbita (salvataggio .npz ed
+#                      eventuali fotogrammi).
+#   • esegui_batch   : distribuisce i file sul pool e stampa il resoconto.
+#   • main           : parsing degli argomenti da riga di comando.
+# =============================================================================
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+
+import numpy as np
+
+from CoordCodeCore import Scena, leggi_txt, pose_orbita, proietta_pose, scrivi_txt
+from CoordCodeRaster import dimensioni_immagine, disegna, disegna_scena, salva_immagine
+
+# Proiezioni (pose x punti) calcolate per blocco nel giro di pose: limita i temporanei del
+# broadcast a ~200 MB (i risultati uv/valido, salvati in un unico .npz, restano P x N)
+PROIEZIONI_PER_BLOCCO = 1 << 23
+
+
+def raccogli_file(sorgenti: list[str]) -> list[str]:
+    """Espande cartelle (tutti i .txt contenuti) e pattern glob in un elenco senza duplicati."""
+    trovati: list[str] = []
+    for sorgente in sorgenti:
+        if os.path.isdir(sorgente):
+            trovati.extend(glob.glob(os.path.join(sorgente, "*.txt")))
+        else:
+            trovati.extend(glob.glob(sorgente) or ([sorgente] if os.path.isfile(sorgente) else []))
+    return sorted(set(map(os.path.normpath, trovati)))
+
+
+def giro_pose(
+    scena: Scena, destinazione: str, n_pose: int, raggio: float | None = None, elevazione: float = 0.0,
+    immagini: str | None = None,
+) -> int:
+    """Proietta i punti della scena da `n_pose` pose su un'orbita attorno al loro baricentro.
+
+    Le pose sono proiettate a blocchi con proietta_pose (una sola operazione broadcast per
+    blocco) e scritte in `destinazione` (.npz) come `uv` (PxNx2, NaN se dietro la camera),
+    `valido` (PxN), `rotazioni` (Px3x3), `traslazioni` (Px3), `intrinseci` (f, cx, cy) e
+    `distorsione` (k1, k2, p1, p2, k3), già applicata alle `uv` come in Camera.proietta.
+    Senza `raggio` l'orbita passa alla distanza del baricentro dall'origine (camera originale).
+    Con `immagini` ("png" o "npy") ogni posa è anche disegnata in un fotogramma numerato,
+    nella cartella con il nome di `destinazione` senza estensione.
+
+    Returns:
+        int: numero di proiezioni calcolate (pose x punti).
+    """
+    punti = scena.punti_3d.array
+    centro = punti.mean(axis=0)
+    if raggio is None:
+        raggio = float(np.linalg.norm(centro)) or 1.0
+    rotazioni, traslazioni = pose_orbita(centro, raggio, n_pose, elevazione)
+
+    cam = scena.camera
+    uv = np.empty((n_pose, len(punti), 2))
+    valido = np.empty((n_pose, len(punti)), dtype=bool)
+    passo = max(1, PROIEZIONI_PER_BLOCCO // max(len(punti), 1))
+    for inizio in range(0, n_pose, passo):
+        blocco = slice(inizio, inizio + passo)
+        uv[blocco], valido[blocco] = proietta_pose(
+            punti, rotazioni[blocco], traslazioni[blocco], cam.focale, cam.cx, cam.cy,
+            cam.distorsione if cam.ha_distorsione else None,
+        )
+    np.savez(
+        destinazione, uv=uv, valido=valido, rotazioni=rotazioni, traslazioni=traslazioni,
+        intrinseci=np.array([cam.focale, cam.cx, cam.cy]), distorsione=np.array(cam.distorsione, dtype=np.float64),
+    )
+    if immagini:
+        cartella = os.path.splitext(destinazione)[0]
+        os.makedirs(cartella, exist_ok=True)
+        larghezza, altezza = dimensioni_immagine(cam)
+        coppie = scena.spigoli_manuali.indici
+        for posa in range(n_pose):
+            salva_immagine(
+                os.path.join(cartella, f"{posa:05d}.{immagini}"), disegna(uv[posa], coppie, larghezza, altezza)
+            )
+    return uv.shape[0] * uv.shape[1]
+
+
+def conflitti_uscita(file: list[str], cartella_uscita: str, pose: int | None = None) -> list[str]:
+    """Problemi dei percorsi di uscita: un file che sovrascriverebbe la sua sorgente o più file
+    che scriverebbero sulla stessa uscita (stesso nome in cartelle diverse).
+
+    Returns:
+        list[str]: messaggi, vuota se ogni file ha un'uscita distinta dalle sorgenti.
+    """
+    problemi = []
+    per_nome: dict[str, list[str]] = {}
+    for percorso in file:
+        nome = os.path.splitext(os.path.basename(percorso))[0]
+        per_nome.setdefault(os.path.normcase(nome), []).append(percorso)
+        uscita = os.path.join(cartella_uscita, os.path.basename(percorso))
+        if not pose and os.path.normcase(os.path.realpath(uscita)) == os.path.normcase(os.path.realpath(percorso)):
+            problemi.append(f"{percorso} sarebbe sovrascritto dal suo risultato: scegli un'altra cartella di uscita")
+    for stessi in per_nome.values():
+        if len(stessi) > 1:
+            problemi.append(f"stesso nome di uscita per {', '.join(stessi)}")
+    return problemi
+
+
+def elabora_file(
+    percorso: str,
+    cartella_uscita: str,
+    focale: float | None = None,
+    cx: float | None = None,
+    cy: float | None = None,
+    pose: int | None = None,
+    raggio: float | None = None,
+    elevazione: float = 0.0,
+    immagini: str | None = None,
+) -> tuple[str, int, float, str | None]:
+    """Importa una scena, applica gli intrinseci forniti, riproietta ed esporta.
+
+    Con `pose` esegue invece il giro di pose e salva `<nome>_pose.npz`. Con `immagini`
+    ("png" o "npy") salva anche `<nome>.<formato>` o, con `pose`, un fotogramma per posa.
+
+    Returns:
+        tuple: (percorso, punti (o proiezioni) elaborati, secondi impiegati, messaggio di errore o None).
+    """
+    inizio = time.perf_counter()
+    try:
+        scena = leggi_txt(percorso)
+        cam = scena.camera
+        scena.camera = replace(
+            cam,
+            focale=cam.focale if focale is None else focale,
+            cx=cam.cx if cx is None else cx,
+            cy=cam.cy if cy is None else cy,
+        )
+        nome = os.path.splitext(os.path.basename(percorso))[0]
+        if pose:
+            elaborati = giro_pose(
+                scena, os.path.join(cartella_uscita, f"{nome}_pose.npz"), pose, raggio, elevazione, immagini
+            )
+        else:
+            scena.riproietta()
+            scrivi_txt(scena, os.path.join(cartella_uscita, os.path.basename(percorso)))
+            if immagini:
+                salva_immagine(os.path.join(cartella_uscita, f"{nome}.{immagini}"), disegna_scena(scena))
+            elaborati = len(scena)
+    except Exception as e:
+        return percorso, 0, time.perf_counter() - inizio, str(e)
+    return percorso, elaborati, time.perf_counter() - inizio, None
+
+
+def esegui_batch(
+    file: list[str],
+    cartella_uscita: str,
+    focale: float | None = None,
+    cx: float | None = None,
+    cy: float | None = None,
+    processi: int | None = None,
+    pose: int | None = None,
+    raggio: float | None = None,
+    elevazione: float = 0.0,
+    immagini: str | None = None,
+) -> int:
+    """Elabora `file` in parallelo e stampa il throughput per file e complessivo.
+
+    Returns:
+        int: numero di file terminati con errore.
+    """
+    os.makedirs(cartella_uscita, exist_ok=True)
+    processi = processi or os.cpu_count() or 1
+    # Blocchi di più file per processo: con migliaia di scene piccole l'overhead di IPC domina
+    blocco = max(1, len(file) // (processi * 8))
+
+    errori = 0
+    punti_totali = 0
+    inizio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processi) as pool:
+        n = len(file)
+        risultati = pool.map(
+            elabora_file, file, [cartella_uscita] * n, [focale] * n, [cx] * n, [cy] * n,
+            [pose] * n, [raggio] * n, [elevazione] * n, [immagini] * n, chunksize=blocco,
+        )
+        for percorso, n_punti, secondi, errore in risultati:
+            if errore is not None:
+                errori += 1
+                print(f"ERRORE  {percorso}: {errore}", file=sys.stderr)
+                continue
+            punti_totali += n_punti
+            velocita = n_punti / secondi if secondi > 0 else float("inf")
+            unita = "proiezioni" if pose else "punti"
+            print(f"{percorso}: {n_punti} {unita} in {secondi * 1000:.2f} ms ({velocita:,.0f} {unita}/s)")
+
+    durata = time.perf_counter() - inizio
+    elaborati = len(file) - errori
+    print(
+        f"Totale: {elaborati}/{len(file)} file, {punti_totali} {'proiezioni' if pose else 'punti'} in {durata:.2f} s "
+        f"({elaborati / durata if durata > 0 else 0:.1f} file/s, {processi} processi)"
+    )
+    return errori
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point da riga di comando; ritorna il codice di uscita del processo."""
+    parser = argparse.ArgumentParser(
+        prog="CoordCodeBatch",
+        description="Ricalcola le proiezioni di molti file CoordCode .txt in parallelo.",
+    )
+    parser.add_argument("sorgenti", nargs="+", help="cartelle o pattern glob di file .txt")
+    parser.add_argument("-o", "--uscita", required=True, help="cartella in cui scrivere i file elaborati")
+    parser.add_argument("-f", "--focale", type=float, help="sostituisce la focale f (in pixel)")
+    parser.add_argument("--cx", type=float, help="sostituisce la coordinata u del punto principale")
+    parser.add_argument("--cy", type=float, help="sostituisce la coordinata v del punto principale")
+    parser.add_argument("-j", "--processi", type=int, help="numero di processi (predefinito: tutti i core)")
+    parser.add_argument("--pose", type=int, help="proietta ogni scena da N pose in orbita e salva <nome>_pose.npz")
+    parser.add_argument("--raggio", type=float, help="raggio dell'orbita (predefinito: distanza del baricentro dall'origine)")
+    parser.add_argument("--elevazione", type=float, default=0.0, help="elevazione dell'orbita in gradi (predefinito: 0)")
+    parser.add_argument(
+        "--immagini", choices=("png", "npy"),
+        help="salva anche le immagini di punti e spigoli (una per file o, con --pose, una per posa)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.focale is not None and not args.focale > 0:
+        parser.error("la focale deve essere > 0")
+    if args.pose is not None and not args.pose > 0:
+        parser.error("il numero di pose deve essere > 0")
+    if args.raggio is not None and not args.raggio > 0:
+        parser.error("il raggio deve essere > 0")
+
+    file = raccogli_file(args.sorgenti)
+    if not file:
+        parser.error("nessun file .txt trovato")
+    problemi = conflitti_uscita(file, args.uscita, args.pose)
+    if problemi:
+        parser.error("\n  ".join(["percorsi di uscita non validi:"] + problemi))
+
+    errori = esegui_batch(
+        file, args.uscita, args.focale, args.cx, args.cy, args.processi, args.pose, args.raggio, args.elevazione,
+        args.immagini,
+    )
+    return 1 if errori else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
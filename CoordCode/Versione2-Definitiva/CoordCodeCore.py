@@ -0,0 +1,2034 @@
+# =============================================================================
+#  CoordCodeCore — Nucleo di calcolo di CoordCode (senza interfaccia grafica)
+#  Autore: Alessio de Dato - Ingegneria Informatica UniPi
+#
+#  DESCRIZIONE GENERALE
+#  --------------------
+#  Il modulo raccoglie tutta la logica che non dipende da Tkinter/Matplotlib, così da
+#  poter essere importato anche da script batch o processi senza display:
+#   • modello della camera pinhole (f, cx, cy) con posa (R, t) e distorsione dell'obiettivo,
+#   • archivio dei punti 3D/2D e degli spigoli manuali,
+#   • proiezione vettoriale (NumPy) dei punti,
+#   • lettura/scrittura del formato .txt di CoordCode e import di mesh/nuvole di punti.
+#
+#  ORGANIZZAZIONE DEL CODICE
+#  -------------------------
+#   • proietta_punti        : proiezione vettoriale di un array Nx3 di punti 3D (con posa opzionale).
+#   • matrice_rotazione / angoli_da_rotazione
+#                           : conversione tra angoli (rx, ry, rz) in gradi e matrice R.
+#   • distorci / correggi_distorsione / tabella_correzione / raggi_da_pixel
+#                           : distorsione Brown–Conrady (k1, k2, p1, p2, k3), correzione iterativa
+#                             e tabella per-pixel (in cache) per le interrogazioni pixel → raggio.
+#   • proietta_pose / pose_orbita
+#                           : proiezione di un insieme di punti da P pose in un'unica operazione
+#                             broadcast e generazione di pose su un'orbita attorno alla scena.
+#   • Classe Camera         : parametri intrinseci (f, cx, cy) ed estrinseci (rotazione, traslazione).
+#   • Classe ArchivioPunti  : archivio colonnare crescente (float64/float32) per punti 3D o 2D.
+#   • Classe ArchivioSpigoli: archivio di coppie (i,j) 1-based senza duplicati, con array di indici.
+#   • Classe CacheProiezioni: proiezioni (u,v) derivate, per intrinseci (LRU) e riproiezione incrementale.
+#   • Classe Scena          : punti 3D, proiezioni (dalla cache), spigoli manuali, facce delle mesh
+#                             e operazioni di modifica.
+#   • leggi_txt / scrivi_txt: import/export del formato descrittivo in italiano
+#                             (lettura/scrittura a blocchi vettoriali, avanzamento, gzip/zstd).
+#   • leggi_corrispondenze  : coppie (X,Y,Z) ↔ (u,v) così come scritte in [Punti] (per la calibrazione).
+#   • leggi_vista           : camera del file più le sue coppie (X,Y,Z) ↔ (u,v) (per la triangolazione).
+#   • leggi_obj / leggi_ply / leggi_xyz / leggi_mesh
+#                           : import di mesh e nuvole di punti (OBJ, PLY ascii o binario mappato,
+#                             XYZ/CSV) direttamente negli archivi, con inquadra_camera se serve.
+#   • scrivi_binario / leggi_binario
+#                           : formato binario versionato .ccb, apribile con memory mapping.
+#   • seleziona_etichette   : level-of-detail delle etichette (culling + griglia in pixel).
+#   • ritaglia_segmenti     : ritaglio vettoriale (Liang–Barsky) di segmenti 2D a un riquadro.
+#   • Classe IndiceGriglia / IndiceSegmenti
+#                           : indici spaziali a griglia in pixel per il picking di punti e spigoli.
+# =============================================================================
+
+import gzip
+import io
+import math
+import os
+import re
+import struct
+import warnings
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+
+import numpy as np
+
+try:  # compressione zstd opzionale
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# =============================================================================
+# PROIEZIONE
+# =============================================================================
+def proietta_punti(
+    punti_3d, focale: float, cx: float, cy: float, rotazione=None, traslazione=None, distorsione=None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Proietta in un'unica operazione vettoriale un insieme di punti 3D con il modello pinhole.
+
+    Args:
+        punti_3d: array (o sequenza) di forma Nx3 con le coordinate (X,Y,Z) nel riferimento mondo.
+        focale, cx, cy: parametri intrinseci della camera (in pixel).
+        rotazione, traslazione: posa opzionale (R 3x3, t 3): i punti sono portati nel riferimento
+            camera con X_c = R·X + t prima della proiezione. Senza posa mondo e camera coincidono.
+        distorsione: coefficienti opzionali (k1, k2, p1, p2, k3) applicati alle coordinate
+            normalizzate prima degli intrinseci (vedi distorci).
+
+    Returns:
+        tuple: (uv, valido) dove `uv` è un array Nx2 di coordinate (u,v) e `valido` è una
+        maschera booleana di lunghezza N, False per i punti con Z_c <= 0 (le relative righe
+        di `uv` valgono NaN).
+    """
+    punti = np.asarray(punti_3d, dtype=np.float64).reshape(-1, 3)
+    if rotazione is not None:
+        punti = punti @ np.asarray(rotazione, dtype=np.float64).T
+    if traslazione is not None:
+        punti = punti + np.asarray(traslazione, dtype=np.float64)
+    z = punti[:, 2]
+    valido = z > 0
+
+    uv = np.full((punti.shape[0], 2), np.nan)
+    if distorsione is None:
+        inv_z = focale / z[valido]
+        uv[valido, 0] = punti[valido, 0] * inv_z + cx
+        uv[valido, 1] = punti[valido, 1] * inv_z + cy
+        return uv, valido
+
+    inv_z = 1.0 / z[valido]
+    xd, yd = distorci(punti[valido, 0] * inv_z, punti[valido, 1] * inv_z, distorsione)
+    uv[valido, 0] = focale * xd + cx
+    uv[valido, 1] = focale * yd + cy
+    return uv, valido
+
+
+def matrice_rotazione(rx: float, ry: float, rz: float) -> np.ndarray:
+    """Matrice di rotazione R = Rz·Ry·Rx dagli angoli attorno agli assi X, Y, Z (in gradi)."""
+    ax, ay, az = np.radians((rx, ry, rz))
+    ca, sa = np.cos(ax), np.sin(ax)
+    cb, sb = np.cos(ay), np.sin(ay)
+    cc, sc = np.cos(az), np.sin(az)
+    r_x = np.array([[1, 0, 0], [0, ca, -sa], [0, sa, ca]])
+    r_y = np.array([[cb, 0, sb], [0, 1, 0], [-sb, 0, cb]])
+    r_z = np.array([[cc, -sc, 0], [sc, cc, 0], [0, 0, 1]])
+    return r_z @ r_y @ r_x
+
+
+def angoli_da_rotazione(rotazione) -> tuple[float, float, float]:
+    """Inverso di matrice_rotazione: angoli (rx, ry, rz) in gradi di R = Rz·Ry·Rx."""
+    r = np.asarray(rotazione, dtype=np.float64)
+    ry = np.arcsin(np.clip(-r[2, 0], -1.0, 1.0))
+    if abs(r[2, 0]) < 1.0 - 1e-12:
+        rx = np.arctan2(r[2, 1], r[2, 2])
+        rz = np.arctan2(r[1, 0], r[0, 0])
+    else:  # blocco cardanico (ry = ±90°): solo rx ± rz è determinato, si fissa rz = 0
+        rx = np.arctan2(-r[1, 2], r[1, 1])
+        rz = 0.0
+    return tuple(float(a) for a in np.degrees((rx, ry, rz)))
+
+
+def proietta_pose(
+    punti_3d, rotazioni, traslazioni, focale: float, cx: float, cy: float, distorsione=None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Proietta gli stessi N punti da P pose con un'unica operazione broadcast (nessun ciclo sulle pose).
+
+    Args:
+        punti_3d: array Nx3 di punti nel riferimento mondo.
+        rotazioni: array Px3x3 di matrici di rotazione.
+        traslazioni: array Px3 di traslazioni (X_c = R·X + t).
+        focale, cx, cy: parametri intrinseci comuni a tutte le pose.
+        distorsione: (k1, k2, p1, p2, k3) comuni a tutte le pose, oppure None (nessuna).
+
+    Returns:
+        tuple: (uv, valido) con `uv` di forma PxNx2 (NaN dove Z_c <= 0) e `valido` PxN.
+    """
+    punti = np.asarray(punti_3d, dtype=np.float64).reshape(-1, 3)
+    rotazioni = np.asarray(rotazioni, dtype=np.float64).reshape(-1, 3, 3)
+    traslazioni = np.asarray(traslazioni, dtype=np.float64).reshape(-1, 3)
+
+    # matmul fa il broadcast sulle pose: (N,3) @ (P,3,3) -> (P,N,3)
+    camera = punti @ rotazioni.transpose(0, 2, 1) + traslazioni[:, None, :]
+    z = camera[..., 2]
+    valido = z > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xy = camera[..., :2] / z[..., None]
+    if distorsione is not None:
+        xy = np.stack(distorci(xy[..., 0], xy[..., 1], distorsione), axis=-1)
+    uv = xy * focale + (cx, cy)
+    uv[~valido] = np.nan
+    return uv, valido
+
+
+def pose_orbita(centro, raggio: float, n_pose: int, elevazione: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    """Genera `n_pose` pose equispaziate su un'orbita attorno a `centro`, tutte rivolte verso di esso.
+
+    L'orbita giace nel piano X-Z (alzata di `elevazione` gradi verso -Y); la posa 0 guarda
+    lungo +Z come la camera predefinita, quindi con centro sull'asse Z e raggio pari alla sua
+    distanza dall'origine coincide con la posa identità.
+
+    Returns:
+        tuple: (rotazioni Px3x3, traslazioni Px3), pronte per proietta_pose.
+    """
+    centro = np.asarray(centro, dtype=np.float64).reshape(3)
+    angoli = np.linspace(0.0, 2 * np.pi, n_pose, endpoint=False)
+    el = np.radians(elevazione)
+    centri = centro + raggio * np.column_stack((
+        np.cos(el) * np.sin(angoli), np.full(n_pose, -np.sin(el)), -np.cos(el) * np.cos(angoli)
+    ))
+
+    # Assi della camera (righe di R): z verso il centro, x orizzontale, y = z × x
+    asse_z = centro - centri
+    asse_z /= np.linalg.norm(asse_z, axis=1, keepdims=True)
+    asse_x = np.cross((0.0, 1.0, 0.0), asse_z)
+    asse_x /= np.linalg.norm(asse_x, axis=1, keepdims=True)
+    asse_y = np.cross(asse_z, asse_x)
+    rotazioni = np.stack((asse_x, asse_y, asse_z), axis=1)
+    traslazioni = -np.einsum("pij,pj->pi", rotazioni, centri)
+    return rotazioni, traslazioni
+
+
+# =============================================================================
+# DISTORSIONE DELL'OBIETTIVO (Brown–Conrady)
+# =============================================================================
+# Iterazioni della correzione a punto fisso: bastano per |distorsione| moderate (< ~30%)
+ITERAZIONI_CORREZIONE = 20
+
+
+def distorci(x, y, distorsione) -> tuple[np.ndarray, np.ndarray]:
+    """Applica la distorsione radiale/tangenziale a coordinate normalizzate (x = X/Z, y = Y/Z).
+
+    Con r² = x² + y²:
+        x_d = x·(1 + k1·r² + k2·r⁴ + k3·r⁶) + 2·p1·x·y + p2·(r² + 2x²)
+        y_d = y·(1 + k1·r² + k2·r⁴ + k3·r⁶) + p1·(r² + 2y²) + 2·p2·x·y
+    """
+    k1, k2, p1, p2, k3 = distorsione
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    r2 = x * x + y * y
+    radiale = 1.0 + r2 * (k1 + r2 * (k2 + r2 * k3))
+    xy = x * y
+    return (
+        x * radiale + 2.0 * p1 * xy + p2 * (r2 + 2.0 * x * x),
+        y * radiale + p1 * (r2 + 2.0 * y * y) + 2.0 * p2 * xy,
+    )
+
+
+def correggi_distorsione(xd, yd, distorsione, iterazioni: int = ITERAZIONI_CORREZIONE) -> tuple[np.ndarray, np.ndarray]:
+    """Inverte `distorci` per punto fisso (vettoriale): coordinate normalizzate distorte -> ideali."""
+    k1, k2, p1, p2, k3 = distorsione
+    xd = np.asarray(xd, dtype=np.float64)
+    yd = np.asarray(yd, dtype=np.float64)
+    x, y = xd.copy(), yd.copy()
+    for _ in range(iterazioni):
+        r2 = x * x + y * y
+        radiale = 1.0 + r2 * (k1 + r2 * (k2 + r2 * k3))
+        xy = x * y
+        x = (xd - 2.0 * p1 * xy - p2 * (r2 + 2.0 * x * x)) / radiale
+        y = (yd - p1 * (r2 + 2.0 * y * y) - 2.0 * p2 * xy) / radiale
+    return x, y
+
+
+@lru_cache(maxsize=4)
+def _tabella_correzione(focale, cx, cy, distorsione, larghezza, altezza) -> np.ndarray:
+    righe, colonne = np.mgrid[0:altezza, 0:larghezza].astype(np.float64)
+    x, y = correggi_distorsione((colonne - cx) / focale, (righe - cy) / focale, distorsione)
+    tabella = np.stack((x, y), axis=-1).astype(np.float32)
+    tabella.flags.writeable = False  # condivisa tra chiamanti: sola lettura
+    return tabella
+
+
+def tabella_correzione(camera: "Camera", larghezza: int | None = None, altezza: int | None = None) -> np.ndarray:
+    """Tabella HxWx2 (float32) delle coordinate normalizzate ideali (x, y) di ogni pixel intero.
+
+    È costruita una sola volta per terna (intrinseci, distorsione, dimensioni) e poi riusata
+    (cache LRU): le interrogazioni successive costano un'interpolazione invece delle iterazioni.
+    Senza dimensioni si assume il punto principale al centro dell'immagine (W = 2·cx, H = 2·cy).
+    """
+    larghezza = larghezza or max(1, int(round(2 * camera.cx)))
+    altezza = altezza or max(1, int(round(2 * camera.cy)))
+    return _tabella_correzione(
+        float(camera.focale), float(camera.cx), float(camera.cy),
+        tuple(map(float, camera.distorsione)), larghezza, altezza,
+    )
+
+
+def raggi_da_pixel(camera: "Camera", uv, usa_tabella: bool = True) -> np.ndarray:
+    """Direzioni (Nx3, riferimento mondo) dei raggi che escono dal centro ottico verso i pixel `uv`.
+
+    La distorsione è rimossa con la tabella per-pixel (interpolazione bilineare) per i pixel
+    interni all'immagine e con la correzione iterativa per gli altri. Le direzioni non sono
+    normalizzate: nel riferimento camera valgono (x, y, 1).
+    """
+    uv = np.asarray(uv, dtype=np.float64).reshape(-1, 2)
+    u, v = uv[:, 0], uv[:, 1]
+    x = (u - camera.cx) / camera.focale
+    y = (v - camera.cy) / camera.focale
+
+    if camera.ha_distorsione:
+        da_iterare = np.ones(len(uv), dtype=bool)
+        if usa_tabella:
+            tabella = tabella_correzione(camera)
+            altezza, larghezza = tabella.shape[:2]
+            dentro = (u >= 0) & (v >= 0) & (u <= larghezza - 1) & (v <= altezza - 1)
+            if dentro.any():
+                ui, vi = u[dentro], v[dentro]
+                c0 = np.minimum(ui.astype(np.intp), larghezza - 2).clip(0)
+                r0 = np.minimum(vi.astype(np.intp), altezza - 2).clip(0)
+                a = (ui - c0)[:, None]
+                b = (vi - r0)[:, None]
+                c1 = np.minimum(c0 + 1, larghezza - 1)
+                r1 = np.minimum(r0 + 1, altezza - 1)
+                xy = ((1 - a) * (1 - b) * tabella[r0, c0] + a * (1 - b) * tabella[r0, c1]
+                      + (1 - a) * b * tabella[r1, c0] + a * b * tabella[r1, c1])
+                x[dentro], y[dentro] = xy[:, 0], xy[:, 1]
+                da_iterare = ~dentro
+        if da_iterare.any():
+            x[da_iterare], y[da_iterare] = correggi_distorsione(x[da_iterare], y[da_iterare], camera.distorsione)
+
+    direzioni = np.column_stack((x, y, np.ones_like(x)))
+    if camera.ha_posa:
+        direzioni = direzioni @ camera.matrice_rotazione  # Rᵀ·d per ogni riga
+    return direzioni
+
+
+def seleziona_etichette(xy_schermo: np.ndarray, riquadro, cella: float, budget: int) -> np.ndarray:
+    """Sceglie quali punti etichettare alla vista corrente (level-of-detail).
+
+    Scarta i punti fuori dal `riquadro` visibile, divide lo schermo in celle quadrate di lato
+    `cella` pixel e tiene al più un punto per cella (quello di indice minore), fino a `budget`.
+    Il numero di etichette da disegnare resta così limitato qualunque sia il numero di punti.
+
+    Args:
+        xy_schermo: array Nx2 di coordinate in pixel (display) dei punti.
+        riquadro: (x0, y0, x1, y1) dell'area visibile, in pixel.
+        cella: lato della cella della griglia (≈ ingombro di un'etichetta).
+        budget: numero massimo di etichette.
+
+    Returns:
+        np.ndarray: indici (0-based, crescenti) dei punti da etichettare.
+    """
+    x0, y0, x1, y1 = riquadro
+    xy = np.asarray(xy_schermo, dtype=np.float64).reshape(-1, 2)
+    dentro = np.flatnonzero(
+        (xy[:, 0] >= x0) & (xy[:, 0] <= x1) & (xy[:, 1] >= y0) & (xy[:, 1] <= y1)
+    )
+    if dentro.size == 0 or budget <= 0:
+        return dentro[:0]
+
+    colonne_griglia = int((x1 - x0) // cella) + 1
+    celle = ((xy[dentro, 1] - y0) // cella).astype(np.int64) * colonne_griglia
+    celle += ((xy[dentro, 0] - x0) // cella).astype(np.int64)
+    _, primi = np.unique(celle, return_index=True)  # primo punto (indice minore) per cella
+    return dentro[np.sort(primi)[:budget]]
+
+
+def ritaglia_segmenti(a: np.ndarray, d: np.ndarray, riquadro) -> tuple[np.ndarray, np.ndarray]:
+    """Liang–Barsky vettoriale: intervallo [t0, t1] di ogni segmento a + t·d interno al riquadro.
+
+    Args:
+        a, d: array Sx2 di punti iniziali e direzioni (fine - inizio) dei segmenti.
+        riquadro: (x0, y0, x1, y1).
+
+    Returns:
+        tuple: (t0, t1) di lunghezza S; t1 < t0 per i segmenti interamente fuori dal riquadro.
+    """
+    x0, y0, x1, y1 = riquadro
+    t0, t1 = np.zeros(len(a)), np.ones(len(a))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for asse, (minimo, massimo) in enumerate(((x0, x1), (y0, y1))):
+            p, q = d[:, asse], a[:, asse]
+            ingresso = np.where(p != 0, (np.where(p > 0, minimo, massimo) - q) / p, -np.inf)
+            uscita = np.where(p != 0, (np.where(p > 0, massimo, minimo) - q) / p, np.inf)
+            fuori = (p == 0) & ((q < minimo) | (q > massimo))
+            t0 = np.maximum(t0, ingresso)
+            t1 = np.where(fuori, -1.0, np.minimum(t1, uscita))
+    return t0, t1
+
+
+# Punti aggiunti dopo la costruzione tenuti in una coda a scansione lineare: oltre questa
+# soglia (o 1/8 dei punti indicizzati) l'indice viene riordinato
+CODA_MASSIMA_INDICE = 4096
+# Campioni massimi dell'indice dei segmenti: oltre, il passo di campionamento (e la cella) cresce
+CAMPIONI_MASSIMI_SEGMENTI = 1 << 21
+
+
+class IndiceGriglia:
+    """Indice spaziale a griglia uniforme su punti 2D (coordinate schermo, in pixel).
+
+    I punti sono ordinati per chiave di cella (colonna·righe + riga): le celle di una stessa
+    colonna sono contigue, quindi un'interrogazione su un raggio non più grande della cella
+    costa al più tre ricerche binarie più le distanze dei pochi candidati, qualunque sia N.
+    I punti aggiunti con `estendi` finiscono in una coda scandita linearmente e vengono
+    incorporati (riordinando) quando la coda cresce; i punti non finiti sono ignorati.
+    """
+
+    def __init__(self, xy, cella: float, identificativi=None) -> None:
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        identificativi = np.arange(len(xy)) if identificativi is None else np.asarray(identificativi)
+        self.cella = float(cella)
+        self._costruisci(xy, identificativi)
+
+    def _costruisci(self, xy: np.ndarray, identificativi: np.ndarray) -> None:
+        finiti = np.isfinite(xy).all(axis=1)
+        if not finiti.all():
+            xy, identificativi = xy[finiti], identificativi[finiti]
+        celle = np.floor(xy / self.cella).astype(np.int64)
+        self.origine = celle.min(axis=0) if len(celle) else np.zeros(2, dtype=np.int64)
+        celle -= self.origine
+        self.righe = int(celle[:, 1].max()) + 1 if len(celle) else 1
+        self.colonne = int(celle[:, 0].max()) + 1 if len(celle) else 1
+        chiavi = celle[:, 0] * self.righe + celle[:, 1]
+        ordine = np.argsort(chiavi)  # l'ordine dentro una cella è irrilevante: niente sort stabile
+        self.chiavi = chiavi[ordine]
+        self.xy = xy[ordine]
+        self.identificativi = identificativi[ordine]
+        self.coda_xy = np.empty((0, 2))
+        self.coda_identificativi = identificativi[:0]
+
+    def __len__(self) -> int:
+        return len(self.xy) + len(self.coda_xy)
+
+    def estendi(self, xy, identificativi) -> None:
+        """Aggiunge punti all'indice (in coda; riordino completo quando la coda supera la soglia)."""
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        finiti = np.isfinite(xy).all(axis=1)
+        self.coda_xy = np.concatenate((self.coda_xy, xy[finiti]))
+        self.coda_identificativi = np.concatenate((self.coda_identificativi, np.asarray(identificativi)[finiti]))
+        if len(self.coda_xy) > max(CODA_MASSIMA_INDICE, len(self.xy) // 8):
+            self._costruisci(
+                np.concatenate((self.xy, self.coda_xy)),
+                np.concatenate((self.identificativi, self.coda_identificativi)),
+            )
+
+    def vicini(self, punto, raggio: float) -> tuple[np.ndarray, np.ndarray]:
+        """Punti entro `raggio` pixel da `punto`.
+
+        Returns:
+            tuple: (identificativi, distanze) dei punti trovati, in ordine qualsiasi.
+        """
+        px, py = float(punto[0]), float(punto[1])
+        c0 = math.floor((px - raggio) / self.cella) - self.origine[0]
+        c1 = math.floor((px + raggio) / self.cella) - self.origine[0]
+        r0 = max(math.floor((py - raggio) / self.cella) - self.origine[1], 0)
+        r1 = min(math.floor((py + raggio) / self.cella) - self.origine[1], self.righe - 1)
+        blocchi_xy = [self.coda_xy]
+        blocchi_id = [self.coda_identificativi]
+        if r0 <= r1:
+            for c in range(max(c0, 0), min(c1, self.colonne - 1) + 1):
+                i, j = np.searchsorted(self.chiavi, (c * self.righe + r0, c * self.righe + r1 + 1))
+                if j > i:
+                    blocchi_xy.append(self.xy[i:j])
+                    blocchi_id.append(self.identificativi[i:j])
+        candidati = np.concatenate(blocchi_xy)
+        distanze = np.hypot(candidati[:, 0] - px, candidati[:, 1] - py)
+        entro = distanze <= raggio
+        return np.concatenate(blocchi_id)[entro], distanze[entro]
+
+    def piu_vicino(self, punto, raggio: float) -> tuple[int, float] | None:
+        """(identificativo, distanza) del punto più vicino entro `raggio`, o None."""
+        identificativi, distanze = self.vicini(punto, raggio)
+        if not len(distanze):
+            return None
+        k = int(np.argmin(distanze))
+        return int(identificativi[k]), float(distanze[k])
+
+
+class IndiceSegmenti:
+    """Indice per il segmento più vicino a un punto dello schermo.
+
+    Ogni segmento, ritagliato al `riquadro` visibile, è diviso in tratti non più lunghi della
+    cella e i punti medi dei tratti sono indicizzati con IndiceGriglia: un punto a distanza d
+    da un segmento ha un campione entro d + cella/2, così i candidati sono pochi e la distanza
+    esatta si calcola solo su di essi. Se i segmenti visibili sono molto lunghi la cella è
+    allargata fino a restare entro CAMPIONI_MASSIMI_SEGMENTI campioni.
+    """
+
+    def __init__(self, segmenti, cella: float, riquadro=None) -> None:
+        self.segmenti = np.asarray(segmenti, dtype=np.float64).reshape(-1, 2, 2)
+        self.cella = float(cella)
+        self.riquadro = riquadro
+        xy, quali, lunghezza = self._campioni(self.segmenti)
+        if lunghezza > self.cella * CAMPIONI_MASSIMI_SEGMENTI:
+            self.cella = lunghezza / CAMPIONI_MASSIMI_SEGMENTI
+            xy, quali, _ = self._campioni(self.segmenti)
+        self.griglia = IndiceGriglia(xy, self.cella, quali)
+
+    def _campioni(self, segmenti: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+        """Punti medi dei tratti (lunghi al più una cella) delle parti visibili dei segmenti.
+
+        Returns:
+            tuple: (campioni Mx2, indice del segmento di ciascun campione, lunghezza visibile totale).
+        """
+        a, b = segmenti[:, 0], segmenti[:, 1]
+        t0, t1 = np.zeros(len(segmenti)), np.ones(len(segmenti))
+        if self.riquadro is not None:
+            t0, t1 = ritaglia_segmenti(a, b - a, self.riquadro)
+        with np.errstate(invalid="ignore"):
+            visibili = np.flatnonzero(np.isfinite(segmenti).all(axis=(1, 2)) & (t1 >= t0))
+        a, d, t0, t1 = a[visibili], b[visibili] - a[visibili], t0[visibili], t1[visibili]
+        lunghezze = np.hypot(d[:, 0], d[:, 1]) * (t1 - t0)
+        campioni = np.maximum(np.ceil(lunghezze / self.cella).astype(np.int64), 1)
+        quale = np.repeat(np.arange(len(visibili)), campioni)
+        # Punto medio del tratto k: (k + 1/2)/campioni nell'intervallo [t0, t1]
+        k = np.arange(len(quale)) - np.repeat(np.cumsum(campioni) - campioni, campioni)
+        t = t0[quale] + (k + 0.5) / campioni[quale] * (t1 - t0)[quale]
+        return a[quale] + t[:, None] * d[quale], visibili[quale], float(lunghezze.sum())
+
+    def __len__(self) -> int:
+        return len(self.segmenti)
+
+    def estendi(self, segmenti) -> None:
+        """Aggiunge segmenti (indici successivi agli esistenti) campionandoli con la cella corrente."""
+        segmenti = np.asarray(segmenti, dtype=np.float64).reshape(-1, 2, 2)
+        xy, quali, _ = self._campioni(segmenti)
+        self.griglia.estendi(xy, quali + len(self.segmenti))
+        self.segmenti = np.concatenate((self.segmenti, segmenti))
+
+    def piu_vicino(self, punto, raggio: float) -> tuple[int, float] | None:
+        """(indice, distanza) del segmento più vicino entro `raggio` pixel, o None."""
+        candidati, _ = self.griglia.vicini(punto, raggio + self.cella / 2)
+        if not len(candidati):
+            return None
+        candidati = np.unique(candidati)
+        a, b = self.segmenti[candidati, 0], self.segmenti[candidati, 1]
+        d = b - a
+        p = np.asarray(punto, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.clip(np.nan_to_num(np.sum((p - a) * d, axis=1) / np.sum(d * d, axis=1)), 0.0, 1.0)
+        distanze = np.linalg.norm(a + t[:, None] * d - p, axis=1)
+        k = int(np.argmin(distanze))
+        if distanze[k] > raggio:
+            return None
+        return int(candidati[k]), float(distanze[k])
+
+
+# =============================================================================
+# MODELLO DATI
+# =============================================================================
+class ArchivioPunti:
+    """Archivio colonnare e crescente di punti a dimensione fissa (3 per (X,Y,Z), 2 per (u,v)).
+
+    I dati sono in un unico array contiguo di forma (dimensione, capacità): ogni coordinata
+    occupa una riga contigua, quindi `colonne` e `array` sono viste senza copia. La capacità
+    raddoppia quando piena (append a costo ammortizzato costante); l'accesso per indice è O(1).
+    """
+
+    def __init__(self, dimensione: int, dtype=np.float64, capacita: int = 16) -> None:
+        self._dati = np.empty((dimensione, max(1, capacita)), dtype=dtype)
+        self._n = 0
+        # Incrementata da ogni modifica che non è un semplice append (sostituisci, svuota):
+        # chi deriva dati dall'archivio può così ricalcolare solo i punti accodati
+        self.generazione = 0
+
+    @classmethod
+    def da_array(cls, righe, dimensione: int | None = None, dtype=np.float64) -> "ArchivioPunti":
+        """Crea un archivio a partire da un array (o sequenza) Nxdimensione."""
+        righe = np.asarray(righe, dtype=dtype)
+        if dimensione is not None:
+            righe = righe.reshape(-1, dimensione)
+        archivio = cls(righe.shape[1], dtype=dtype, capacita=righe.shape[0])
+        archivio.estendi(righe)
+        return archivio
+
+    @classmethod
+    def da_colonne(cls, colonne: np.ndarray) -> "ArchivioPunti":
+        """Adotta senza copia un array (dimensione, N) come buffer pieno (es. un np.memmap).
+
+        Il primo append successivo rialloca il buffer in memoria; usare memmap in modalità
+        copy-on-write ("c") se il contenuto può essere modificato in place.
+        """
+        archivio = cls.__new__(cls)
+        archivio._dati = colonne
+        archivio._n = colonne.shape[1]
+        archivio.generazione = 0
+        return archivio
+
+    @property
+    def dimensione(self) -> int:
+        return self._dati.shape[0]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dati.dtype
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria occupata dal buffer (capacità inclusa)."""
+        return self._dati.nbytes
+
+    @property
+    def colonne(self) -> np.ndarray:
+        """Vista (dimensione, N): `xs, ys, zs = archivio.colonne` senza copie."""
+        return self._dati[:, :self._n]
+
+    @property
+    def array(self) -> np.ndarray:
+        """Vista Nxdimensione (trasposta, senza copia) adatta a proiezione e calcoli vettoriali."""
+        return self._dati[:, :self._n].T
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, k: int) -> tuple[float, ...]:
+        if k < 0:
+            k += self._n
+        if not 0 <= k < self._n:
+            raise IndexError("indice del punto fuori intervallo")
+        return tuple(self._dati[:, k].tolist())
+
+    def __iter__(self):
+        return iter(map(tuple, self.array.tolist()))
+
+    def _riserva(self, richiesti: int) -> None:
+        """Garantisce spazio per `richiesti` punti raddoppiando la capacità se necessario."""
+        capacita = self._dati.shape[1]
+        if richiesti <= capacita:
+            return
+        capacita = max(capacita, 1)  # un buffer adottato da da_colonne può essere vuoto
+        while capacita < richiesti:
+            capacita *= 2
+        nuovi = np.empty((self.dimensione, capacita), dtype=self._dati.dtype)
+        nuovi[:, :self._n] = self._dati[:, :self._n]
+        self._dati = nuovi
+
+    def aggiungi(self, *coordinate: float) -> None:
+        """Accoda un punto (es. `aggiungi(x, y, z)`)."""
+        if len(coordinate) != self.dimensione:
+            raise ValueError(f"Attese {self.dimensione} coordinate, ricevute {len(coordinate)}.")
+        self._riserva(self._n + 1)
+        self._dati[:, self._n] = coordinate
+        self._n += 1
+
+    def estendi(self, righe) -> None:
+        """Accoda in blocco un array Nxdimensione."""
+        righe = np.asarray(righe, dtype=self._dati.dtype).reshape(-1, self.dimensione)
+        self._riserva(self._n + righe.shape[0])
+        self._dati[:, self._n:self._n + righe.shape[0]] = righe.T
+        self._n += righe.shape[0]
+
+    def sostituisci(self, righe) -> None:
+        """Sostituisce l'intero contenuto con l'array Nxdimensione fornito."""
+        self.svuota()
+        self.estendi(righe)
+
+    def svuota(self) -> None:
+        """Elimina tutti i punti (la capacità allocata resta disponibile)."""
+        self._n = 0
+        self.generazione += 1
+
+
+@dataclass
+class Camera:
+    """Camera pinhole: intrinseci (in pixel) e posa nel riferimento mondo.
+
+    La posa porta un punto mondo X nel riferimento camera con X_c = R·X + t, dove R è data
+    dagli angoli `rotazione` (rx, ry, rz in gradi, vedi matrice_rotazione). Con la posa nulla
+    predefinita la camera è nell'origine e guarda lungo +Z. `distorsione` contiene i
+    coefficienti Brown–Conrady (k1, k2, p1, p2, k3), nulli per una camera pinhole ideale.
+    """
+
+    focale: float
+    cx: float
+    cy: float
+    rotazione: tuple[float, float, float] = (0.0, 0.0, 0.0)     # (rx, ry, rz) in gradi
+    traslazione: tuple[float, float, float] = (0.0, 0.0, 0.0)   # t = (tx, ty, tz)
+    distorsione: tuple[float, float, float, float, float] = (0.0, 0.0, 0.0, 0.0, 0.0)  # (k1, k2, p1, p2, k3)
+
+    @property
+    def ha_posa(self) -> bool:
+        """True se la posa non è quella nulla (camera nell'origine, allineata agli assi)."""
+        return any(self.rotazione) or any(self.traslazione)
+
+    @property
+    def ha_distorsione(self) -> bool:
+        return any(self.distorsione)
+
+    @property
+    def matrice_rotazione(self) -> np.ndarray:
+        return matrice_rotazione(*self.rotazione)
+
+    @property
+    def centro(self) -> np.ndarray:
+        """Posizione del centro ottico nel riferimento mondo (C = -Rᵀ·t)."""
+        return -self.matrice_rotazione.T @ np.asarray(self.traslazione, dtype=np.float64)
+
+    def proietta(self, punti_3d) -> tuple[np.ndarray, np.ndarray]:
+        """proietta_punti con intrinseci, posa e distorsione di questa camera."""
+        return proietta_punti(
+            punti_3d, self.focale, self.cx, self.cy,
+            self.matrice_rotazione if self.ha_posa else None,
+            self.traslazione if self.ha_posa else None,
+            self.distorsione if self.ha_distorsione else None,
+        )
+
+    def profondita(self, punti_3d) -> np.ndarray:
+        """Coordinata Z nel riferimento camera (Z_c di X_c = R·X + t) di un array Nx3 di punti."""
+        punti = np.asarray(punti_3d, dtype=np.float64).reshape(-1, 3)
+        if not self.ha_posa:
+            return punti[:, 2].copy()
+        return punti @ self.matrice_rotazione[2] + self.traslazione[2]
+
+    def descrizione(self) -> str:
+        """Stringa compatta con gli intrinseci (e la posa, se presente), usata nelle etichette della GUI."""
+        testo = f"f={self.focale:.4g}, cx={self.cx:.4g}, cy={self.cy:.4g}"
+        if self.ha_posa:
+            rx, ry, rz = self.rotazione
+            tx, ty, tz = self.traslazione
+            testo += f", R=({rx:.4g}°, {ry:.4g}°, {rz:.4g}°), t=({tx:.4g}, {ty:.4g}, {tz:.4g})"
+        if self.ha_distorsione:
+            testo += ", k=(" + ", ".join(f"{k:.3g}" for k in self.distorsione) + ")"
+        return testo
+
+
+# Blocchi di spigoli confrontati (e aggiunti) sempre tramite il set delle coppie; oltre, e se
+# grandi rispetto all'archivio, il confronto è vettoriale e il set viene ricostruito pigramente
+BLOCCO_MASSIMO_SET_SPIGOLI = 4096
+
+
+class ArchivioSpigoli(ArchivioPunti):
+    """Archivio di spigoli non orientati (i,j) 1-based, normalizzati con i < j e senza duplicati.
+
+    Oltre al buffer intero (per ottenere con `indici` l'array Ex2 da usare come indice negli
+    archivi dei punti) mantiene un set delle coppie presenti: il controllo dei duplicati è O(1).
+    """
+
+    def __init__(self, capacita: int = 16) -> None:
+        super().__init__(2, dtype=np.int64, capacita=capacita)
+        self._chiavi: set[tuple[int, int]] | None = set()
+
+    @classmethod
+    def da_colonne(cls, colonne: np.ndarray) -> "ArchivioSpigoli":
+        """Adotta un array (2, E) già normalizzato; il set delle coppie è costruito solo al primo uso."""
+        archivio = super().da_colonne(colonne)
+        archivio._chiavi = None
+        return archivio
+
+    @property
+    def chiavi(self) -> set[tuple[int, int]]:
+        """Set delle coppie presenti (costruito pigramente per gli archivi adottati da file)."""
+        if self._chiavi is None:
+            self._chiavi = set(map(tuple, self.array.tolist()))
+        return self._chiavi
+
+    @classmethod
+    def da_array(cls, coppie, dimensione: int | None = None, dtype=np.int64) -> "ArchivioSpigoli":
+        coppie = np.asarray(coppie, dtype=np.int64).reshape(-1, 2)
+        archivio = cls(capacita=coppie.shape[0])
+        archivio.estendi(coppie)
+        return archivio
+
+    @property
+    def indici(self) -> np.ndarray:
+        """Array Ex2 di indici 0-based, pronto per indicizzare `ArchivioPunti.array`."""
+        return self.array - 1
+
+    def __contains__(self, chiave) -> bool:
+        i, j = chiave
+        return (min(i, j), max(i, j)) in self.chiavi
+
+    def aggiungi(self, i: int, j: int) -> bool:
+        """Accoda lo spigolo (i,j); ritorna False se è un anello (i == j) o se è già presente."""
+        chiave = (min(i, j), max(i, j))
+        if i == j or chiave in self.chiavi:
+            return False
+        super().aggiungi(*chiave)
+        self.chiavi.add(chiave)
+        return True
+
+    def estendi(self, coppie) -> None:
+        """Accoda in blocco un array Ex2, scartando anelli e duplicati (mantiene il primo arrivato).
+
+        Un blocco piccolo rispetto all'archivio è confrontato con il set delle coppie (costo
+        proporzionale al blocco, anche per letture a blocchi ripetute); uno grande in modo
+        vettoriale (chiavi scalari + np.isin), e il set viene scartato e ricostruito pigramente.
+        """
+        coppie = np.sort(np.asarray(coppie, dtype=np.int64).reshape(-1, 2), axis=1)
+        coppie = coppie[coppie[:, 0] != coppie[:, 1]]
+        # Chiave scalare per coppia: np.unique 1D è molto più rapido di np.unique(axis=0)
+        chiavi_nuove = (coppie[:, 0] << 32) | coppie[:, 1]
+        _, primi = np.unique(chiavi_nuove, return_index=True)
+        primi.sort()
+        coppie, chiavi_nuove = coppie[primi], chiavi_nuove[primi]
+        piccolo = len(coppie) <= max(BLOCCO_MASSIMO_SET_SPIGOLI, self._n // 8)
+        if self._n and piccolo:
+            chiavi = self.chiavi
+            nuove = [chiave not in chiavi for chiave in map(tuple, coppie.tolist())]
+            coppie = coppie[np.asarray(nuove, dtype=bool)]
+        elif self._n:
+            presenti = self.array
+            coppie = coppie[~np.isin(chiavi_nuove, (presenti[:, 0] << 32) | presenti[:, 1])]
+        super().estendi(coppie)
+        if self._chiavi is not None:
+            if piccolo:
+                self._chiavi.update(map(tuple, coppie.tolist()))
+            else:
+                self._chiavi = None
+
+    def sostituisci(self, coppie) -> None:
+        self.svuota()
+        self.estendi(coppie)
+
+    def pop(self) -> tuple[int, int]:
+        """Rimuove e ritorna l'ultimo spigolo inserito."""
+        ultimo = self[-1]
+        self._n -= 1
+        self.generazione += 1
+        if self._chiavi is not None:
+            self._chiavi.discard(ultimo)
+        return ultimo
+
+    def svuota(self) -> None:
+        super().svuota()
+        self._chiavi = set()
+
+
+# Terne di intrinseci le cui proiezioni restano in memoria (alternare camere recenti è immediato)
+CAPIENZA_CACHE_PROIEZIONI = 4
+
+
+class CacheProiezioni:
+    """Proiezioni (u,v) di un archivio di punti 3D, derivate e memorizzate per camera (intrinseci e posa).
+
+    Ogni voce ricorda l'archivio 3D e la sua `generazione` al momento del calcolo: se l'archivio
+    è stato sostituito o svuotato la voce è ricalcolata per intero, se è soltanto cresciuto si
+    proiettano i soli punti accodati. Le voci sono tenute in ordine LRU, al più `capienza`.
+    """
+
+    def __init__(self, capienza: int = CAPIENZA_CACHE_PROIEZIONI) -> None:
+        self.capienza = capienza
+        self._voci: OrderedDict[tuple[float, ...], tuple[ArchivioPunti, int, ArchivioPunti]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._voci)
+
+    @staticmethod
+    def chiave(camera: Camera) -> tuple[float, ...]:
+        return tuple(map(float, (
+            camera.focale, camera.cx, camera.cy, *camera.rotazione, *camera.traslazione, *camera.distorsione
+        )))
+
+    def _memorizza(self, chiave, punti_3d: ArchivioPunti, uv: ArchivioPunti) -> ArchivioPunti:
+        self._voci[chiave] = (punti_3d, punti_3d.generazione, uv)
+        self._voci.move_to_end(chiave)
+        while len(self._voci) > self.capienza:
+            self._voci.popitem(last=False)
+        return uv
+
+    def inserisci(self, camera: Camera, punti_3d: ArchivioPunti, uv) -> None:
+        """Registra proiezioni già calcolate (es. durante la validazione di un import o da file .ccb).
+
+        `uv` può essere un ArchivioPunti (adottato così com'è) o un array Nx2.
+        """
+        if not isinstance(uv, ArchivioPunti):
+            uv = ArchivioPunti.da_array(uv, dimensione=2, dtype=punti_3d.dtype)
+        self._memorizza(self.chiave(camera), punti_3d, uv)
+
+    def proiezioni(self, camera: Camera, punti_3d: ArchivioPunti) -> ArchivioPunti:
+        """Ritorna le proiezioni aggiornate di `punti_3d` con `camera`, ricalcolando il minimo."""
+        chiave = self.chiave(camera)
+        voce = self._voci.get(chiave)
+        n = len(punti_3d)
+        if voce is not None:
+            archivio, generazione, uv = voce
+            if archivio is punti_3d and generazione == punti_3d.generazione and len(uv) <= n:
+                if len(uv) < n:  # solo i punti accodati dall'ultimo calcolo
+                    nuovi, _ = camera.proietta(punti_3d.array[len(uv):])
+                    uv.estendi(nuovi)
+                self._voci.move_to_end(chiave)
+                return uv
+        nuovi, _ = camera.proietta(punti_3d.array)
+        return self._memorizza(chiave, punti_3d, ArchivioPunti.da_array(nuovi, dimensione=2, dtype=punti_3d.dtype))
+
+    def svuota(self) -> None:
+        self._voci.clear()
+
+
+@dataclass
+class Scena:
+    """Stato completo di una sessione: camera, punti 3D, proiezioni (u,v) e spigoli manuali.
+
+    Le proiezioni non sono memorizzate ma derivate da `punti_3d` e `camera` tramite la cache:
+    cambiare camera (anche sostituendo `camera`) o accodare punti le aggiorna alla lettura.
+    Gli indici degli spigoli sono 1-based, come nella tabella e nel file .txt.
+    `facce` contiene i triangoli (i,j,k) 1-based delle mesh importate, usati solo per
+    l'occlusione nella vista 2D (non sono salvati nei formati .txt/.ccb).
+    """
+
+    camera: Camera
+    punti_3d: ArchivioPunti = field(default_factory=lambda: ArchivioPunti(3))   # punti (X,Y,Z)
+    spigoli_manuali: ArchivioSpigoli = field(default_factory=ArchivioSpigoli)  # coppie (i,j) 1-based
+    facce: ArchivioPunti = field(default_factory=lambda: ArchivioPunti(3, dtype=np.int64))  # triangoli (i,j,k) 1-based
+    proiezioni: CacheProiezioni = field(default_factory=CacheProiezioni, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.punti_3d)
+
+    @property
+    def punti_2d(self) -> ArchivioPunti:
+        """Proiezioni (u,v) dei punti con gli intrinseci correnti (da non modificare direttamente)."""
+        return self.proiezioni.proiezioni(self.camera, self.punti_3d)
+
+    def proietta_punto(self, x: float, y: float, z: float) -> tuple[float, float]:
+        """Ritorna la proiezione (u,v) del punto 3D (x,y,z) con intrinseci e posa della scena.
+
+        Raises:
+            ValueError: se Z <= 0 nel riferimento camera (punto dietro la camera).
+        """
+        uv, valido = self.camera.proietta((x, y, z))
+        if not valido[0]:
+            raise ValueError("Z deve essere > 0 (il punto deve trovarsi davanti alla camera).")
+        return float(uv[0, 0]), float(uv[0, 1])
+
+    def riproietta(self) -> None:
+        """Aggiorna le proiezioni (u,v) con gli intrinseci correnti della scena.
+
+        Il calcolo avviene solo se la cache non ha già la camera corrente (intrinseci, posa e
+        distorsione, vedi CacheProiezioni.chiave).
+
+        Raises:
+            ValueError: se qualche punto ha Z <= 0.
+        """
+        if np.isnan(self.punti_2d.array).any():
+            raise ValueError("Z deve essere > 0 (il punto deve trovarsi davanti alla camera).")
+
+    def aggiungi_punto(self, x: float, y: float, z: float) -> tuple[float, float]:
+        """Proietta e memorizza un nuovo punto; ritorna la sua proiezione (u,v).
+
+        La cache delle proiezioni lo proietterà (da solo) alla prossima lettura di `punti_2d`.
+        """
+        u, v = self.proietta_punto(x, y, z)
+        self.punti_3d.aggiungi(x, y, z)
+        return u, v
+
+    def aggiungi_spigolo(self, i: int, j: int) -> tuple[int, int]:
+        """Aggiunge lo spigolo non orientato (i,j) 1-based e ritorna la chiave normalizzata.
+
+        Raises:
+            ValueError: se gli indici sono fuori intervallo, coincidenti o già collegati.
+        """
+        n = len(self.punti_3d)
+        if not (1 <= i <= n and 1 <= j <= n):
+            raise ValueError(f"Gli indici devono essere tra 1 e {n}.")
+        if i == j:
+            raise ValueError("Scegli due punti diversi.")
+        if not self.spigoli_manuali.aggiungi(i, j):  # spigolo non orientato (evita duplicati)
+            raise ValueError(f"Lo spigolo {i}-{j} è già stato aggiunto.")
+        return (min(i, j), max(i, j))
+
+    def aggiungi_spigoli(self, coppie) -> int:
+        """Aggiunge in blocco un array Ex2 di spigoli (i,j) 1-based; ritorna quanti erano nuovi.
+
+        Anelli e spigoli già presenti sono scartati senza errore (utile per i grafi generati).
+
+        Raises:
+            ValueError: se qualche indice è fuori intervallo.
+        """
+        coppie = np.asarray(coppie, dtype=np.int64).reshape(-1, 2)
+        n = len(self.punti_3d)
+        if len(coppie) and (coppie.min() < 1 or coppie.max() > n):
+            raise ValueError(f"Gli indici devono essere tra 1 e {n}.")
+        prima = len(self.spigoli_manuali)
+        self.spigoli_manuali.estendi(coppie)
+        return len(self.spigoli_manuali) - prima
+
+    def annulla_spigolo(self) -> tuple[int, int] | None:
+        """Rimuove e ritorna l'ultimo spigolo manuale (None se non ce ne sono)."""
+        return self.spigoli_manuali.pop() if self.spigoli_manuali else None
+
+    def svuota_spigoli(self) -> None:
+        """Cancella tutti gli spigoli manuali."""
+        self.spigoli_manuali.svuota()
+
+    def copia(self) -> "Scena":
+        """Copia indipendente della scena (es. da consegnare a un thread di esportazione).
+
+        Le proiezioni correnti sono copiate nella cache della copia, che non le ricalcola.
+        """
+        copia = Scena(
+            replace(self.camera),
+            ArchivioPunti.da_array(self.punti_3d.array, dtype=self.punti_3d.dtype),
+            ArchivioSpigoli.da_array(self.spigoli_manuali.array),
+            ArchivioPunti.da_array(self.facce.array, dimensione=3, dtype=np.int64),
+        )
+        copia.proiezioni.inserisci(copia.camera, copia.punti_3d, self.punti_2d.array)
+        return copia
+
+    def svuota(self) -> None:
+        """Pulisce punti, spigoli e facce mantenendo la camera."""
+        self.punti_3d.svuota()
+        self.spigoli_manuali.svuota()
+        self.facce.svuota()
+        self.proiezioni.svuota()
+
+
+# =============================================================================
+# IMPORT / EXPORT .TXT
+# =============================================================================
+def _compressione_da_percorso(percorso: str) -> str | None:
+    """Deduce la compressione dall'estensione: ".gz" -> "gzip", ".zst" -> "zstd", altrimenti None."""
+    estensione = os.path.splitext(percorso)[1].lower()
+    return {".gz": "gzip", ".zst": "zstd", ".zstd": "zstd"}.get(estensione)
+
+
+@contextmanager
+def _apri_flusso(percorso: str, modalita: str, compressione: str | None):
+    """Apre `percorso` in modalità binaria ("rb"/"wb"), eventualmente (de)compresso.
+
+    Yields:
+        tuple: (flusso dei dati non compressi, file grezzo su disco per la posizione reale).
+    """
+    with open(percorso, modalita) as grezzo:
+        if compressione is None:
+            yield grezzo, grezzo
+        elif compressione == "gzip":
+            # Livello 6: quasi lo stesso rapporto del 9 a una frazione del costo
+            with gzip.GzipFile(fileobj=grezzo, mode=modalita, compresslevel=6) as flusso:
+                yield flusso, grezzo
+        elif compressione == "zstd":
+            if zstandard is None:
+                raise ValueError("Compressione zstd non disponibile: installare il pacchetto 'zstandard'.")
+            if modalita == "rb":
+                flusso = zstandard.ZstdDecompressor().stream_reader(grezzo, closefd=False)
+            else:
+                flusso = zstandard.ZstdCompressor().stream_writer(grezzo, closefd=False)
+            with flusso:
+                yield flusso, grezzo
+        else:
+            raise ValueError(f"Compressione non supportata: {compressione}.")
+
+
+# Riga di [Punti]/[SpigoliManuali] in stile printf: identica alle f-string storiche
+# (f"{i:>2})  X={x:<10.6g} ..."), ma formattabile per blocchi con un solo operatore %
+_FORMATO_PUNTO = "  %2d)  X=%-10.6g Y=%-10.6g Z=%-10.6g  ==>  u=%-10.4f v=%.4f\n"
+_FORMATO_SPIGOLO = "  (%d, %d)\n"
+
+
+def scrivi_txt(
+    scena: Scena,
+    percorso: str,
+    compressione: str | None = "auto",
+    avanzamento=None,
+    righe_per_blocco: int = 50_000,
+) -> None:
+    """Scrive su .txt intrinseci, punti (X,Y,Z,u,v) e spigoli manuali con formato leggibile.
+
+    Punti e spigoli sono formattati a blocchi di `righe_per_blocco` righe (una sola
+    formattazione % per blocco) e scritti con un'unica write per blocco. Il testo prodotto è
+    identico a quello della scrittura riga per riga.
+
+    Args:
+        scena: scena da esportare.
+        percorso: file di destinazione.
+        compressione: None, "gzip" o "zstd"; "auto" la deduce dall'estensione (.gz, .zst).
+        avanzamento: callback opzionale `avanzamento(righe_scritte, righe_totali)`.
+        righe_per_blocco: righe formattate per ogni blocco.
+    """
+    if compressione == "auto":
+        compressione = _compressione_da_percorso(percorso)
+    cam = scena.camera
+    n, e = len(scena.punti_3d), len(scena.spigoli_manuali)
+    totale = n + e
+
+    intestazione = (
+        "==================== COORDCODE — ESPORTAZIONE DATI ====================\n"
+        "Descrizione: punti 3D, proiezioni (u,v) sul piano immagine e collegamenti definiti dall’utente.\n"
+        "Nota: i punti sono elencati nell’ordine di inserimento; le coordinate u,v sono in pixel.\n\n"
+        "[Camera]\n"
+        f"  f  = {cam.focale:.6g}        # focale in pixel\n"
+        f"  cx = {cam.cx:.6g}        # coordinata u del punto principale\n"
+        f"  cy = {cam.cy:.6g}        # coordinata v del punto principale\n"
+        + (
+            f"  rx = {cam.rotazione[0]:.6g}        # rotazione attorno a X (gradi)\n"
+            f"  ry = {cam.rotazione[1]:.6g}        # rotazione attorno a Y (gradi)\n"
+            f"  rz = {cam.rotazione[2]:.6g}        # rotazione attorno a Z (gradi)\n"
+            f"  tx = {cam.traslazione[0]:.6g}        # traslazione (X_camera = R·X + t)\n"
+            f"  ty = {cam.traslazione[1]:.6g}\n"
+            f"  tz = {cam.traslazione[2]:.6g}\n"
+            if cam.ha_posa else ""
+        )
+        + (
+            f"  k1 = {cam.distorsione[0]:.6g}        # distorsione radiale (Brown–Conrady)\n"
+            f"  k2 = {cam.distorsione[1]:.6g}\n"
+            f"  p1 = {cam.distorsione[2]:.6g}        # distorsione tangenziale\n"
+            f"  p2 = {cam.distorsione[3]:.6g}\n"
+            f"  k3 = {cam.distorsione[4]:.6g}\n"
+            if cam.ha_distorsione else ""
+        )
+        + "\n[Punti]\n"
+        "  # indice | X | Y | Z || u | v\n"
+    )
+
+    with _apri_flusso(percorso, "wb", compressione) as (f, _):
+        def scrivi(testo: str) -> None:
+            # Stessa traduzione dei fine riga della scrittura in modalità testo
+            if os.linesep != "\n":
+                testo = testo.replace("\n", os.linesep)
+            f.write(testo.encode("utf-8"))
+
+        scrivi(intestazione)
+
+        tabella = np.empty((min(n, righe_per_blocco), 6))
+        for inizio in range(0, n, righe_per_blocco):
+            fine = min(inizio + righe_per_blocco, n)
+            blocco = tabella[:fine - inizio]
+            blocco[:, 0] = np.arange(inizio + 1, fine + 1)
+            blocco[:, 1:4] = scena.punti_3d.array[inizio:fine]
+            blocco[:, 4:6] = scena.punti_2d.array[inizio:fine]
+            scrivi((_FORMATO_PUNTO * len(blocco)) % tuple(blocco.ravel().tolist()))
+            if avanzamento is not None:
+                avanzamento(fine, totale)
+
+        scrivi("\n[SpigoliManuali]\n")
+        scrivi("  # elenco di coppie (i, j) che collegano i punti con indici i e j\n")
+        if e:
+            for inizio in range(0, e, righe_per_blocco):
+                fine = min(inizio + righe_per_blocco, e)
+                coppie = scena.spigoli_manuali.array[inizio:fine]
+                scrivi((_FORMATO_SPIGOLO * len(coppie)) % tuple(coppie.ravel().tolist()))
+                if avanzamento is not None:
+                    avanzamento(n + fine, totale)
+        else:
+            scrivi("  (nessuno)\n")
+
+        scrivi("=========================== FINE ESPORTAZIONE =========================\n")
+
+
+# Espressioni e tabelle usate dal lettore a blocchi di leggi_txt (lavora su bytes)
+_RE_SEZIONE = re.compile(rb"^[ \t]*\[([^\]\n]*)\][ \t\r]*$", re.MULTILINE)
+_RE_COMMENTO = re.compile(rb"^[ \t]*[#=].*$", re.MULTILINE)
+_RE_SPIGOLO = re.compile(rb"^[ \t]*\(?[ \t]*(\d+)[ \t]*[,-][ \t]*(\d+)[ \t]*\)?[ \t\r]*$", re.MULTILINE)
+# Marcatori delle righe canoniche ("1)  X=..  Y=..  Z=..  ==>  u=..  v=..") e degli spigoli "(i, j)"
+_SPAZI_PUNTI = bytes.maketrans(b")=>XYZuv\r", b" " * 9)
+_SPAZI_SPIGOLI = bytes.maketrans(b"(),\r", b" " * 4)
+
+
+def _numeri_da_bytes(dati: bytes, tabella: bytes, dtype) -> np.ndarray | None:
+    """Sostituisce i marcatori con spazi e legge tutti i numeri in blocco (None se restano caratteri spuri)."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            return np.fromstring(dati.translate(tabella), dtype=dtype, sep=" ")
+    except (ValueError, DeprecationWarning):
+        return None
+
+
+def _colonne_da_bytes(dati: bytes, tabella: bytes, colonne: tuple[int, ...]) -> np.ndarray | None:
+    """Come `_numeri_da_bytes`, ma per righe tabellari: legge solo `colonne` con il parser C di np.loadtxt."""
+    try:
+        return np.loadtxt(io.BytesIO(dati.translate(tabella)), usecols=colonne, comments=None, ndmin=2)
+    except ValueError:
+        return None
+
+
+def _punto_da_riga(s: str) -> tuple[float, float, float, float, float] | None:
+    """Parser riga per riga (percorso lento) per le righe di [Punti] fuori dal formato canonico."""
+    # Righe del tipo: "1)  X=...  Y=...  Z=...  ==>  u=...  v=..."
+    if "X=" in s and "Y=" in s and "Z=" in s:
+        try:
+            token = s.replace(")", "").split()
+            mappa = {}
+            for t in token:
+                if "=" in t:
+                    k, v = t.split("=", 1)
+                    mappa[k.strip().lower()] = v.strip().replace(",", ".")
+            return (float(mappa["x"]), float(mappa["y"]), float(mappa["z"]),
+                    float(mappa["u"]), float(mappa["v"]))
+        except Exception:
+            return None
+    # Formato alternativo tollerato: "1 | X | Y | Z | u | v"
+    campi = [c.strip() for c in s.replace(";", "|").split("|")]
+    if len(campi) >= 6 and campi[0][0].isdigit():
+        try:
+            _, x, y, z, u, v = campi[:6]
+            return float(x), float(y), float(z), float(u), float(v)
+        except Exception:
+            return None
+    return None
+
+
+def _punti_da_bytes(dati: bytes) -> np.ndarray:
+    """Converte un segmento della sezione [Punti] in un array Nx5 di (X,Y,Z,u,v).
+
+    Percorso veloce: se tutte le righe sono nel formato canonico scritto da `scrivi_txt`, i
+    marcatori diventano spazi e le colonne (X,Y,Z,u,v) sono lette in blocco.
+    Altrimenti si ricade sul parser riga per riga (righe non valide ignorate).
+    """
+    if b"#" in dati or b"=" * 3 in dati:
+        dati = _RE_COMMENTO.sub(b"", dati)
+    righe = dati.count(b"X=")
+    valori = _colonne_da_bytes(dati, _SPAZI_PUNTI, (1, 2, 3, 4, 5)) if righe else None  # salta l'indice
+    if valori is not None and len(valori) == righe:
+        return valori
+
+    testo = dati.decode("utf-8")
+    punti = [p for p in map(_punto_da_riga, testo.split("\n")) if p is not None]
+    return np.asarray(punti, dtype=np.float64).reshape(-1, 5)
+
+
+def _spigoli_da_bytes(dati: bytes) -> np.ndarray:
+    """Converte un segmento della sezione [SpigoliManuali] in un array Ex2 di indici 1-based."""
+    if b"#" in dati or b"=" * 3 in dati:
+        dati = _RE_COMMENTO.sub(b"", dati)
+    righe = dati.count(b"(")
+    valori = _numeri_da_bytes(dati, _SPAZI_SPIGOLI, np.int64) if righe else None
+    if valori is not None and valori.size == 2 * righe:
+        return valori.reshape(-1, 2)
+
+    # Righe tipo "(i, j)" o "i-j" o "i,j" mescolate ad altro (es. "(nessuno)")
+    coppie = [(int(i), int(j)) for i, j in _RE_SPIGOLO.findall(dati)]
+    return np.asarray(coppie, dtype=np.int64).reshape(-1, 2)
+
+
+def _blocchi_righe(percorso: str, avanzamento, dimensione_blocco: int, compressione):
+    """Genera il contenuto del file a blocchi di righe complete (bytes), eventualmente decompresso.
+
+    Ogni blocco è tagliato all'ultima riga completa e il resto passa al successivo; dopo ogni
+    blocco elaborato si chiama `avanzamento(byte_letti, byte_totali)` (byte del file su disco).
+    """
+    if compressione == "auto":
+        compressione = _compressione_da_percorso(percorso)
+    totale = os.path.getsize(percorso)
+    resto = b""
+    with _apri_flusso(percorso, "rb", compressione) as (f, grezzo):
+        while True:
+            blocco = f.read(dimensione_blocco)
+            dati = resto + blocco
+            if blocco:
+                taglio = dati.rfind(b"\n") + 1
+                dati, resto = dati[:taglio], dati[taglio:]
+            yield dati
+            if avanzamento is not None:
+                avanzamento(grezzo.tell(), totale)
+            if not blocco:
+                break
+
+
+def _scandisci_txt(percorso: str, elabora_segmento, avanzamento, dimensione_blocco: int, compressione) -> None:
+    """Legge il .txt a blocchi e chiama `elabora_segmento(sezione, dati)` per ogni porzione di sezione.
+
+    Le intestazioni "[Nome]" sono cercate solo nei blocchi che contengono "[", così i blocchi
+    interni a una sezione passano senza regex.
+    """
+    sezione = None
+    for dati in _blocchi_righe(percorso, avanzamento, dimensione_blocco, compressione):
+        inizio = 0
+        if b"[" in dati:  # i blocchi interni a una sezione non richiedono la ricerca delle intestazioni
+            for m in _RE_SEZIONE.finditer(dati):
+                elabora_segmento(sezione, dati[inizio:m.start()])
+                sezione = m.group(1).decode("utf-8")  # nome della sezione
+                inizio = m.end()
+        elabora_segmento(sezione, dati[inizio:] if inizio else dati)
+
+
+def _chiavi_camera(camera: Camera | None = None) -> dict:
+    """Valori iniziali delle chiavi di [Camera]: intrinseci da `camera` (o assenti), posa e distorsione nulle."""
+    chiavi = {"f": None, "cx": None, "cy": None, "rx": 0.0, "ry": 0.0, "rz": 0.0, "tx": 0.0, "ty": 0.0, "tz": 0.0}
+    chiavi.update(dict.fromkeys(("k1", "k2", "p1", "p2", "k3"), 0.0))
+    if camera:
+        chiavi.update(f=camera.focale, cx=camera.cx, cy=camera.cy)
+    return chiavi
+
+
+def _leggi_chiavi_camera(chiavi: dict, dati: bytes) -> None:
+    """Aggiorna `chiavi` con le righe "chiave = valore   # commento" di una porzione di [Camera]."""
+    for riga in dati.decode("utf-8").split("\n"):
+        s = riga.strip()
+        if "=" in s and not s.startswith(("#", "=")):
+            chiave, valore = s.split("=", 1)
+            chiave = chiave.strip().lower()
+            valore = valore.split("#")[0].strip().replace(",", ".")
+            if chiave in chiavi:
+                try:
+                    chiavi[chiave] = float(valore)
+                except Exception:
+                    pass
+
+
+def _camera_da_chiavi(chiavi: dict) -> Camera:
+    """Camera dalle chiavi lette; posa e distorsione sono opzionali (pinhole nell'origine se assenti).
+
+    Raises:
+        ValueError: se manca uno tra f, cx, cy.
+    """
+    if chiavi["f"] is None or chiavi["cx"] is None or chiavi["cy"] is None:
+        raise ValueError("Il file non contiene una sezione [Camera] completa (f, cx, cy).")
+    return Camera(
+        chiavi["f"], chiavi["cx"], chiavi["cy"],
+        rotazione=(chiavi["rx"], chiavi["ry"], chiavi["rz"]),
+        traslazione=(chiavi["tx"], chiavi["ty"], chiavi["tz"]),
+        distorsione=tuple(chiavi[k] for k in ("k1", "k2", "p1", "p2", "k3")),
+    )
+
+
+def leggi_txt(
+    percorso: str,
+    camera: Camera | None = None,
+    dtype=np.float64,
+    avanzamento=None,
+    dimensione_blocco: int = 1 << 20,
+    compressione: str | None = "auto",
+) -> Scena:
+    """Legge un .txt di CoordCode riconoscendo le sezioni [Camera], [Punti], [SpigoliManuali].
+
+    Il file è letto a blocchi di `dimensione_blocco` byte; ogni blocco è convertito in modo
+    vettoriale direttamente negli archivi della scena, quindi la memoria aggiuntiva resta
+    limitata a un blocco oltre agli array di uscita.
+
+    Args:
+        percorso: file da leggere.
+        camera: intrinseci da usare per i valori assenti nella sezione [Camera].
+        dtype: precisione degli archivi dei punti (np.float64 oppure np.float32).
+        avanzamento: callback opzionale `avanzamento(byte_letti, byte_totali)` chiamata a ogni blocco
+            (byte del file su disco, anche se compresso).
+        dimensione_blocco: byte letti per blocco.
+        compressione: None, "gzip" o "zstd"; "auto" la deduce dall'estensione (.gz, .zst).
+
+    Raises:
+        ValueError: se manca una sezione [Punti] valida, se la camera è incompleta
+            o se qualche punto ha Z <= 0.
+    """
+    nuovi_punti_3d = ArchivioPunti(3, dtype=dtype)
+    nuovi_spigoli = ArchivioSpigoli()
+    chiavi = _chiavi_camera(camera)
+
+    def elabora_segmento(sezione: str | None, dati: bytes) -> None:
+        if sezione == "Camera":
+            _leggi_chiavi_camera(chiavi, dati)
+
+        elif sezione == "Punti":
+            # u,v del file sono ignorati: le proiezioni derivano sempre da X,Y,Z e dalla camera
+            nuovi_punti_3d.estendi(_punti_da_bytes(dati)[:, :3])
+
+        elif sezione == "SpigoliManuali":
+            # Anelli e duplicati sono scartati dall'archivio (set)
+            nuovi_spigoli.estendi(_spigoli_da_bytes(dati))
+
+    _scandisci_txt(percorso, elabora_segmento, avanzamento, dimensione_blocco, compressione)
+
+    # Validazione minima
+    if not nuovi_punti_3d:
+        raise ValueError("Il file non contiene una sezione [Punti] valida.")
+    nuova_camera = _camera_da_chiavi(chiavi)
+
+    # Tutti i punti devono essere proiettabili (Z > 0): controllo vettoriale in un'unica chiamata
+    uv, valido = nuova_camera.proietta(nuovi_punti_3d.array)
+    if not valido.all():
+        scartati = np.flatnonzero(~valido) + 1
+        elenco = ", ".join(map(str, scartati[:10])) + ("…" if scartati.size > 10 else "")
+        raise ValueError(f"Z deve essere > 0; punti non validi: {elenco}.")
+
+    scena = Scena(nuova_camera, nuovi_punti_3d, nuovi_spigoli)
+    # Le proiezioni calcolate per la validazione diventano la voce iniziale della cache
+    scena.proiezioni.inserisci(scena.camera, nuovi_punti_3d, uv)
+    return scena
+
+
+def leggi_corrispondenze(
+    percorso: str, dtype=np.float64, avanzamento=None, dimensione_blocco: int = 1 << 20, compressione: str | None = "auto"
+) -> tuple[np.ndarray, np.ndarray]:
+    """Legge dalla sezione [Punti] le coppie (X,Y,Z) ↔ (u,v) così come sono scritte nel file.
+
+    A differenza di leggi_txt gli (u,v) del file sono conservati (osservazioni da cui stimare
+    la camera) e non si richiedono né una camera completa né Z > 0.
+
+    Returns:
+        tuple: (punti_3d Nx3, uv Nx2).
+
+    Raises:
+        ValueError: se il file non contiene punti.
+    """
+    righe = ArchivioPunti(5, dtype=dtype)
+
+    def elabora_segmento(sezione: str | None, dati: bytes) -> None:
+        if sezione == "Punti":
+            righe.estendi(_punti_da_bytes(dati))
+
+    _scandisci_txt(percorso, elabora_segmento, avanzamento, dimensione_blocco, compressione)
+    if not righe:
+        raise ValueError("Il file non contiene una sezione [Punti] valida.")
+    return righe.array[:, :3], righe.array[:, 3:]
+
+
+def leggi_vista(
+    percorso: str, dtype=np.float64, avanzamento=None, dimensione_blocco: int = 1 << 20, compressione: str | None = "auto"
+) -> tuple[Camera, np.ndarray, np.ndarray]:
+    """Legge una "vista": la camera di [Camera] e le coppie (X,Y,Z) ↔ (u,v) di [Punti] come scritte nel file.
+
+    Serve a combinare più file degli stessi punti ripresi da camere diverse (triangolazione):
+    come in leggi_corrispondenze gli (u,v) sono conservati e non si richiede Z > 0.
+
+    Returns:
+        tuple: (camera, punti_3d Nx3, uv Nx2).
+
+    Raises:
+        ValueError: se il file non contiene punti o una camera completa.
+    """
+    chiavi = _chiavi_camera()
+    righe = ArchivioPunti(5, dtype=dtype)
+
+    def elabora_segmento(sezione: str | None, dati: bytes) -> None:
+        if sezione == "Camera":
+            _leggi_chiavi_camera(chiavi, dati)
+        elif sezione == "Punti":
+            righe.estendi(_punti_da_bytes(dati))
+
+    _scandisci_txt(percorso, elabora_segmento, avanzamento, dimensione_blocco, compressione)
+    if not righe:
+        raise ValueError("Il file non contiene una sezione [Punti] valida.")
+    return _camera_da_chiavi(chiavi), righe.array[:, :3], righe.array[:, 3:]
+
+
+# =============================================================================
+# FORMATO BINARIO (.ccb)
+# =============================================================================
+#  Layout (little-endian), versione 3:
+#   • intestazione: magia "CCSCENA\0", versione (uint32), tipo dei punti
+#     (uint32: 0 = float64, 1 = float32), N punti e E spigoli (uint64), f, cx, cy (float64),
+#     seguiti dalla posa rx, ry, rz, tx, ty, tz e dalla distorsione k1, k2, p1, p2, k3
+#     (float64), il tutto completato a 192 byte;
+#   • blocco XYZ: array colonnare (3, N), allineato a 64 byte;
+#   • blocco uv: array colonnare (2, N), allineato a 64 byte;
+#   • blocco spigoli: array colonnare (2, E) int64 di indici 1-based, allineato a 64 byte.
+#  I blocchi hanno lo stesso layout di ArchivioPunti/ArchivioSpigoli, quindi si possono
+#  mappare in memoria e adottare senza copie. Le versioni precedenti restano leggibili:
+#  la 1 non ha posa né distorsione (intestazione di 64 byte), la 2 non ha distorsione (128 byte).
+MAGIA_BINARIO = b"CCSCENA\x00"
+VERSIONE_BINARIO = 3
+_INTESTAZIONE_BINARIO = struct.Struct("<8sIIQQddd")
+_POSA_BINARIO = struct.Struct("<6d")         # dalla versione 2, subito dopo l'intestazione
+_DISTORSIONE_BINARIO = struct.Struct("<5d")  # dalla versione 3, subito dopo la posa
+_ALLINEAMENTO_BINARIO = 64
+_TIPI_BINARIO = {0: np.dtype("<f8"), 1: np.dtype("<f4")}
+# Byte scritti (o letti senza mappatura) tra due chiamate di `avanzamento`
+BYTE_PER_BLOCCO_BINARIO = 1 << 24
+
+
+def _allinea(posizione: int) -> int:
+    return -(-posizione // _ALLINEAMENTO_BINARIO) * _ALLINEAMENTO_BINARIO
+
+
+def _dimensione_intestazione(versione: int) -> int:
+    """Byte occupati dall'intestazione (già allineati), in base alla versione del formato."""
+    posa = _POSA_BINARIO.size if versione >= 2 else 0
+    distorsione = _DISTORSIONE_BINARIO.size if versione >= 3 else 0
+    return _allinea(_INTESTAZIONE_BINARIO.size + posa + distorsione)
+
+
+def _blocchi_binario(
+    n_punti: int, n_spigoli: int, tipo: np.dtype, versione: int = VERSIONE_BINARIO
+) -> list[tuple[int, tuple[int, int], np.dtype]]:
+    """Ritorna (offset, forma, dtype) dei blocchi XYZ, uv e spigoli."""
+    blocchi = []
+    posizione = _dimensione_intestazione(versione)
+    for forma, dtype in (((3, n_punti), tipo), ((2, n_punti), tipo), ((2, n_spigoli), np.dtype("<i8"))):
+        blocchi.append((posizione, forma, dtype))
+        posizione = _allinea(posizione + forma[0] * forma[1] * dtype.itemsize)
+    return blocchi
+
+
+def scrivi_binario(scena: Scena, percorso: str, avanzamento=None) -> None:
+    """Scrive la scena nel formato binario versionato .ccb (vedi layout sopra).
+
+    Args:
+        avanzamento: callback opzionale `avanzamento(byte_scritti, byte_totali)`, chiamata ogni
+            BYTE_PER_BLOCCO_BINARIO byte (può sollevare un'eccezione per interrompere la scrittura).
+    """
+    tipo = np.dtype(scena.punti_3d.dtype).newbyteorder("<")
+    codice = next((k for k, t in _TIPI_BINARIO.items() if t == tipo), None)
+    if codice is None:
+        raise ValueError(f"Tipo dei punti non supportato dal formato binario: {tipo}.")
+
+    cam = scena.camera
+    n, e = len(scena.punti_3d), len(scena.spigoli_manuali)
+    intestazione = _INTESTAZIONE_BINARIO.pack(
+        MAGIA_BINARIO, VERSIONE_BINARIO, codice, n, e, cam.focale, cam.cx, cam.cy
+    ) + _POSA_BINARIO.pack(*cam.rotazione, *cam.traslazione) + _DISTORSIONE_BINARIO.pack(*cam.distorsione)
+    contenuti = (scena.punti_3d.colonne, scena.punti_2d.colonne, scena.spigoli_manuali.colonne)
+    blocchi = _blocchi_binario(n, e, tipo)
+    totale = sum(forma[0] * forma[1] * dtype.itemsize for _, forma, dtype in blocchi)
+    scritti = 0
+
+    with open(percorso, "wb") as f:
+        f.write(intestazione.ljust(_dimensione_intestazione(VERSIONE_BINARIO), b"\x00"))
+        for (offset, _, dtype), colonne in zip(blocchi, contenuti):
+            f.write(b"\x00" * (offset - f.tell()))
+            valori = np.ascontiguousarray(colonne, dtype=dtype).ravel()
+            passo = max(1, BYTE_PER_BLOCCO_BINARIO // dtype.itemsize)
+            for inizio in range(0, len(valori), passo):
+                parte = valori[inizio:inizio + passo]
+                parte.tofile(f)
+                scritti += parte.nbytes
+                if avanzamento is not None:
+                    avanzamento(scritti, totale)
+
+
+def leggi_binario(percorso: str, mappa_memoria: bool = True, avanzamento=None) -> Scena:
+    """Apre una scena .ccb; con `mappa_memoria` i blocchi sono np.memmap copy-on-write.
+
+    L'apertura mappata richiede tempo costante: i dati sono letti dal disco solo quando
+    vengono usati (proiezione, rendering) e le modifiche non toccano il file. A differenza
+    di leggi_txt non si ricontrolla Z > 0, già garantito dalla scena che ha scritto il file.
+
+    Args:
+        avanzamento: callback opzionale `avanzamento(byte_letti, byte_totali)`, chiamata dopo ogni
+            blocco mappato o ogni BYTE_PER_BLOCCO_BINARIO byte letti senza mappatura.
+
+    Raises:
+        ValueError: se il file non è una scena binaria CoordCode o la versione non è supportata.
+    """
+    with open(percorso, "rb") as f:
+        grezza = f.read(_INTESTAZIONE_BINARIO.size + _POSA_BINARIO.size + _DISTORSIONE_BINARIO.size)
+    if len(grezza) < _INTESTAZIONE_BINARIO.size:
+        raise ValueError("File troppo corto per essere una scena binaria CoordCode.")
+    magia, versione, codice, n, e, focale, cx, cy = _INTESTAZIONE_BINARIO.unpack_from(grezza)
+    if magia != MAGIA_BINARIO:
+        raise ValueError("Il file non è una scena binaria CoordCode (.ccb).")
+    if not 1 <= versione <= VERSIONE_BINARIO or codice not in _TIPI_BINARIO:
+        raise ValueError(f"Versione del formato binario non supportata: {versione}.")
+    posa, distorsione = (0.0,) * 6, (0.0,) * 5
+    if versione >= 2:
+        posa = _POSA_BINARIO.unpack_from(grezza, _INTESTAZIONE_BINARIO.size)
+    if versione >= 3:
+        distorsione = _DISTORSIONE_BINARIO.unpack_from(grezza, _INTESTAZIONE_BINARIO.size + _POSA_BINARIO.size)
+    camera = Camera(focale, cx, cy, rotazione=posa[:3], traslazione=posa[3:], distorsione=distorsione)
+
+    blocchi = _blocchi_binario(n, e, _TIPI_BINARIO[codice], versione)
+    totale = sum(forma[0] * forma[1] * dtype.itemsize for _, forma, dtype in blocchi)
+    letti = 0
+    colonne = []
+    for offset, forma, dtype in blocchi:
+        dimensione = forma[0] * forma[1] * dtype.itemsize
+        if forma[1] == 0:
+            colonne.append(np.empty(forma, dtype=dtype))
+        elif mappa_memoria:
+            colonne.append(np.memmap(percorso, dtype=dtype, mode="c", offset=offset, shape=forma))
+        else:
+            blocco = np.empty(forma, dtype=dtype)
+            destinazione = memoryview(blocco).cast("B")
+            with open(percorso, "rb") as f:
+                f.seek(offset)
+                for inizio in range(0, dimensione, BYTE_PER_BLOCCO_BINARIO):
+                    fine = min(inizio + BYTE_PER_BLOCCO_BINARIO, dimensione)
+                    if f.readinto(destinazione[inizio:fine]) != fine - inizio:
+                        raise ValueError("Scena binaria troncata.")
+                    if avanzamento is not None:
+                        avanzamento(letti + fine, totale)
+            colonne.append(blocco)
+        letti += dimensione
+        if avanzamento is not None:
+            avanzamento(letti, totale)
+
+    punti_3d, punti_2d, spigoli = colonne
+    scena = Scena(camera, ArchivioPunti.da_colonne(punti_3d), ArchivioSpigoli.da_colonne(spigoli))
+    # Il blocco uv è stato scritto con gli stessi intrinseci: voce iniziale della cache (mappata)
+    scena.proiezioni.inserisci(scena.camera, scena.punti_3d, ArchivioPunti.da_colonne(punti_2d))
+    return scena
+
+
+# =============================================================================
+# IMPORT DI MESH E NUVOLE DI PUNTI (OBJ, PLY, XYZ/CSV)
+# =============================================================================
+# Wavefront OBJ: vertici "v x y z [w]", facce "f i/vt/vn ..." e polilinee "l i j ..."
+_RE_VERTICE_OBJ = re.compile(rb"^[ \t]*v[ \t]+([^\n#]*)", re.MULTILINE)
+_RE_POLIGONO_OBJ = re.compile(rb"^[ \t]*([fl])[ \t]+([^\n#]*)", re.MULTILINE)
+_RE_RIFERIMENTI_OBJ = re.compile(rb"/[^ \t\r\n]*")  # "/vt/vn" dopo l'indice del vertice
+_SPAZI_RIGHE = bytes.maketrans(b"\t\r", b"  ")
+
+# Tipi scalari delle proprietà PLY (nomi classici e con ampiezza esplicita)
+_TIPI_PLY = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+_FORMATI_PLY = {"ascii": None, "binary_little_endian": "<", "binary_big_endian": ">"}
+_LISTE_FACCE_PLY = ("vertex_indices", "vertex_index")
+# PLY binario con liste: record raccolti insieme (indici temporanei di qualche decina di MB)
+RECORD_PER_BLOCCO_PLY = 1 << 18
+
+# XYZ/CSV: separatori ammessi; con ";" la virgola è il separatore decimale
+_SPAZI_XYZ = bytes.maketrans(b",\t\r", b"   ")
+_SPAZI_XYZ_PUNTO_E_VIRGOLA = bytes.maketrans(b";,\t\r", b" .  ")
+
+
+def _righe_variabili(dati: bytes, dtype=np.int64) -> tuple[np.ndarray, np.ndarray]:
+    """Numeri di righe di lunghezza variabile (una per "\\n"): valori in fila e quanti per riga.
+
+    I token sono contati in modo vettoriale sui byte (inizio di token = carattere non spazio
+    dopo uno spazio o un a capo), i valori letti in un colpo solo con np.fromstring.
+
+    Raises:
+        ValueError: se qualche token non è un numero.
+    """
+    dati = dati.translate(_SPAZI_RIGHE)
+    byte = np.frombuffer(dati, dtype=np.uint8)
+    a_capo = byte == ord("\n")
+    separatore = a_capo | (byte == ord(" "))
+    inizio_token = ~separatore
+    inizio_token[1:] &= separatore[:-1]
+    riga = np.cumsum(a_capo) - a_capo
+    conteggi = np.bincount(riga[inizio_token], minlength=int(a_capo.sum()) + 1)
+    valori = _numeri_da_bytes(dati, _SPAZI_RIGHE, dtype) if len(dati) else np.empty(0, dtype=dtype)
+    if valori is None or valori.size != conteggi.sum():
+        raise ValueError("Righe con valori non numerici.")
+    return valori, conteggi
+
+
+def _spigoli_poligoni(indici: np.ndarray, conteggi: np.ndarray, chiudi: bool = True) -> np.ndarray:
+    """Spigoli (i, i+1) dei poligoni dati come indici in fila e numero di vertici per poligono.
+
+    Con `chiudi` ogni poligono è chiuso (ultimo -> primo), come le facce; senza, resta una polilinea.
+    """
+    fine = np.cumsum(conteggi)
+    pieni = conteggi > 0
+    successivo = np.arange(1, len(indici) + 1)
+    ultimi = fine[pieni] - 1
+    if chiudi:
+        successivo[ultimi] = (fine - conteggi)[pieni]
+        return np.column_stack((indici, indici[successivo]))
+    tenuti = np.ones(len(indici), dtype=bool)
+    tenuti[ultimi] = False
+    return np.column_stack((indici[tenuti], indici[successivo[tenuti]]))
+
+
+def _triangoli_poligoni(indici: np.ndarray, conteggi: np.ndarray) -> np.ndarray:
+    """Triangoli a ventaglio (v0, vk, vk+1) dei poligoni dati come indici in fila e numero di vertici.
+
+    I poligoni con meno di tre vertici non producono triangoli.
+    """
+    quanti = np.maximum(conteggi - 2, 0)
+    primi = np.repeat(np.cumsum(conteggi) - conteggi, quanti)
+    locale = np.arange(int(quanti.sum())) - np.repeat(np.cumsum(quanti) - quanti, quanti)
+    return np.column_stack((indici[primi], indici[primi + locale + 1], indici[primi + locale + 2]))
+
+
+def _controlla_spigoli(spigoli, n: int) -> None:
+    """Solleva ValueError se qualche spigolo o faccia (1-based) non si riferisce a un vertice del file."""
+    if spigoli and (spigoli.colonne.min() < 1 or spigoli.colonne.max() > n):
+        raise ValueError(f"Il file contiene facce con indici di vertice fuori intervallo (1..{n}).")
+
+
+def leggi_obj(
+    percorso: str, dtype=np.float64, avanzamento=None, dimensione_blocco: int = 1 << 22, compressione: str | None = "auto"
+) -> tuple["ArchivioPunti", "ArchivioSpigoli", "ArchivioPunti"]:
+    """Legge un Wavefront .obj: vertici (v), spigoli dei poligoni (f chiusi, l aperti) e facce.
+
+    Il file è letto a blocchi; in ogni blocco le righe v/f/l sono estratte con una regex e
+    convertite in blocco (i riferimenti "/vt/vn" sono rimossi prima della conversione).
+    Gli indici negativi (relativi all'ultimo vertice definito) sono risolti per posizione.
+    Le facce con più di tre vertici sono triangolate a ventaglio.
+
+    Returns:
+        tuple: (ArchivioPunti dei vertici, ArchivioSpigoli 1-based senza duplicati,
+            ArchivioPunti int64 dei triangoli 1-based).
+
+    Raises:
+        ValueError: se mancano vertici o una faccia indica un vertice inesistente.
+    """
+    punti = ArchivioPunti(3, dtype=dtype)
+    facce = ArchivioPunti(3, dtype=np.int64)
+    coppie = []
+    for dati in _blocchi_righe(percorso, avanzamento, dimensione_blocco, compressione):
+        vertici_prima = len(punti)
+        righe = _RE_VERTICE_OBJ.findall(dati)
+        if righe:
+            testo = b"\n".join(righe)
+            valori = _numeri_da_bytes(testo, _SPAZI_RIGHE, np.float64)
+            if valori is not None and valori.size == 3 * len(righe):
+                punti.estendi(valori.reshape(-1, 3))
+            else:  # coordinate omogenee (w) o colori per vertice: solo le prime tre colonne
+                punti.estendi(_colonne_da_bytes(testo, _SPAZI_RIGHE, (0, 1, 2)))
+
+        poligoni = _RE_POLIGONO_OBJ.findall(dati)
+        if not poligoni:
+            continue
+        for tipo in (b"f", b"l"):
+            corpi = [corpo for t, corpo in poligoni if t == tipo]
+            if not corpi:
+                continue
+            indici, conteggi = _righe_variabili(_RE_RIFERIMENTI_OBJ.sub(b"", b"\n".join(corpi)))
+            negativi = indici < 0
+            if negativi.any():
+                # -1 è l'ultimo vertice definito prima della riga: serve la posizione delle righe nel blocco
+                inizi_v = [m.start() for m in _RE_VERTICE_OBJ.finditer(dati)]
+                inizi_p = [m.start() for m in _RE_POLIGONO_OBJ.finditer(dati) if m.group(1) == tipo]
+                definiti = vertici_prima + np.searchsorted(inizi_v, inizi_p)
+                indici = np.where(negativi, np.repeat(definiti, conteggi) + indici + 1, indici)
+            coppie.append(_spigoli_poligoni(indici, conteggi, chiudi=tipo == b"f"))
+            if tipo == b"f":
+                facce.estendi(_triangoli_poligoni(indici, conteggi))
+
+    if not punti:
+        raise ValueError("Il file .obj non contiene vertici.")
+    # Un solo inserimento: i duplicati (spigoli condivisi tra facce) sono scartati in blocco
+    spigoli = ArchivioSpigoli()
+    if coppie:
+        spigoli.estendi(np.concatenate(coppie))
+    _controlla_spigoli(spigoli, len(punti))
+    _controlla_spigoli(facce, len(punti))
+    return punti, spigoli, facce
+
+
+def _intestazione_ply(f) -> tuple[str, list[tuple[str, int, list[tuple[str, str, str | None]]]]]:
+    """Legge l'intestazione PLY fino a "end_header" (il file resta posizionato sui dati).
+
+    Returns:
+        tuple: (formato, elementi) con elementi = [(nome, quanti, [(proprietà, tipo, tipo_conteggio)])],
+            dove tipo_conteggio è None per le proprietà scalari.
+
+    Raises:
+        ValueError: se il file non è PLY o usa tipi/formati sconosciuti.
+    """
+    if f.readline().strip() != b"ply":
+        raise ValueError("Il file non è un PLY (manca l'intestazione \"ply\").")
+    formato = None
+    elementi = []
+    while True:
+        riga = f.readline()
+        if not riga:
+            raise ValueError("Intestazione PLY senza \"end_header\".")
+        campi = riga.decode("ascii", "replace").split()
+        if not campi or campi[0] in ("comment", "obj_info"):
+            continue
+        if campi[0] == "end_header":
+            break
+        try:
+            if campi[0] == "format":
+                formato = campi[1]
+                if formato not in _FORMATI_PLY:
+                    raise ValueError(f"Formato PLY non supportato: {formato}.")
+            elif campi[0] == "element":
+                elementi.append((campi[1], int(campi[2]), []))
+            elif campi[0] == "property" and campi[1] == "list":
+                elementi[-1][2].append((campi[4], _TIPI_PLY[campi[3]], _TIPI_PLY[campi[2]]))
+            elif campi[0] == "property":
+                elementi[-1][2].append((campi[2], _TIPI_PLY[campi[1]], None))
+        except (IndexError, KeyError):
+            raise ValueError(f"Riga dell'intestazione PLY non valida: {riga.decode('ascii', 'replace').strip()}") from None
+    if formato is None:
+        raise ValueError("Intestazione PLY senza riga \"format\".")
+    for nome, _, proprieta in elementi:
+        scalari = {p[0] for p in proprieta if p[2] is None}
+        if nome == "edge" and not {"vertex1", "vertex2"} <= scalari:
+            raise ValueError("L'elemento edge del PLY non ha le proprietà vertex1/vertex2.")
+    return formato, elementi
+
+
+def _vertici_ply(colonne: dict, proprieta: list) -> np.ndarray:
+    """Colonne x, y, z di un elemento vertex PLY come array 3xN float64."""
+    nomi = [p[0] for p in proprieta]
+    if not all(asse in nomi for asse in "xyz"):
+        raise ValueError("L'elemento vertex del PLY non ha le proprietà x, y, z.")
+    return np.stack([np.asarray(colonne[asse], dtype=np.float64) for asse in "xyz"])
+
+
+def _elemento_binario_ply(mappa: np.ndarray, posizione: int, quanti: int, proprieta: list, ordine: str):
+    """Colonne di un elemento PLY binario a partire da `posizione` nel file mappato.
+
+    Senza liste i record hanno dimensione fissa e le colonne sono viste strutturate del file.
+    Con le liste (facce di lunghezza mista) un solo passaggio sui conteggi ricava l'inizio di
+    ogni record; scalari e valori delle liste sono poi raccolti con un indice vettoriale per
+    proprietà, a blocchi di RECORD_PER_BLOCCO_PLY record.
+
+    Returns:
+        tuple: (colonne, posizione dopo l'elemento) con le colonne come in _elemento_ascii_ply:
+            scalari per nome e, per ogni lista, (valori in fila, conteggi).
+    """
+    if all(p[2] is None for p in proprieta):
+        tipo = np.dtype([(nome, ordine + tipo) for nome, tipo, _ in proprieta])
+        fine = posizione + quanti * tipo.itemsize
+        if fine > len(mappa):
+            raise ValueError("File PLY troncato.")
+        record = mappa[posizione:fine].view(tipo)
+        return {nome: record[nome] for nome, _, _ in proprieta}, fine
+
+    inizi, fine = _inizi_record_ply(mappa, posizione, quanti, proprieta, ordine)
+    colonne = {nome: [] for nome, _, _ in proprieta}
+    for blocco in range(0, quanti, RECORD_PER_BLOCCO_PLY):
+        cursori = inizi[blocco:blocco + RECORD_PER_BLOCCO_PLY].copy()
+        for nome, tipo, tipo_conteggio in proprieta:
+            if tipo_conteggio is None:
+                valori = _raccogli_ply(mappa, cursori, np.ones(len(cursori), dtype=np.int64), ordine + tipo)
+                cursori += valori.itemsize
+            else:
+                conteggi = _raccogli_ply(mappa, cursori, np.ones(len(cursori), dtype=np.int64), ordine + tipo_conteggio)
+                conteggi = conteggi.astype(np.int64)
+                cursori += np.dtype(tipo_conteggio).itemsize
+                valori = (_raccogli_ply(mappa, cursori, conteggi, ordine + tipo), conteggi)
+                cursori += conteggi * np.dtype(tipo).itemsize
+            colonne[nome].append(valori)
+    for nome, tipo, tipo_conteggio in proprieta:
+        blocchi = colonne[nome]
+        if tipo_conteggio is None:
+            colonne[nome] = np.concatenate(blocchi) if blocchi else np.empty(0, dtype=ordine + tipo)
+        elif blocchi:
+            colonne[nome] = (np.concatenate([b[0] for b in blocchi]), np.concatenate([b[1] for b in blocchi]))
+        else:
+            colonne[nome] = (np.empty(0, dtype=ordine + tipo), np.empty(0, dtype=np.int64))
+    return colonne, fine
+
+
+def _inizi_record_ply(mappa: np.ndarray, posizione: int, quanti: int, proprieta: list, ordine: str):
+    """Posizione di inizio di ogni record di un elemento PLY binario con liste, e fine dell'elemento.
+
+    L'inizio di un record dipende dai conteggi di tutti i precedenti, quindi si scorrono i soli
+    conteggi, un record alla volta, senza costruire array per record.
+    """
+    # Tra un conteggio e il successivo ci sono byte fissi (scalari) e i valori della lista
+    passi = []
+    fissi = 0
+    for _, tipo, tipo_conteggio in proprieta:
+        if tipo_conteggio is None:
+            fissi += np.dtype(tipo).itemsize
+        else:
+            conteggio = struct.Struct(ordine + np.dtype(tipo_conteggio).char)
+            passi.append((fissi, conteggio, np.dtype(tipo).itemsize))
+            fissi = 0
+    coda = fissi
+
+    inizi = np.empty(quanti, dtype=np.int64)
+    byte = memoryview(mappa)
+    try:
+        if len(passi) == 1 and passi[0][1].size == 1 and passi[0][1].format[-1] == "B":
+            # Caso tipico (facce con conteggio uchar): il conteggio è un byte a distanza fissa
+            prima, _, elemento = passi[0]
+            dopo = 1 + coda
+            for k in range(quanti):
+                inizi[k] = posizione
+                posizione += prima + dopo + byte[posizione + prima] * elemento
+        else:
+            for k in range(quanti):
+                inizi[k] = posizione
+                for prima, conteggio, elemento in passi:
+                    posizione += prima
+                    posizione += conteggio.size + conteggio.unpack_from(byte, posizione)[0] * elemento
+                posizione += coda
+    except (IndexError, struct.error):
+        raise ValueError("File PLY troncato.") from None
+    if posizione > len(mappa):
+        raise ValueError("File PLY troncato.")
+    return inizi, posizione
+
+
+def _raccogli_ply(mappa: np.ndarray, inizi: np.ndarray, conteggi: np.ndarray, tipo: str) -> np.ndarray:
+    """Valori consecutivi di tipo `tipo` (conteggi[k] a partire da inizi[k]) in fila, con un solo indice."""
+    dimensione = np.dtype(tipo).itemsize
+    lunghezze = conteggi * dimensione
+    totale = int(lunghezze.sum())
+    if not totale:
+        return np.empty(0, dtype=tipo)
+    indici = np.repeat(inizi - (np.cumsum(lunghezze) - lunghezze), lunghezze) + np.arange(totale)
+    return mappa[indici].view(tipo)
+
+
+def _elemento_ascii_ply(dati: bytes, quanti: int, proprieta: list):
+    """Colonne utili di un elemento PLY ascii: scalari per nome e, per le facce, (indici, conteggi)."""
+    colonne = {}
+    if all(p[2] is None for p in proprieta):
+        valori = _numeri_da_bytes(dati, _SPAZI_RIGHE, np.float64)
+        if valori is None or valori.size != quanti * len(proprieta):
+            raise ValueError("Righe PLY ascii non valide.")
+        valori = valori.reshape(quanti, len(proprieta))
+        for k, (nome, _, _) in enumerate(proprieta):
+            colonne[nome] = valori[:, k]
+        return colonne
+
+    valori, conteggi = _righe_variabili(dati.rstrip(b"\n"), np.float64)
+    inizi = np.cumsum(conteggi) - conteggi
+    # Solo la prima lista è estratta: le scalari che la precedono occupano un token ciascuna
+    for salto, (nome, _, tipo_conteggio) in enumerate(proprieta):
+        if tipo_conteggio is not None:
+            break
+    lunghezze = valori[inizi + salto].astype(np.int64)
+    primi = inizi + salto + 1
+    posizioni = np.repeat(primi - np.cumsum(lunghezze) + lunghezze, lunghezze) + np.arange(int(lunghezze.sum()))
+    colonne[nome] = (valori[posizioni].astype(np.int64), lunghezze)
+    return colonne
+
+
+def leggi_ply(
+    percorso: str, dtype=np.float64, mappa_memoria: bool = True
+) -> tuple["ArchivioPunti", "ArchivioSpigoli", "ArchivioPunti"]:
+    """Legge un .ply (ascii o binario): vertici x, y, z, spigoli da facce (chiuse) ed elementi edge, facce.
+
+    Il PLY binario è aperto con memory mapping: i vertici (e ogni elemento senza liste) sono viste
+    strutturate del file, le facce sono raccolte con indici vettoriali dopo un solo passaggio sui
+    conteggi, anche con lunghezze miste. L'ascii è letto in blocco e convertito con np.fromstring,
+    un elemento alla volta. Le facce sono triangolate a ventaglio.
+
+    Returns:
+        tuple: (ArchivioPunti dei vertici, ArchivioSpigoli 1-based senza duplicati,
+            ArchivioPunti int64 dei triangoli 1-based).
+
+    Raises:
+        ValueError: se il file non è un PLY valido o non contiene vertici.
+    """
+    with open(percorso, "rb") as f:
+        formato, elementi = _intestazione_ply(f)
+        inizio_dati = f.tell()
+        ordine = _FORMATI_PLY[formato]
+        dati = f.read() if ordine is None else None
+
+    punti = None
+    coppie = []
+    triangoli = []
+    letti = []  # (nome, colonne, proprietà) di ogni elemento, binario o ascii
+    if ordine is not None:
+        if mappa_memoria and os.path.getsize(percorso) > inizio_dati:
+            mappa = np.memmap(percorso, dtype=np.uint8, mode="r")
+        else:
+            mappa = np.fromfile(percorso, dtype=np.uint8)
+        posizione = inizio_dati
+        for nome, quanti, proprieta in elementi:
+            colonne, posizione = _elemento_binario_ply(mappa, posizione, quanti, proprieta, ordine)
+            letti.append((nome, colonne, proprieta))
+    else:
+        # Confini delle righe: ogni elemento occupa `quanti` righe consecutive
+        a_capo = np.flatnonzero(np.frombuffer(dati, dtype=np.uint8) == ord("\n"))
+        riga = 0
+        for nome, quanti, proprieta in elementi:
+            if riga + quanti > len(a_capo) + 1:
+                raise ValueError("File PLY ascii troncato.")
+            inizio = a_capo[riga - 1] + 1 if riga else 0
+            fine = a_capo[riga + quanti - 1] + 1 if riga + quanti <= len(a_capo) else len(dati)
+            riga += quanti
+            if nome not in ("vertex", "face", "edge") or not quanti:
+                continue
+            letti.append((nome, _elemento_ascii_ply(dati[inizio:fine], quanti, proprieta), proprieta))
+
+    for nome, colonne, proprieta in letti:
+        if nome == "vertex":
+            punti = _vertici_ply(colonne, proprieta)
+        elif nome == "face":
+            lista = next((nome_p for nome_p in colonne if nome_p in _LISTE_FACCE_PLY), None)
+            if lista is not None:
+                indici, conteggi = colonne[lista]
+                indici = indici.astype(np.int64)
+                coppie.append(_spigoli_poligoni(indici, conteggi))
+                triangoli.append(_triangoli_poligoni(indici, conteggi))
+        elif nome == "edge":
+            coppie.append(np.column_stack((colonne["vertex1"], colonne["vertex2"])).astype(np.int64))
+
+    if punti is None or not punti.shape[1]:
+        raise ValueError("Il file .ply non contiene vertici.")
+    archivio_punti = ArchivioPunti.da_colonne(np.ascontiguousarray(punti, dtype=dtype))
+    spigoli = ArchivioSpigoli()
+    if coppie:
+        spigoli.estendi(np.concatenate(coppie) + 1)  # PLY è 0-based
+    facce = ArchivioPunti(3, dtype=np.int64)
+    if triangoli:
+        facce.estendi(np.concatenate(triangoli) + 1)
+    _controlla_spigoli(spigoli, len(archivio_punti))
+    _controlla_spigoli(facce, len(archivio_punti))
+    return archivio_punti, spigoli, facce
+
+
+def leggi_xyz(
+    percorso: str, dtype=np.float64, avanzamento=None, dimensione_blocco: int = 1 << 22, compressione: str | None = "auto"
+) -> "ArchivioPunti":
+    """Legge una nuvola di punti XYZ/CSV: le prime tre colonne di ogni riga sono X, Y, Z.
+
+    Separatori ammessi: spazi, tabulazioni, virgole o ";" (in tal caso la virgola è il separatore
+    decimale). Una prima riga non numerica (intestazione) e le righe di commento "#" sono ignorate;
+    le colonne oltre la terza (colori, normali) sono scartate.
+
+    Raises:
+        ValueError: se il file non contiene punti.
+    """
+    punti = ArchivioPunti(3, dtype=dtype)
+    tabella = None
+    colonne = 0
+    for dati in _blocchi_righe(percorso, avanzamento, dimensione_blocco, compressione):
+        if b"#" in dati:
+            dati = _RE_COMMENTO.sub(b"", dati)
+        if tabella is None:
+            dati = dati.lstrip()
+            if not dati:
+                continue
+            prima, _, resto = dati.partition(b"\n")
+            tabella = _SPAZI_XYZ_PUNTO_E_VIRGOLA if b";" in prima else _SPAZI_XYZ
+            valori = _numeri_da_bytes(prima, tabella, np.float64)
+            if valori is None or valori.size < 3:  # intestazione ("x,y,z,...")
+                dati = resto
+                prima = resto.partition(b"\n")[0]
+                valori = _numeri_da_bytes(prima, tabella, np.float64)
+            colonne = valori.size if valori is not None else 0
+        if not dati.strip():
+            continue
+        valori = _numeri_da_bytes(dati, tabella, np.float64) if colonne >= 3 else None
+        righe = dati.count(b"\n") + (not dati.endswith(b"\n"))
+        if valori is not None and valori.size == colonne * righe:
+            punti.estendi(valori.reshape(-1, colonne)[:, :3])
+        else:  # righe vuote o di lunghezza diversa: parser tabellare sulle prime tre colonne
+            valori = _colonne_da_bytes(dati, tabella, (0, 1, 2))
+            if valori is None:
+                raise ValueError("Righe XYZ/CSV non valide: servono almeno tre colonne numeriche.")
+            punti.estendi(valori)
+
+    if not punti:
+        raise ValueError("Il file non contiene punti.")
+    return punti
+
+
+def inquadra_camera(camera: Camera, punti) -> Camera:
+    """Camera con gli stessi intrinseci e rotazione, traslata in modo da inquadrare tutti i punti.
+
+    La sfera che contiene i punti (centrata nel riquadro) viene portata sull'asse ottico alla
+    distanza a cui riempie il semicampo minore dell'immagine (2·cx x 2·cy): tutti i punti hanno
+    così Z > 0 nel riferimento camera.
+
+    Raises:
+        ValueError: se qualche coordinata non è finita.
+    """
+    punti = np.asarray(punti, dtype=np.float64).reshape(-1, 3)
+    if not np.isfinite(punti).all():
+        raise ValueError("Le coordinate dei punti devono essere finite.")
+    centro = (punti.min(axis=0) + punti.max(axis=0)) / 2
+    raggio = float(np.sqrt(((punti - centro) ** 2).sum(axis=1).max())) or 1.0
+    semicampo = min(camera.cx, camera.cy)
+    semiangolo = math.atan(semicampo / camera.focale) if semicampo > 0 else math.pi / 4
+    traslazione = np.array([0.0, 0.0, raggio / math.sin(semiangolo)]) - camera.matrice_rotazione @ centro
+    return replace(camera, traslazione=tuple(float(t) for t in traslazione))
+
+
+def leggi_mesh(
+    percorso: str, camera: Camera, dtype=np.float64, avanzamento=None, inquadra: bool = True
+) -> Scena:
+    """Importa una mesh o nuvola di punti (.obj, .ply, .xyz/.csv/.pts, anche .gz/.zst tranne il PLY).
+
+    Vertici, spigoli e facce finiscono direttamente negli archivi della nuova scena. Questi formati non
+    hanno una camera: si usa `camera` e, se qualche punto non ha Z > 0, con `inquadra` la camera
+    viene traslata da inquadra_camera (altrimenti si solleva ValueError come in leggi_txt).
+
+    Raises:
+        ValueError: per estensioni non riconosciute, file non validi o punti non proiettabili.
+    """
+    nome = percorso.lower()
+    if _compressione_da_percorso(nome):
+        nome = os.path.splitext(nome)[0]
+    estensione = os.path.splitext(nome)[1]
+    if estensione == ".obj":
+        punti, spigoli, facce = leggi_obj(percorso, dtype, avanzamento)
+    elif estensione == ".ply":
+        if _compressione_da_percorso(percorso):
+            raise ValueError("I file .ply compressi non sono supportati (il PLY è aperto con memory mapping).")
+        punti, spigoli, facce = leggi_ply(percorso, dtype)
+    elif estensione in (".xyz", ".csv", ".pts"):
+        punti, spigoli, facce = leggi_xyz(percorso, dtype, avanzamento), ArchivioSpigoli(), ArchivioPunti(3, dtype=np.int64)
+    else:
+        raise ValueError(f"Formato non riconosciuto: {estensione or percorso}.")
+
+    uv, valido = camera.proietta(punti.array)
+    if not valido.all():
+        if not inquadra:
+            raise ValueError("Z deve essere > 0: i punti non sono tutti davanti alla camera.")
+        camera = inquadra_camera(camera, punti.array)
+        uv, valido = camera.proietta(punti.array)
+
+    scena = Scena(camera, punti, spigoli, facce)
+    scena.proiezioni.inserisci(scena.camera, punti, uv)
+    return scena
@@ -0,0 +1,687 @@
+# =============================================================================
+#  CoordCodeGeometria — Problemi inversi della proiezione (senza interfaccia grafica)
+#  Autore: Alessio de Dato - Ingegneria Informatica UniPi
+#
+#  DESCRIZIONE GENERALE
+#  --------------------
+#  CoordCodeCore va da 3D a 2D (X,Y,Z -> u,v). Questo modulo risolve il cammino inverso a
+#  partire da corrispondenze (X,Y,Z) ↔ (u,v), per esempio quelle di [Punti] lette con
+#  leggi_corrispondenze:
+#   • calibrazione della camera: stima lineare DLT (matrice 3x4 normalizzata alla Hartley,
+#     scomposta in K·[R|t]) seguita da raffinamento non lineare (Levenberg–Marquardt)
+#     dell'errore di riproiezione;
+#   • stima della posa a intrinseci noti (Perspective-n-Point): DLT calibrata su tutti i punti
+#     e, per dati rumorosi o con corrispondenze errate, RANSAC con ipotesi P3P generate e
+#     valutate a blocchi vettoriali (eventualmente su un pool di processi);
+#   • triangolazione: punti 3D ricostruiti dalle osservazioni (u,v) di due o più viste degli
+#     stessi punti, con un sistema 3x3 ai minimi quadrati per punto risolto per tutti insieme.
+#  Tutte le operazioni sulle N corrispondenze sono vettoriali (NumPy): i sistemi lineari
+#  sono ridotti a matrici 12x12 / 9x9 prima della soluzione.
+#
+#  ORGANIZZAZIONE DEL CODICE
+#  -------------------------
+#   • Classe RisultatoCalibrazione : camera stimata ed errori di riproiezione (RMS in pixel).
+#   • errore_riproiezione          : RMS in pixel di una camera sulle corrispondenze.
+#   • stima_dlt                    : matrice di proiezione 3x4 con la DLT normalizzata.
+#   • scomponi_proiezione          : P = K·[R|t] -> Camera (focale media, cx, cy, posa).
+#   • raffina_camera               : Levenberg–Marquardt su intrinseci (ed eventualmente posa).
+#   • calibra                      : DLT (o intrinseci lineari a posa nota) + raffinamento.
+#   • Classe RisultatoPosa         : camera con la posa stimata, punti in accordo e RMS.
+#   • ipotesi_p3p                  : pose (R, t) da B terne di corrispondenze in un colpo solo.
+#   • punteggio_ipotesi            : punti in accordo e costo MSAC di B pose (proiezione broadcast).
+#   • risolvi_pnp                  : PnP su tutte le corrispondenze o con RANSAC + raffinamento.
+#   • Classe RisultatoTriangolazione : punti ricostruiti, residui per vista, parallasse.
+#   • triangola                    : triangolazione lineare (pesata) di N punti da V viste.
+#   • triangola_viste              : lettura di più file .txt (leggi_vista) + triangola.
+#                                    Esempio: Esempi/CuboVistaSinistra.txt e Esempi/CuboVistaDestra.txt.
+# =============================================================================
+
+import math
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from CoordCodeCore import Camera, angoli_da_rotazione, correggi_distorsione, leggi_vista, proietta_pose
+
+# Corrispondenze minime: 6 per la DLT (11 gradi di libertà), 2 per i soli intrinseci,
+# 3 per un'ipotesi di posa a intrinseci noti (P3P)
+MINIMO_DLT = 6
+MINIMO_INTRINSECI = 2
+MINIMO_P3P = 3
+
+# RANSAC per la PnP: soglia di accordo in pixel e dimensione dei blocchi di ipotesi valutati
+# insieme (limitata anche dalle proiezioni ipotesi x punti, per contenere la memoria)
+SOGLIA_RANSAC = 2.0
+IPOTESI_PER_BLOCCO = 256
+PROIEZIONI_PER_BLOCCO = 1 << 21
+
+# Triangolazione: sotto questo angolo (gradi) tra i raggi la profondità non è determinata
+PARALLASSE_MINIMA = 0.5
+
+
+@dataclass
+class RisultatoCalibrazione:
+    """Esito di `calibra`: camera stimata ed errori di riproiezione (RMS, in pixel)."""
+
+    camera: Camera
+    rms: float              # dopo il raffinamento non lineare
+    rms_lineare: float      # della sola stima lineare (DLT o intrinseci a posa nota)
+    iterazioni: int         # iterazioni di Levenberg–Marquardt eseguite
+
+    def descrizione(self) -> str:
+        return f"{self.camera.descrizione()}  —  RMS {self.rms:.4g} px (lineare {self.rms_lineare:.4g} px)"
+
+
+def _corrispondenze(punti_3d, uv) -> tuple[np.ndarray, np.ndarray]:
+    punti = np.asarray(punti_3d, dtype=np.float64).reshape(-1, 3)
+    uv = np.asarray(uv, dtype=np.float64).reshape(-1, 2)
+    if len(punti) != len(uv):
+        raise ValueError(f"Numero di punti 3D ({len(punti)}) e di osservazioni (u,v) ({len(uv)}) diverso.")
+    finiti = np.isfinite(punti).all(axis=1) & np.isfinite(uv).all(axis=1)
+    return punti[finiti], uv[finiti]
+
+
+def errore_riproiezione(camera: Camera, punti_3d, uv) -> float:
+    """Errore di riproiezione RMS (pixel) di `camera` sulle corrispondenze; inf se un punto è dietro la camera."""
+    punti, uv = _corrispondenze(punti_3d, uv)
+    previsti, valido = camera.proietta(punti)
+    if not valido.all():
+        return float("inf")
+    return float(np.sqrt(np.mean(np.sum((previsti - uv) ** 2, axis=1))))
+
+
+def _normalizzazione(punti: np.ndarray) -> np.ndarray:
+    """Trasformazione di Hartley: baricentro nell'origine e distanza media sqrt(d)."""
+    d = punti.shape[1]
+    centro = punti.mean(axis=0)
+    scala = np.sqrt(d) / (np.mean(np.linalg.norm(punti - centro, axis=1)) or 1.0)
+    t = np.eye(d + 1)
+    t[:d, :d] *= scala
+    t[:d, d] = -scala * centro
+    return t
+
+
+def stima_dlt(punti_3d, uv) -> np.ndarray:
+    """Matrice di proiezione 3x4 (a meno di scala) con la Direct Linear Transform normalizzata.
+
+    Invece della SVD della matrice 2Nx12 si risolve l'autovettore minimo di AᵀA (12x12),
+    accumulata con due prodotti matriciali: il costo è lineare in N e piccolo anche per
+    decine di migliaia di corrispondenze.
+
+    Raises:
+        ValueError: con meno di MINIMO_DLT corrispondenze.
+    """
+    punti, uv = _corrispondenze(punti_3d, uv)
+    if len(punti) < MINIMO_DLT:
+        raise ValueError(f"Servono almeno {MINIMO_DLT} corrispondenze per la DLT (trovate {len(punti)}).")
+
+    t3, t2 = _normalizzazione(punti), _normalizzazione(uv)
+    xh = np.column_stack((punti, np.ones(len(punti)))) @ t3.T     # Nx4
+    un = uv @ t2[:2, :2].T + t2[:2, 2]                            # Nx2
+
+    # Righe [X, 0, -u·X] e [0, X, -v·X]: AᵀA si compone a blocchi senza costruire A
+    zero = np.zeros_like(xh)
+    riga_u = np.hstack((xh, zero, -un[:, :1] * xh))
+    riga_v = np.hstack((zero, xh, -un[:, 1:] * xh))
+    ata = riga_u.T @ riga_u + riga_v.T @ riga_v
+    _, vettori = np.linalg.eigh(ata)
+    p_norm = vettori[:, 0].reshape(3, 4)
+    return np.linalg.inv(t2) @ p_norm @ t3
+
+
+def scomponi_proiezione(p: np.ndarray, punti_3d=None, modello: Camera | None = None) -> Camera:
+    """Scompone P = K·[R|t] (RQ) in una Camera: focale media di fx e fy, skew ignorato.
+
+    Con `punti_3d` il segno di P è scelto in modo che i punti siano davanti alla camera.
+    I campi non stimati (distorsione) sono copiati da `modello`.
+    """
+    p = np.asarray(p, dtype=np.float64)
+    if punti_3d is not None:
+        w = np.column_stack((punti_3d, np.ones(len(punti_3d)))) @ p[2]
+        if np.median(w) * np.linalg.det(p[:, :3]) < 0:
+            p = -p
+
+    # RQ tramite QR della matrice ribaltata
+    q, r = np.linalg.qr(np.flipud(p[:, :3]).T)
+    k = np.flipud(np.fliplr(r.T))
+    rot = np.flipud(q.T)
+    segni = np.diag(np.sign(np.diag(k)))
+    k, rot = k @ segni, segni @ rot
+    t = np.linalg.solve(k, p[:, 3])  # la scala di P si semplifica: t è già metrico
+    k = k / k[2, 2]
+    if np.linalg.det(rot) < 0:
+        rot, t = -rot, -t
+
+    base = modello or Camera(1.0, 0.0, 0.0)
+    return replace(
+        base,
+        focale=float((k[0, 0] + k[1, 1]) / 2), cx=float(k[0, 2]), cy=float(k[1, 2]),
+        rotazione=angoli_da_rotazione(rot), traslazione=tuple(float(v) for v in t),
+    )
+
+
+def _intrinseci_lineari(camera: Camera, punti: np.ndarray, uv: np.ndarray) -> Camera:
+    """Minimi quadrati lineari di (f, cx, cy) a posa e distorsione nulle/fisse: u = f·x + cx, v = f·y + cy."""
+    pinhole = replace(camera, focale=1.0, cx=0.0, cy=0.0, distorsione=(0.0,) * 5)
+    xy, valido = pinhole.proietta(punti)
+    if not valido.all():
+        raise ValueError("Con la posa corrente alcuni punti hanno Z <= 0: impossibile stimare gli intrinseci.")
+    n = len(punti)
+    a = np.zeros((2 * n, 3))
+    a[:n, 0], a[:n, 1] = xy[:, 0], 1.0
+    a[n:, 0], a[n:, 2] = xy[:, 1], 1.0
+    soluzione, *_ = np.linalg.lstsq(a, np.concatenate((uv[:, 0], uv[:, 1])), rcond=None)
+    f, cx, cy = soluzione.tolist()
+    return replace(camera, focale=f, cx=cx, cy=cy)
+
+
+def _parametri(camera: Camera, stima_posa: bool, stima_intrinseci: bool = True) -> np.ndarray:
+    valori = [camera.focale, camera.cx, camera.cy] if stima_intrinseci else []
+    if stima_posa:
+        valori += [*camera.rotazione, *camera.traslazione]
+    return np.array(valori, dtype=np.float64)
+
+
+def _da_parametri(base: Camera, theta: np.ndarray, stima_posa: bool, stima_intrinseci: bool = True) -> Camera:
+    campi = {}
+    if stima_intrinseci:
+        f, cx, cy = theta[:3].tolist()
+        campi.update(focale=f, cx=cx, cy=cy)
+        theta = theta[3:]
+    if stima_posa:
+        campi.update(rotazione=tuple(theta[:3].tolist()), traslazione=tuple(theta[3:6].tolist()))
+    return replace(base, **campi)
+
+
+def raffina_camera(
+    camera: Camera,
+    punti_3d,
+    uv,
+    stima_posa: bool = True,
+    iterazioni: int = 50,
+    tolleranza: float = 1e-10,
+    stima_intrinseci: bool = True,
+) -> tuple[Camera, int]:
+    """Raffina la camera minimizzando l'errore di riproiezione con Levenberg–Marquardt.
+
+    I parametri liberi sono gli intrinseci (`stima_intrinseci`) e/o la posa (`stima_posa`).
+    Lo jacobiano (2N x 3, 6 o 9) è calcolato per differenze finite con una proiezione
+    vettoriale per parametro; le equazioni normali sono al più 9x9.
+
+    Returns:
+        tuple: (camera raffinata, iterazioni eseguite).
+    """
+    punti, uv = _corrispondenze(punti_3d, uv)
+    theta = _parametri(camera, stima_posa, stima_intrinseci)
+    if theta.size == 0:
+        return camera, 0
+
+    def residui(theta: np.ndarray) -> np.ndarray:
+        previsti, valido = _da_parametri(camera, theta, stima_posa, stima_intrinseci).proietta(punti)
+        if not valido.all():
+            return None
+        return (previsti - uv).ravel()
+
+    r = residui(theta)
+    if r is None:
+        raise ValueError("La stima iniziale porta alcuni punti dietro la camera (Z <= 0).")
+    costo = r @ r
+    smorzamento = 1e-3
+    eseguite = 0
+    for eseguite in range(1, iterazioni + 1):
+        passi = 1e-6 * np.maximum(1.0, np.abs(theta))
+        jac = np.empty((r.size, theta.size))
+        for k in range(theta.size):
+            spostato = theta.copy()
+            spostato[k] += passi[k]
+            rk = residui(spostato)
+            jac[:, k] = 0.0 if rk is None else (rk - r) / passi[k]
+        jtj, jtr = jac.T @ jac, jac.T @ r
+
+        migliorato = False
+        while smorzamento < 1e12:
+            delta = np.linalg.solve(jtj + smorzamento * np.diag(np.diag(jtj) + 1e-12), -jtr)
+            nuovi = residui(theta + delta)
+            if nuovi is not None and nuovi @ nuovi < costo:
+                theta, r, costo_prec, costo = theta + delta, nuovi, costo, nuovi @ nuovi
+                smorzamento = max(smorzamento / 10, 1e-12)
+                migliorato = True
+                break
+            smorzamento *= 10
+        if not migliorato or costo_prec - costo <= tolleranza * max(costo_prec, 1e-300):
+            break
+    return _da_parametri(camera, theta, stima_posa, stima_intrinseci), eseguite
+
+
+def calibra(
+    punti_3d, uv, stima_posa: bool = True, camera_iniziale: Camera | None = None, iterazioni: int = 50
+) -> RisultatoCalibrazione:
+    """Stima la camera che meglio spiega le corrispondenze (X,Y,Z) ↔ (u,v).
+
+    Con `stima_posa` si stimano intrinseci e posa (DLT + raffinamento, almeno 6 punti non
+    complanari); altrimenti solo f, cx, cy con la posa di `camera_iniziale` (anche per punti
+    complanari, almeno 2). La distorsione di `camera_iniziale`, se presente, resta fissa.
+
+    Raises:
+        ValueError: con corrispondenze insufficienti o degeneri.
+    """
+    punti, uv = _corrispondenze(punti_3d, uv)
+    modello = camera_iniziale or Camera(1.0, 0.0, 0.0)
+    if stima_posa:
+        iniziale = scomponi_proiezione(stima_dlt(punti, uv), punti, modello)
+    else:
+        if len(punti) < MINIMO_INTRINSECI:
+            raise ValueError(f"Servono almeno {MINIMO_INTRINSECI} corrispondenze (trovate {len(punti)}).")
+        iniziale = _intrinseci_lineari(modello, punti, uv)
+    if not iniziale.focale > 0 or not np.isfinite(iniziale.focale):
+        raise ValueError("Corrispondenze degeneri: la focale stimata non è positiva.")
+
+    rms_lineare = errore_riproiezione(iniziale, punti, uv)
+    camera, eseguite = raffina_camera(iniziale, punti, uv, stima_posa, iterazioni)
+    return RisultatoCalibrazione(camera, errore_riproiezione(camera, punti, uv), rms_lineare, eseguite)
+
+
+# =============================================================================
+#  POSA A INTRINSECI NOTI (PnP)
+# =============================================================================
+
+@dataclass
+class RisultatoPosa:
+    """Esito di `risolvi_pnp`: camera con la posa stimata e punti in accordo con essa."""
+
+    camera: Camera
+    rms: float              # errore di riproiezione sui soli punti in accordo (pixel)
+    consenso: np.ndarray    # maschera N: corrispondenze entro la soglia
+    ipotesi: int            # ipotesi RANSAC valutate (0 senza RANSAC)
+
+    def descrizione(self) -> str:
+        return (
+            f"{self.camera.descrizione()}  —  {int(self.consenso.sum())}/{len(self.consenso)} punti in accordo, "
+            f"RMS {self.rms:.4g} px, {self.ipotesi} ipotesi"
+        )
+
+
+def _coordinate_normalizzate(camera: Camera, uv: np.ndarray) -> np.ndarray:
+    """(u,v) -> coordinate ideali (x, y) sul piano Z = 1 della camera, distorsione corretta."""
+    x = (uv[:, 0] - camera.cx) / camera.focale
+    y = (uv[:, 1] - camera.cy) / camera.focale
+    if camera.ha_distorsione:
+        x, y = correggi_distorsione(x, y, camera.distorsione)
+    return np.column_stack((x, y))
+
+
+def _posa_lineare(punti: np.ndarray, xy: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Posa (R, t) da almeno 6 corrispondenze con la DLT calibrata.
+
+    [R|t] è stimata a meno di scala come in stima_dlt (coordinate già normalizzate, quindi
+    K = I); la parte 3x3 è poi riportata alla rotazione più vicina (SVD) e t diviso per la scala.
+
+    Raises:
+        ValueError: per corrispondenze degeneri (es. punti complanari).
+    """
+    p = stima_dlt(punti, xy)
+    if np.linalg.det(p[:, :3]) < 0:   # la parte 3x3 è s·R con det(R) = +1
+        p = -p
+    u, valori, vt = np.linalg.svd(p[:, :3])
+    if not valori[2] > 1e-9 * valori[0]:
+        raise ValueError("Corrispondenze degeneri (punti complanari?): impossibile stimare la posa.")
+    return u @ vt, p[:, 3] / valori.mean()
+
+
+def ipotesi_p3p(punti: np.ndarray, xy: np.ndarray, campioni) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pose (R, t) da B terne di corrispondenze (P3P di Grunert), tutte insieme.
+
+    Per ogni terna le distanze dei punti lungo i raggi si ricavano dalle radici reali di una
+    quartica (fino a 4 soluzioni), trovate come autovalori delle matrici compagne Bx4x4; la
+    posa che porta i punti mondo su quelli camera è poi quella di Kabsch (SVD Bx3x3).
+
+    Args:
+        punti: Nx3 nel riferimento mondo.
+        xy: Nx2 coordinate normalizzate ideali (vedi _coordinate_normalizzate).
+        campioni: Bx3 indici delle corrispondenze.
+
+    Returns:
+        tuple: (rotazioni Bx4x3x3, traslazioni Bx4x3, valide Bx4) — una riga per radice.
+    """
+    campioni = np.asarray(campioni).reshape(-1, 3)
+    mondo = punti[campioni]                                              # Bx3x3
+    raggi = np.concatenate((xy[campioni], np.ones(campioni.shape + (1,))), axis=2)
+    raggi /= np.linalg.norm(raggi, axis=2, keepdims=True)
+
+    # Lati opposti ai vertici e coseni degli angoli tra i raggi (notazione di Haralick et al.)
+    a2 = np.sum((mondo[:, 1] - mondo[:, 2]) ** 2, axis=1)
+    b2 = np.sum((mondo[:, 0] - mondo[:, 2]) ** 2, axis=1)
+    c2 = np.sum((mondo[:, 0] - mondo[:, 1]) ** 2, axis=1)
+    ca = np.sum(raggi[:, 1] * raggi[:, 2], axis=1)
+    cb = np.sum(raggi[:, 0] * raggi[:, 2], axis=1)
+    cg = np.sum(raggi[:, 0] * raggi[:, 1], axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = (a2 - c2) / b2
+        e = (a2 + c2) / b2
+        coefficienti = np.stack((
+            (d - 1) ** 2 - 4 * c2 / b2 * ca ** 2,
+            4 * (d * (1 - d) * cb - (1 - e) * ca * cg + 2 * c2 / b2 * ca ** 2 * cb),
+            2 * (d ** 2 - 1 + 2 * d ** 2 * cb ** 2 + 2 * (b2 - c2) / b2 * ca ** 2
+                 - 4 * e * ca * cb * cg + 2 * (b2 - a2) / b2 * cg ** 2),
+            4 * (-d * (1 + d) * cb + 2 * a2 / b2 * cg ** 2 * cb - (1 - e) * ca * cg),
+            (1 + d) ** 2 - 4 * a2 / b2 * cg ** 2,
+        ), axis=1)                                                       # Bx5, grado decrescente
+        finite = np.isfinite(coefficienti).all(axis=1) & (np.abs(coefficienti[:, 0]) > 1e-12)
+        coefficienti[~finite] = (1.0, 0.0, 0.0, 0.0, -1.0)
+
+        compagna = np.zeros((len(campioni), 4, 4))
+        compagna[:, 0, :] = -coefficienti[:, 1:] / coefficienti[:, :1]
+        compagna[:, [1, 2, 3], [0, 1, 2]] = 1.0
+        radici = np.linalg.eigvals(compagna)                             # Bx4 complesse
+        v = radici.real
+        reali = np.abs(radici.imag) <= 1e-6 * (1.0 + np.abs(v))
+
+        ca, cb, cg, d, b2 = (x[:, None] for x in (ca, cb, cg, d, b2))
+        u = ((d - 1) * v ** 2 - 2 * d * cb * v + 1 + d) / (2 * (cg - v * ca))
+        s1 = np.sqrt(b2 / (1 + v ** 2 - 2 * v * cb))
+    valide = finite[:, None] & reali & (v > 0) & (u > 0) & np.isfinite(u) & np.isfinite(s1)
+
+    # Punti nel riferimento camera e allineamento rigido (Kabsch) con quelli mondo: BxSx3x3
+    distanze = np.stack((s1, u * s1, v * s1), axis=2)
+    distanze[~valide] = 1.0
+    camera = distanze[..., None] * raggi[:, None]
+    centro_m = mondo.mean(axis=1)[:, None]
+    centro_c = camera.mean(axis=2)
+    h = (mondo - centro_m)[:, None].transpose(0, 1, 3, 2) @ (camera - centro_c[:, :, None])
+    su, _, svt = np.linalg.svd(h)
+    segni = np.ones(h.shape[:2] + (3,))
+    segni[..., 2] = np.sign(np.linalg.det(svt.transpose(0, 1, 3, 2) @ su.transpose(0, 1, 3, 2)))
+    rotazioni = svt.transpose(0, 1, 3, 2) @ (segni[..., None] * su.transpose(0, 1, 3, 2))
+    traslazioni = centro_c - (rotazioni @ centro_m[..., None])[..., 0]
+    return rotazioni, traslazioni, valide
+
+
+def punteggio_ipotesi(
+    punti: np.ndarray, xy: np.ndarray, rotazioni: np.ndarray, traslazioni: np.ndarray, soglia: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Valuta B pose su tutte le N corrispondenze con un'unica proiezione broadcast.
+
+    `soglia` è in coordinate normalizzate (pixel / focale). Il costo è quello di MSAC: errore
+    quadratico per i punti in accordo, soglia² per gli altri (e per quelli dietro la camera).
+
+    Returns:
+        tuple: (punti in accordo per ipotesi B, costo B).
+    """
+    previsti, valido = proietta_pose(punti, rotazioni, traslazioni, 1.0, 0.0, 0.0)
+    errore = np.sum((previsti - xy) ** 2, axis=2)
+    soglia2 = soglia * soglia
+    accordo = valido & (errore < soglia2)       # NaN (dietro la camera) -> False
+    costo = np.where(accordo, errore, soglia2).sum(axis=1)
+    return accordo.sum(axis=1), costo
+
+
+def _campioni(generatore: np.random.Generator, n: int, b: int, m: int) -> np.ndarray:
+    """B campioni di M indici distinti in [0, n)."""
+    if n <= 1024:
+        return generatore.random((b, n)).argpartition(m - 1, axis=1)[:, :m]
+    # Con molti punti le ripetizioni sono rarissime: i campioni che ne hanno risultano degeneri
+    return generatore.integers(0, n, size=(b, m))
+
+
+def _blocco_ransac(punti, xy, soglia, n_ipotesi, seme) -> tuple[float, int, np.ndarray | None, np.ndarray | None]:
+    """Genera e valuta `n_ipotesi` terne; ritorna (costo, punti in accordo, R, t) della posa migliore."""
+    generatore = np.random.default_rng(seme)
+    rotazioni, traslazioni, valide = ipotesi_p3p(punti, xy, _campioni(generatore, len(punti), n_ipotesi, MINIMO_P3P))
+    rotazioni, traslazioni = rotazioni[valide], traslazioni[valide]   # fino a 4 pose per terna
+    if not len(rotazioni):
+        return math.inf, 0, None, None
+    accordo, costo = punteggio_ipotesi(punti, xy, rotazioni, traslazioni, soglia)
+    i = int(np.argmin(costo))
+    return float(costo[i]), int(accordo[i]), rotazioni[i], traslazioni[i]
+
+
+# Dati condivisi dai processi del pool RANSAC: inviati una volta sola all'avvio di ciascuno
+_DATI_RANSAC: tuple = ()
+
+
+def _inizializza_processo_ransac(punti, xy, soglia) -> None:
+    global _DATI_RANSAC
+    _DATI_RANSAC = (punti, xy, soglia)
+
+
+def _blocco_ransac_processo(n_ipotesi, seme):
+    return _blocco_ransac(*_DATI_RANSAC, n_ipotesi, seme)
+
+
+def _ipotesi_necessarie(frazione_accordo: float, confidenza: float) -> float:
+    """Ipotesi che garantiscono con probabilità `confidenza` almeno un campione tutto in accordo."""
+    buoni = frazione_accordo ** MINIMO_P3P
+    if buoni >= 1.0:
+        return 0.0
+    if buoni <= 0.0:
+        return math.inf
+    return math.log1p(-confidenza) / math.log1p(-buoni)
+
+
+def _ransac_pnp(punti, xy, soglia, confidenza, max_ipotesi, processi, seme, avanzamento):
+    """Ciclo RANSAC a blocchi; ritorna (R, t, ipotesi valutate) della posa di costo minimo."""
+    n = len(punti)
+    per_blocco = max(1, min(IPOTESI_PER_BLOCCO, PROIEZIONI_PER_BLOCCO // (4 * n)))
+    # Un seme figlio per blocco: il risultato non dipende da quale processo valuta il blocco
+    semi = np.random.SeedSequence(seme)
+    migliore = (math.inf, 0, None, None)
+    necessarie = float(max_ipotesi)
+    valutate = 0
+
+    def registra(esito) -> None:
+        nonlocal migliore, necessarie, valutate
+        valutate += per_blocco
+        if esito[0] < migliore[0]:
+            migliore = esito
+            necessarie = min(float(max_ipotesi), _ipotesi_necessarie(esito[1] / n, confidenza))
+        if avanzamento is not None:
+            avanzamento(min(valutate, int(necessarie)), int(necessarie))
+
+    if not processi or processi <= 1:
+        while valutate < necessarie:
+            registra(_blocco_ransac(punti, xy, soglia, per_blocco, semi.spawn(1)[0]))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=processi, initializer=_inizializza_processo_ransac, initargs=(punti, xy, soglia)
+        ) as pool:
+            in_corso = set()
+            while True:
+                while len(in_corso) < processi and valutate + len(in_corso) * per_blocco < necessarie:
+                    in_corso.add(pool.submit(_blocco_ransac_processo, per_blocco, semi.spawn(1)[0]))
+                if not in_corso:
+                    break
+                completati, in_corso = wait(in_corso, return_when=FIRST_COMPLETED)
+                for futuro in completati:
+                    registra(futuro.result())
+    return migliore[2], migliore[3], valutate
+
+
+def risolvi_pnp(
+    punti_3d,
+    uv,
+    camera: Camera,
+    ransac: bool = True,
+    soglia: float = SOGLIA_RANSAC,
+    confidenza: float = 0.999,
+    max_ipotesi: int = 100_000,
+    processi: int | None = None,
+    seme: int | None = None,
+    avanzamento=None,
+) -> RisultatoPosa:
+    """Stima la posa (R, t) di `camera` dalle corrispondenze, a intrinseci e distorsione noti.
+
+    Senza `ransac` si usano tutte le corrispondenze (DLT calibrata, almeno 6 punti non
+    complanari, + Levenberg–Marquardt sulla posa). Con `ransac` le terne P3P sono generate e
+    valutate a blocchi (MSAC, soglia in pixel) finché la `confidenza` richiesta non è
+    raggiunta o si arriva a `max_ipotesi`; con `processi` > 1 i blocchi sono distribuiti su
+    un pool di processi. La posa migliore è poi raffinata sui soli punti in accordo.
+
+    Args:
+        avanzamento: callback opzionale `avanzamento(terne_valutate, terne_necessarie)`.
+
+    Raises:
+        ValueError: con corrispondenze insufficienti o degeneri, o nessuna posa accettabile.
+    """
+    punti, uv = _corrispondenze(punti_3d, uv)
+    minimo = MINIMO_P3P + 1 if ransac else MINIMO_DLT
+    if len(punti) < minimo:
+        raise ValueError(f"Servono almeno {minimo} corrispondenze per la PnP (trovate {len(punti)}).")
+    xy = _coordinate_normalizzate(camera, uv)
+
+    ipotesi = 0
+    consenso = np.ones(len(punti), dtype=bool)
+    if ransac:
+        soglia_normalizzata = soglia / camera.focale
+        rotazione, traslazione, ipotesi = _ransac_pnp(
+            punti, xy, soglia_normalizzata, confidenza, max_ipotesi, processi, seme, avanzamento
+        )
+        if rotazione is None:
+            raise ValueError("RANSAC: nessuna ipotesi valida (punti complanari o degeneri?).")
+        previsti, valido = proietta_pose(punti, rotazione[None], traslazione[None], 1.0, 0.0, 0.0)
+        consenso = valido[0] & (np.sum((previsti[0] - xy) ** 2, axis=1) < soglia_normalizzata ** 2)
+        if consenso.sum() < minimo:
+            raise ValueError(f"RANSAC: solo {int(consenso.sum())} punti in accordo con la posa migliore.")
+    else:
+        rotazione, traslazione = _posa_lineare(punti, xy)
+
+    iniziale = replace(camera, rotazione=angoli_da_rotazione(rotazione), traslazione=tuple(traslazione.tolist()))
+    stimata, _ = raffina_camera(iniziale, punti[consenso], uv[consenso], stima_posa=True, stima_intrinseci=False)
+
+    if ransac:
+        previsti, valido = stimata.proietta(punti)
+        consenso = valido & (np.sum((previsti - uv) ** 2, axis=1) < soglia * soglia)
+    return RisultatoPosa(stimata, errore_riproiezione(stimata, punti[consenso], uv[consenso]), consenso, ipotesi)
+
+
+# =============================================================================
+#  TRIANGOLAZIONE DA PIÙ VISTE
+# =============================================================================
+
+@dataclass
+class RisultatoTriangolazione:
+    """Esito di `triangola`: punti ricostruiti e indicatori di qualità per punto."""
+
+    punti_3d: np.ndarray    # Nx3, NaN dove il punto non è triangolabile
+    residui: np.ndarray     # NxV errore di riproiezione per vista (pixel), NaN se non valido
+    parallasse: np.ndarray  # N angolo massimo tra i raggi delle viste (gradi)
+    valido: np.ndarray      # N: parallasse sufficiente e punto davanti a tutte le camere
+
+    @property
+    def rms(self) -> np.ndarray:
+        """Errore di riproiezione RMS per punto sulle V viste (pixel)."""
+        return np.sqrt(np.mean(self.residui ** 2, axis=1))
+
+    def descrizione(self) -> str:
+        validi = int(self.valido.sum())
+        testo = f"{validi}/{len(self.valido)} punti triangolati da {self.residui.shape[1]} viste"
+        if validi:
+            rms = self.rms[self.valido]
+            testo += f", residuo RMS mediano {np.median(rms):.4g} px (max {rms.max():.4g} px)"
+        return testo
+
+
+def _risolvi_simmetrici(a00, a01, a02, a11, a12, a22, b0, b1, b2) -> np.ndarray:
+    """Risolve N sistemi 3x3 simmetrici dati elemento per elemento (array di lunghezza N), con i cofattori.
+
+    Per matrici così piccole la formula chiusa su array contigui è diverse volte più veloce
+    di np.linalg.solve sugli stessi sistemi impilati Nx3x3.
+
+    Returns:
+        np.ndarray: soluzioni 3xN.
+    """
+    c00, c01, c02 = a11 * a22 - a12 * a12, a02 * a12 - a01 * a22, a01 * a12 - a02 * a11
+    c11, c12, c22 = a00 * a22 - a02 * a02, a01 * a02 - a00 * a12, a00 * a11 - a01 * a01
+    inverso_det = 1.0 / (a00 * c00 + a01 * c01 + a02 * c02)
+    return np.stack((
+        (c00 * b0 + c01 * b1 + c02 * b2) * inverso_det,
+        (c01 * b0 + c11 * b1 + c12 * b2) * inverso_det,
+        (c02 * b0 + c12 * b1 + c22 * b2) * inverso_det,
+    ))
+
+
+def triangola(camere: list[Camera], osservazioni, parallasse_minima: float = PARALLASSE_MINIMA) -> RisultatoTriangolazione:
+    """Triangola N punti osservati da V >= 2 camere note (stesso ordine dei punti in ogni vista).
+
+    Ogni vista fornisce per punto le due equazioni lineari (x·r3 - r1)·X = t1 - x·t3 e
+    (y·r3 - r2)·X = t2 - y·t3 (coordinate normalizzate ideali, distorsione corretta): le
+    equazioni normali 3x3 di tutti i punti sono accumulate come array Nx3x3 e risolte con
+    un'unica formula chiusa. Un secondo passaggio pesa le equazioni con 1/Z della prima stima, così
+    da approssimare l'errore di riproiezione invece dell'errore algebrico.
+
+    Args:
+        camere: V camere (intrinseci, posa e distorsione).
+        osservazioni: V array Nx2 di (u,v) in pixel.
+        parallasse_minima: angolo minimo (gradi) tra i raggi perché un punto sia considerato valido.
+
+    Raises:
+        ValueError: con meno di 2 viste o viste con numero di punti diverso.
+    """
+    if len(camere) < 2 or len(camere) != len(osservazioni):
+        raise ValueError("Servono almeno 2 viste, ciascuna con camera e osservazioni.")
+    osservazioni = [np.asarray(uv, dtype=np.float64).reshape(-1, 2) for uv in osservazioni]
+    n = len(osservazioni[0])
+    if any(len(uv) != n for uv in osservazioni):
+        raise ValueError("Le viste devono contenere lo stesso numero di punti: " + ", ".join(str(len(uv)) for uv in osservazioni) + ".")
+
+    rotazioni = np.stack([cam.matrice_rotazione for cam in camere])                   # Vx3x3
+    traslazioni = np.array([cam.traslazione for cam in camere], dtype=np.float64)     # Vx3
+    xy = np.stack([_coordinate_normalizzate(cam, uv) for cam, uv in zip(camere, osservazioni)])  # VxNx2
+
+    # Righe a (3x2VxN, una componente per piano così che ogni somma scorra memoria contigua) e
+    # termini noti b (2VxN): per ogni vista prima l'equazione in x, poi quella in y
+    xy_t = np.ascontiguousarray(xy.transpose(0, 2, 1))                                # Vx2xN
+    a = (xy_t[None] * rotazioni[:, 2, :].T[:, :, None, None] - rotazioni[:, :2, :].transpose(2, 0, 1)[..., None])
+    a = a.reshape(3, -1, n)
+    b = (traslazioni[:, :2, None] - xy_t * traslazioni[:, None, 2:]).reshape(-1, n)
+
+    # Parallasse: angolo massimo tra i raggi (riferimento mondo) delle coppie di viste
+    raggi = np.concatenate((xy, np.ones(xy.shape[:2] + (1,))), axis=2) @ rotazioni   # VxNx3 = (Rᵀ·d)ᵀ
+    raggi /= np.linalg.norm(raggi, axis=2, keepdims=True)
+    coseno_minimo = np.ones(n)
+    for i in range(len(camere)):
+        for j in range(i + 1, len(camere)):
+            np.minimum(coseno_minimo, np.sum(raggi[i] * raggi[j], axis=1), out=coseno_minimo)
+    parallasse = np.degrees(np.arccos(np.clip(coseno_minimo, -1.0, 1.0)))
+    valido = parallasse >= parallasse_minima
+
+    pesi = np.ones((len(camere), n))
+    for _ in range(2):
+        aw = a * np.repeat(pesi, 2, axis=0)
+        bw = b * np.repeat(pesi, 2, axis=0)
+        # Equazioni normali: solo i 6 elementi distinti della matrice simmetrica
+        elementi = [np.sum(aw[i] * aw[j], axis=0) for i, j in ((0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2))]
+        termini = [np.sum(aw[i] * bw, axis=0) for i in range(3)]
+        for k, identita in enumerate((1.0, 0.0, 0.0, 1.0, 0.0, 1.0)):
+            elementi[k][~valido] = identita   # sistemi singolari (raggi paralleli): scartati dopo
+        punti = _risolvi_simmetrici(*elementi, *termini)                                # 3xN
+        profondita = rotazioni[:, 2, :] @ punti + traslazioni[:, 2, None]              # VxN
+        davanti = (profondita > 0).all(axis=0)
+        pesi = np.where(davanti, 1.0 / np.where(davanti, profondita, 1.0), 1.0)
+
+    valido &= davanti
+    punti = punti.T
+    punti[~valido] = np.nan
+    residui = np.stack([
+        np.linalg.norm(cam.proietta(punti)[0] - uv, axis=1) for cam, uv in zip(camere, osservazioni)
+    ], axis=1)
+    return RisultatoTriangolazione(punti, residui, parallasse, valido)
+
+
+def triangola_viste(
+    percorsi: list[str], parallasse_minima: float = PARALLASSE_MINIMA, avanzamento=None
+) -> tuple[RisultatoTriangolazione, list[Camera], np.ndarray]:
+    """Legge più .txt degli stessi punti (leggi_vista) e li triangola con le rispettive camere.
+
+    Returns:
+        tuple: (risultato, camere delle viste, punti_3d del primo file), questi ultimi come
+        riferimento per confrontare la ricostruzione con le coordinate esportate.
+    """
+    viste = []
+    for i, percorso in enumerate(percorsi):
+        viste.append(leggi_vista(percorso))
+        if avanzamento is not None:
+            avanzamento(i + 1, len(percorsi))
+    camere = [vista[0] for vista in viste]
+    return triangola(camere, [vista[2] for vista in viste], parallasse_minima), camere, viste[0][1]
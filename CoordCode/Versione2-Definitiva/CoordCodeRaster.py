@@ -0,0 +1,395 @@
+# =============================================================================
+#  CoordCodeRaster — Rasterizzazione vettoriale (NumPy) senza interfaccia grafica
+#  Autore: Alessio de Dato - Ingegneria Informatica UniPi
+#
+#  DESCRIZIONE GENERALE
+#  --------------------
+#  Con mesh di decine di migliaia di facce la vista 2D disegna tutti gli spigoli, anche
+#  quelli dietro la superficie, e l'immagine diventa illeggibile. Il modulo rasterizza le
+#  facce triangolari in un buffer di profondità (1/Z per pixel, il più vicino vince) e lo
+#  usa per decidere quali punti e quali tratti dei segmenti sono visibili dalla camera.
+#  La rasterizzazione è vettoriale a scansione di righe: per ogni blocco di triangoli si
+#  espandono in un colpo solo le coppie (triangolo, riga), si ricava l'intervallo di colonne
+#  interne dalle funzioni di spigolo e si scrive il massimo di 1/Z dei pixel con np.maximum.at.
+#  1/Z è affine nello spazio immagine, quindi l'interpolazione lineare è prospetticamente
+#  corretta sia sulle facce sia lungo i segmenti.
+#  Lo stesso approccio disegna punti e spigoli proiettati in immagini RGB della dimensione
+#  della camera (2·cx x 2·cy), con antialiasing, salvate in PNG (zlib) o .npy: serve a
+#  generare dataset in batch senza Matplotlib né display.
+#
+#  ORGANIZZAZIONE DEL CODICE
+#  -------------------------
+#   • _intervalli            : suddivide elementi di costo variabile in blocchi di costo limitato.
+#   • Classe BufferProfondita: z-buffer delle facce; visibilità di punti e tratti visibili dei segmenti.
+#   • dimensioni_immagine    : griglia di pixel della camera (2·cx x 2·cy).
+#   • disegna / disegna_scena: punti (dischi) e segmenti antialiasing in un'immagine RGB uint8.
+#   • scrivi_png / salva_immagine
+#                            : PNG scritto con zlib + struct, oppure array .npy.
+# =============================================================================
+
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from CoordCodeCore import ritaglia_segmenti
+
+# Lato massimo (in pixel) del buffer di profondità: durante il trascinamento dei cursori
+# basta una risoluzione più bassa
+RISOLUZIONE_PROFONDITA = 1024
+RISOLUZIONE_PROFONDITA_DAL_VIVO = 256
+
+# Coppie (triangolo, pixel) o campioni dei segmenti valutati insieme (~100 MB di temporanei)
+PIXEL_PER_BLOCCO = 1 << 21
+
+# Tolleranza relativa su 1/Z nel confronto con il buffer e distanza (in pixel del buffer)
+# tra i campioni di un segmento
+TOLLERANZA_PROFONDITA = 1e-3
+PASSO_CAMPIONI = 1.0
+
+# Immagini: raggio dei punti e spessore dei segmenti (pixel), colori RGB come nella vista 2D
+RAGGIO_PUNTI_PX = 3.0
+SPESSORE_SPIGOLI_PX = 1.5
+COLORE_SFONDO = (255, 255, 255)
+COLORE_PUNTI = (255, 127, 14)
+COLORE_SPIGOLI = (214, 39, 40)
+
+# PNG: livello zlib (oltre 3 il file si riduce di pochi punti percentuali ma la scrittura
+# raddoppia) e tipo di colore per numero di canali (grigi, RGB, RGBA)
+COMPRESSIONE_PNG = 3
+_TIPI_COLORE_PNG = {1: 0, 3: 2, 4: 6}
+
+
+def _intervalli(costi: np.ndarray, budget: int):
+    """Genera (inizio, fine) consecutivi di elementi il cui costo totale non supera `budget`.
+
+    Un elemento più costoso del budget forma da solo un intervallo.
+    """
+    cumulati = np.cumsum(costi)
+    inizio = 0
+    while inizio < len(costi):
+        base = cumulati[inizio - 1] if inizio else 0
+        fine = max(inizio + 1, int(np.searchsorted(cumulati, base + budget, side="right")))
+        yield inizio, fine
+        inizio = fine
+
+
+# =============================================================================
+# BUFFER DI PROFONDITÀ
+# =============================================================================
+class BufferProfondita:
+    """Buffer di profondità delle facce di una scena, vista dalla camera.
+
+    Il buffer copre il riquadro (u,v) dei vertici delle facce con al più `risoluzione` pixel
+    sul lato maggiore e contiene per ogni pixel il massimo di 1/Z (0 dove non c'è superficie).
+    Un campione (punto o punto di un segmento) è visibile se non è più lontano della superficie
+    nei 3x3 pixel attorno, con un margine pari alla variazione di 1/Z in quei pixel: così i
+    vertici e gli spigoli che giacciono sulla superficie restano visibili anche sulle pieghe,
+    mentre ciò che sta dietro viene nascosto. Fuori dal riquadro nulla è nascosto.
+    """
+
+    def __init__(self, uv, profondita, triangoli, risoluzione: int = RISOLUZIONE_PROFONDITA) -> None:
+        """
+        Args:
+            uv: proiezioni Nx2 dei punti (NaN per i punti dietro la camera).
+            profondita: Z nel riferimento camera degli N punti (Camera.profondita).
+            triangoli: facce Fx3 con indici 0-based nei punti; le facce con un vertice non
+                proiettabile sono ignorate.
+            risoluzione: pixel del lato maggiore del buffer.
+        """
+        self.uv = np.asarray(uv, dtype=np.float64).reshape(-1, 2)
+        profondita = np.asarray(profondita, dtype=np.float64).ravel()
+        with np.errstate(divide="ignore"):
+            self.inv_z = np.where(profondita > 0, 1.0 / profondita, np.nan)
+        self.inv_z[~np.isfinite(self.uv).all(axis=1)] = np.nan
+        triangoli = np.asarray(triangoli, dtype=np.int64).reshape(-1, 3)
+        triangoli = triangoli[np.isfinite(self.inv_z[triangoli]).all(axis=1)]
+
+        # Riquadro dei vertici delle facce e passaggio (u,v) -> pixel del buffer
+        usati = self.uv[np.unique(triangoli)] if len(triangoli) else np.zeros((1, 2))
+        self.origine = usati.min(axis=0)
+        estensione = float((usati.max(axis=0) - self.origine).max())
+        self.scala = (risoluzione - 1) / estensione if estensione > 0 else 1.0
+        larghezza, altezza = (np.floor((usati.max(axis=0) - self.origine) * self.scala) + 1).astype(int)
+        self.profondita = np.zeros((altezza, larghezza))
+        self._rasterizza(triangoli)
+        self._soglia = self._calcola_soglia()
+
+    def _pixel(self, uv: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Coordinate (x, y) continue nel buffer: il pixel (r, c) ha il centro in (c, r)."""
+        xy = (uv - self.origine) * self.scala
+        return xy[..., 0], xy[..., 1]
+
+    def _rasterizza(self, triangoli: np.ndarray) -> None:
+        """Scrive nel buffer il massimo di 1/Z delle facce, a blocchi di PIXEL_PER_BLOCCO coppie."""
+        if not len(triangoli):
+            return
+        altezza, larghezza = self.profondita.shape
+        x, y = self._pixel(self.uv[triangoli])
+        w = self.inv_z[triangoli]
+        # Funzioni di spigolo normalizzate: le coordinate baricentriche di (px, py) sono a·px + b·py + c
+        doppia_area = (x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0]) - (x[:, 2] - x[:, 0]) * (y[:, 1] - y[:, 0])
+        piatti = np.abs(doppia_area) < 1e-12
+        doppia_area[piatti] = 1.0
+        a = (np.roll(y, -1, axis=1) - np.roll(y, -2, axis=1)) / doppia_area[:, None]
+        b = (np.roll(x, -2, axis=1) - np.roll(x, -1, axis=1)) / doppia_area[:, None]
+        c = (np.roll(x, -1, axis=1) * np.roll(y, -2, axis=1) - np.roll(x, -2, axis=1) * np.roll(y, -1, axis=1)) / doppia_area[:, None]
+        # 1/Z affine sul triangolo: w(px, py) = gx·px + gy·py + g0
+        gx, gy, g0 = (a * w).sum(axis=1), (b * w).sum(axis=1), (c * w).sum(axis=1)
+
+        # Ogni faccia marca almeno il pixel del baricentro (le facce più piccole di un pixel
+        # non contengono centri di pixel e lascerebbero buchi nella superficie)
+        bx, by = np.rint(x.mean(axis=1)).astype(np.int64), np.rint(y.mean(axis=1)).astype(np.int64)
+        dentro = (bx >= 0) & (bx < larghezza) & (by >= 0) & (by < altezza)
+        piatto = self.profondita.ravel()
+        np.maximum.at(piatto, by[dentro] * larghezza + bx[dentro], w.mean(axis=1)[dentro])
+
+        # Righe di pixel coperte da ogni faccia, poi per ogni (faccia, riga) l'intervallo di colonne
+        # interne: i tre vincoli a·px + b·py + c >= 0 danno ciascuno un estremo sinistro o destro
+        y0 = np.clip(np.ceil(y.min(axis=1)), 0, altezza).astype(np.int64)
+        y1 = np.clip(np.floor(y.max(axis=1)), -1, altezza - 1).astype(np.int64)
+        righe = np.where(piatti, 0, np.maximum(y1 - y0 + 1, 0))
+        for inizio, fine in _intervalli(righe, PIXEL_PER_BLOCCO):
+            quante = righe[inizio:fine]
+            t = np.repeat(np.arange(inizio, fine), quante)
+            if not len(t):
+                continue
+            py = y0[t] + np.arange(len(t)) - np.repeat(np.cumsum(quante) - quante, quante)
+            resto = b[t] * py[:, None] + c[t] + 1e-9
+            pendenza = a[t]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                limite = -resto / pendenza
+            sinistra = np.where(pendenza > 0, limite, -np.inf).max(axis=1)
+            destra = np.where(pendenza < 0, limite, np.inf).min(axis=1)
+            esclusa = ((pendenza == 0) & (resto < 0)).any(axis=1)
+            px0 = np.maximum(np.ceil(sinistra), 0)
+            px1 = np.minimum(np.floor(destra), larghezza - 1)
+            lunghezze = np.where(esclusa, 0, np.maximum(px1 - px0 + 1, 0)).astype(np.int64)
+            px0 = px0.astype(np.int64)
+            for inizio_r, fine_r in _intervalli(lunghezze, PIXEL_PER_BLOCCO):
+                quanti = lunghezze[inizio_r:fine_r]
+                r = np.repeat(np.arange(inizio_r, fine_r), quanti)
+                px = px0[r] + np.arange(len(r)) - np.repeat(np.cumsum(quanti) - quanti, quanti)
+                tr, pr = t[r], py[r]
+                np.maximum.at(piatto, pr * larghezza + px, gx[tr] * px + gy[tr] * pr + g0[tr])
+
+    def _calcola_soglia(self) -> np.ndarray:
+        """1/Z minimo per essere visibili in ogni pixel: min3x3 - (max3x3 - min3x3) - tolleranza."""
+        bordato = np.pad(self.profondita, 1)
+        altezza, larghezza = self.profondita.shape
+        finestre = [bordato[r:r + altezza, c:c + larghezza] for r in range(3) for c in range(3)]
+        minimo = np.minimum.reduce(finestre)
+        massimo = np.maximum.reduce(finestre)
+        return 2 * minimo - massimo - TOLLERANZA_PROFONDITA * massimo
+
+    def _visibili(self, x: np.ndarray, y: np.ndarray, w: np.ndarray) -> np.ndarray:
+        """Maschera dei campioni (x, y, 1/Z) non nascosti dalla superficie (False se non finiti)."""
+        altezza, larghezza = self.profondita.shape
+        colonna, riga = np.rint(x), np.rint(y)
+        visibili = np.isfinite(w) & np.isfinite(colonna) & np.isfinite(riga)
+        dentro = visibili & (colonna >= 0) & (colonna < larghezza) & (riga >= 0) & (riga < altezza)
+        soglia = self._soglia[riga[dentro].astype(np.int64), colonna[dentro].astype(np.int64)]
+        visibili[dentro] = w[dentro] >= soglia
+        return visibili
+
+    def punti_visibili(self) -> np.ndarray:
+        """Maschera booleana degli N punti visibili (False anche per quelli dietro la camera)."""
+        return self._visibili(*self._pixel(self.uv), self.inv_z)
+
+    def segmenti_visibili(self, coppie) -> np.ndarray:
+        """Tratti visibili dei segmenti (i,j) 0-based, come array Sx2x2 di estremi (u,v).
+
+        Ogni segmento è campionato ogni PASSO_CAMPIONI pixel del buffer; le sequenze di campioni
+        visibili diventano tratti. I segmenti con un estremo non proiettabile sono scartati.
+        """
+        coppie = np.asarray(coppie, dtype=np.int64).reshape(-1, 2)
+        coppie = coppie[np.isfinite(self.inv_z[coppie]).all(axis=1)]
+        inizi, fini = self.uv[coppie[:, 0]], self.uv[coppie[:, 1]]
+        wi, wf = self.inv_z[coppie[:, 0]], self.inv_z[coppie[:, 1]]
+        xi, yi = self._pixel(inizi)
+        xf, yf = self._pixel(fini)
+        lunghezze = np.hypot(xf - xi, yf - yi)
+        campioni = np.clip(np.ceil(lunghezze / PASSO_CAMPIONI), 1, 1 << 20).astype(np.int64)
+
+        tratti = []
+        for inizio, fine in _intervalli(campioni, PIXEL_PER_BLOCCO):
+            quanti = campioni[inizio:fine]
+            s = np.repeat(np.arange(inizio, fine), quanti)
+            primo = np.cumsum(quanti) - quanti
+            k = np.arange(len(s)) - np.repeat(primo, quanti)
+            t = (k + 0.5) / campioni[s]
+            visibili = self._visibili(
+                xi[s] + t * (xf[s] - xi[s]), yi[s] + t * (yf[s] - yi[s]), wi[s] + t * (wf[s] - wi[s])
+            )
+            # Inizi e fini delle sequenze di campioni visibili dentro ogni segmento
+            ultimo = k == campioni[s] - 1
+            precedente = np.concatenate(([False], visibili[:-1])) & (k > 0)
+            successivo = np.concatenate((visibili[1:], [False])) & ~ultimo
+            da = np.flatnonzero(visibili & ~precedente)
+            a = np.flatnonzero(visibili & ~successivo)
+            quale = s[da]
+            t0 = k[da] / campioni[quale]
+            t1 = (k[a] + 1) / campioni[quale]
+            delta = fini[quale] - inizi[quale]
+            tratti.append(np.stack((inizi[quale] + t0[:, None] * delta, inizi[quale] + t1[:, None] * delta), axis=1))
+        return np.concatenate(tratti) if tratti else np.empty((0, 2, 2))
+
+
+# =============================================================================
+# RASTERIZZAZIONE DI PUNTI E SEGMENTI IN IMMAGINI (SENZA MATPLOTLIB)
+# =============================================================================
+def dimensioni_immagine(camera) -> tuple[int, int]:
+    """(larghezza, altezza) in pixel dell'immagine della camera: il punto principale è al centro."""
+    return max(1, round(2 * camera.cx)), max(1, round(2 * camera.cy))
+
+
+def _copertura(strato: np.ndarray, inizi: np.ndarray, fini: np.ndarray, raggio: float, antialias: bool) -> np.ndarray:
+    """Accumula in `strato` (HxW) la copertura dei segmenti inizi→fini larghi 2·raggio pixel.
+
+    I segmenti sono ritagliati sull'immagine e campionati ogni pixel; attorno a ogni campione
+    si valutano i pixel di un quadrato (2r+1)x(2r+1) con la distanza esatta del loro centro dal
+    segmento. Con l'antialiasing la copertura scende linearmente da 1 a 0 nell'ultimo pixel
+    del bordo (raggio - 0.5 .. raggio + 0.5); la sovrapposizione tiene il massimo, così gli
+    incroci non si scuriscono. Un segmento con estremi coincidenti è un disco.
+
+    Returns:
+        np.ndarray: indici lineari dei pixel toccati (senza duplicati), così il chiamante
+        lavora solo su quelli invece che sull'intera immagine.
+    """
+    altezza, larghezza = strato.shape
+    lato = int(np.ceil(raggio + 0.5))
+    dx, dy = (g.ravel() for g in np.meshgrid(np.arange(-lato, lato + 1), np.arange(-lato, lato + 1)))
+    validi = np.isfinite(inizi).all(axis=1) & np.isfinite(fini).all(axis=1)
+    inizi, fini = inizi[validi], fini[validi]
+    d = fini - inizi
+    t0, t1 = ritaglia_segmenti(inizi, d, (-lato, -lato, larghezza + lato, altezza + lato))
+    dentro = t0 <= t1
+    inizi, d, t0, t1 = inizi[dentro], d[dentro], t0[dentro], t1[dentro]
+    lunghezze = np.hypot(d[:, 0], d[:, 1])
+    campioni = np.ceil(lunghezze * (t1 - t0)).astype(np.int64) + 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverso = np.where(lunghezze > 0, 1.0 / (lunghezze * lunghezze), 0.0)
+
+    piatto = strato.ravel()
+    toccati = []
+    for inizio, fine in _intervalli(campioni * len(dx), PIXEL_PER_BLOCCO):
+        quanti = campioni[inizio:fine]
+        s = np.repeat(np.arange(inizio, fine), quanti)
+        k = np.arange(len(s)) - np.repeat(np.cumsum(quanti) - quanti, quanti)
+        t = t0[s] + (t1[s] - t0[s]) * k / np.maximum(campioni[s] - 1, 1)
+        px = np.floor(inizi[s, 0] + t * d[s, 0]).astype(np.int64)[:, None] + dx
+        py = np.floor(inizi[s, 1] + t * d[s, 1]).astype(np.int64)[:, None] + dy
+        # Distanza del centro del pixel dal segmento (proiezione limitata agli estremi)
+        rx = px + 0.5 - inizi[s, 0, None]
+        ry = py + 0.5 - inizi[s, 1, None]
+        u = np.clip((rx * d[s, 0, None] + ry * d[s, 1, None]) * inverso[s, None], 0.0, 1.0)
+        distanza = np.hypot(rx - u * d[s, 0, None], ry - u * d[s, 1, None])
+        if antialias:
+            valore = np.clip(raggio + 0.5 - distanza, 0.0, 1.0)
+        else:
+            valore = (distanza <= raggio).astype(np.float64)
+        tenuti = (valore > 0) & (px >= 0) & (px < larghezza) & (py >= 0) & (py < altezza)
+        indici = py[tenuti] * larghezza + px[tenuti]
+        np.maximum.at(piatto, indici, valore[tenuti])
+        toccati.append(indici)
+    return np.unique(np.concatenate(toccati)) if toccati else np.empty(0, dtype=np.int64)
+
+
+def disegna(
+    uv,
+    coppie,
+    larghezza: int,
+    altezza: int,
+    raggio_punti: float = RAGGIO_PUNTI_PX,
+    spessore: float = SPESSORE_SPIGOLI_PX,
+    antialias: bool = True,
+    buffer: BufferProfondita | None = None,
+) -> np.ndarray:
+    """Disegna punti e segmenti proiettati in un'immagine RGB HxWx3 uint8.
+
+    Il pixel (r, c) copre [c, c+1) x [r, r+1) in coordinate (u,v), come la griglia della camera;
+    i segmenti sono disegnati sotto i punti, con i colori della vista 2D.
+
+    Args:
+        uv: proiezioni Nx2 dei punti (NaN per quelli da non disegnare).
+        coppie: segmenti (i,j) 0-based (Ex2), o None.
+        larghezza, altezza: dimensioni dell'immagine (vedi dimensioni_immagine).
+        raggio_punti, spessore: raggio dei punti e spessore dei segmenti, in pixel.
+        antialias: bordi sfumati (copertura per pixel) invece che netti.
+        buffer: BufferProfondita opzionale per non disegnare punti e tratti coperti dalle facce.
+    """
+    uv = np.asarray(uv, dtype=np.float64).reshape(-1, 2)
+    coppie = np.empty((0, 2), dtype=np.int64) if coppie is None else np.asarray(coppie, dtype=np.int64).reshape(-1, 2)
+    if buffer is not None:
+        tratti = buffer.segmenti_visibili(coppie)
+        uv = uv[buffer.punti_visibili()]
+    else:
+        tratti = uv[coppie]
+
+    immagine = np.empty((altezza, larghezza, 3), dtype=np.uint8)
+    immagine[:] = COLORE_SFONDO
+    pixel = immagine.reshape(-1, 3)
+    strato = np.zeros((altezza, larghezza))
+    for colore, inizi, fini, raggio in (
+        (COLORE_SPIGOLI, tratti[:, 0], tratti[:, 1], spessore / 2),
+        (COLORE_PUNTI, uv, uv, raggio_punti),
+    ):
+        if not len(inizi):
+            continue
+        # Fusione solo sui pixel toccati: il resto dell'immagine resta com'è
+        toccati = _copertura(strato, inizi, fini, raggio, antialias)
+        alfa = strato.ravel()[toccati, None]
+        sotto = pixel[toccati].astype(np.float64)
+        pixel[toccati] = np.rint(sotto + alfa * (np.asarray(colore, dtype=np.float64) - sotto))
+        strato.ravel()[toccati] = 0
+    return immagine
+
+
+def disegna_scena(scena, **opzioni) -> np.ndarray:
+    """Immagine RGB della scena vista dalla sua camera: punti e spigoli manuali (vedi disegna)."""
+    larghezza, altezza = dimensioni_immagine(scena.camera)
+    return disegna(scena.punti_2d.array, scena.spigoli_manuali.indici, larghezza, altezza, **opzioni)
+
+
+def scrivi_png(percorso: str, immagine, compressione: int = COMPRESSIONE_PNG) -> None:
+    """Scrive un PNG a 8 bit (HxW grigi, HxWx3 RGB o HxWx4 RGBA) con zlib, senza librerie esterne.
+
+    Le righe sono salvate senza filtro di predizione: sulle immagini sintetiche (ampie zone
+    uniformi) zlib comprime già bene e la scrittura resta veloce.
+
+    Raises:
+        ValueError: se la forma dell'array non è un'immagine supportata.
+    """
+    immagine = np.ascontiguousarray(immagine, dtype=np.uint8)
+    canali = 1 if immagine.ndim == 2 else immagine.shape[2]
+    if immagine.ndim not in (2, 3) or canali not in _TIPI_COLORE_PNG:
+        raise ValueError("L'immagine deve essere HxW, HxWx3 o HxWx4.")
+    altezza, larghezza = immagine.shape[:2]
+    righe = np.zeros((altezza, 1 + larghezza * canali), dtype=np.uint8)  # byte di filtro 0 per riga
+    righe[:, 1:] = immagine.reshape(altezza, -1)
+
+    def blocco(tipo: bytes, dati: bytes) -> bytes:
+        return struct.pack(">I", len(dati)) + tipo + dati + struct.pack(">I", zlib.crc32(tipo + dati))
+
+    intestazione = struct.pack(">IIBBBBB", larghezza, altezza, 8, _TIPI_COLORE_PNG[canali], 0, 0, 0)
+    with open(percorso, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(blocco(b"IHDR", intestazione))
+        f.write(blocco(b"IDAT", zlib.compress(righe.tobytes(), compressione)))
+        f.write(blocco(b"IEND", b""))
+
+
+def salva_immagine(percorso: str, immagine) -> None:
+    """Salva l'immagine in PNG (scrivi_png) o come array NumPy .npy, secondo l'estensione.
+
+    Raises:
+        ValueError: per estensioni diverse da .png e .npy.
+    """
+    estensione = os.path.splitext(percorso)[1].lower()
+    if estensione == ".png":
+        scrivi_png(percorso, immagine)
+    elif estensione == ".npy":
+        np.save(percorso, np.asarray(immagine))
+    else:
+        raise ValueError(f"Formato immagine non riconosciuto: {estensione or percorso} (usa .png o .npy).")
@@ -0,0 +1,476 @@
+# =============================================================================
+#  CoordCodeSpigoli — Generazione automatica degli spigoli (senza interfaccia grafica)
+#  Autore: Alessio de Dato - Ingegneria Informatica UniPi
+#
+#  DESCRIZIONE GENERALE
+#  --------------------
+#  Collegare a mano i punti di una scansione (centinaia di migliaia di punti) non è
+#  praticabile. Il modulo calcola in blocco, dai soli punti 3D, tre famiglie di spigoli
+#  da scrivere negli spigoli manuali della scena (Scena.aggiungi_spigoli):
+#   • grafo dei k vicini più prossimi: ogni punto collegato ai suoi k punti più vicini;
+#   • grafo di raggio: tutte le coppie di punti a distanza non superiore a un raggio;
+#   • reticolo dell'inviluppo convesso: spigoli delle facce del guscio convesso (quickhull),
+#     senza le diagonali interne alle facce piane.
+#  Le ricerche di vicinanza usano una griglia uniforme 3D con le celle ordinate per chiave
+#  (un argsort, O(N log N)): le candidate di ogni punto sono i punti delle 27 celle attorno,
+#  raccolti con searchsorted una volta per cella e confrontati a blocchi vettoriali limitati.
+#
+#  ORGANIZZAZIONE DEL CODICE
+#  -------------------------
+#   • Classe _Griglia3D        : punti ordinati per cella; candidate e distanze a blocchi per le query.
+#   • vicini_piu_prossimi      : indici e distanze dei k vicini di ogni punto (esatti).
+#   • spigoli_knn              : grafo dei k vicini come coppie (i,j) senza duplicati.
+#   • spigoli_raggio           : coppie a distanza <= raggio.
+#   • inviluppo_convesso       : facce triangolari (orientate verso l'esterno) del guscio convesso.
+#   • spigoli_inviluppo        : spigoli dell'inviluppo, fondendo le facce complanari.
+#  Tutte le funzioni lavorano su indici 0-based; la conversione a 1-based è del chiamante.
+# =============================================================================
+
+import itertools
+
+import numpy as np
+
+# Vicini proposti dall'interfaccia per il grafo kNN
+K_VICINI = 6
+
+# Ricerca a griglia: punti medi per cella occupata (rispetto a k) e candidate (query x punti
+# delle celle vicine) valutate insieme, per contenere la memoria a qualche decina di MB
+OCCUPAZIONE_CELLA = 0.5
+CANDIDATE_PER_BLOCCO = 1 << 21
+
+# Celle per asse oltre le quali la griglia viene resa più grossolana (chiavi lineari in int64)
+CELLE_MASSIME_PER_ASSE = 1 << 20
+
+# Inviluppo convesso: tolleranza relativa alla scala delle coordinate per "sopra il piano" e
+# coseno oltre il quale due facce adiacenti sono considerate complanari
+TOLLERANZA_INVILUPPO = 1e-12
+COSENO_COMPLANARE = 1.0 - 1e-9
+
+
+def _come_punti(punti) -> np.ndarray:
+    """Array Nx3 float64 contiguo; solleva ValueError per coordinate non finite."""
+    punti = np.ascontiguousarray(np.asarray(punti, dtype=np.float64).reshape(-1, 3))
+    if not np.isfinite(punti).all():
+        raise ValueError("Le coordinate dei punti devono essere finite.")
+    return punti
+
+
+def _coppie_uniche(i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """Coppie (min, max) senza anelli né duplicati, ordinate; array Ex2 int64."""
+    coppie = np.sort(np.column_stack((i, j)).astype(np.int64), axis=1)
+    coppie = coppie[coppie[:, 0] != coppie[:, 1]]
+    chiavi = np.unique((coppie[:, 0] << 32) | coppie[:, 1])
+    return np.column_stack((chiavi >> 32, chiavi & 0xFFFFFFFF))
+
+
+# =============================================================================
+# GRIGLIA UNIFORME 3D
+# =============================================================================
+class _Griglia3D:
+    """Punti ordinati per cella di lato `cella`: i punti di una cella sono contigui in `ordinati`.
+
+    La chiave di una cella (ix, iy, iz) è lineare con z più interno, quindi le tre celle
+    (ix, iy, iz-1..iz+1) di una colonna formano un solo intervallo di chiavi: le 27 celle vicine
+    sono 9 intervalli disgiunti.
+    """
+
+    def __init__(self, punti: np.ndarray, cella: float) -> None:
+        origine = punti.min(axis=0)
+        estensione = float((punti.max(axis=0) - origine).max())
+        self.cella = max(float(cella), estensione / (CELLE_MASSIME_PER_ASSE - 1), np.finfo(float).tiny)
+        celle = ((punti - origine) // self.cella).astype(np.int64)
+        self.dimensioni = celle.max(axis=0) + 1
+        _, ny, nz = self.dimensioni
+        chiavi = (celle[:, 0] * ny + celle[:, 1]) * nz + celle[:, 2]
+        self.ordine = np.argsort(chiavi)
+        self.chiavi = chiavi[self.ordine]
+        self.celle = celle[self.ordine]
+        self.ordinati = punti[self.ordine]
+        self.posizione = np.empty_like(self.ordine)
+        self.posizione[self.ordine] = np.arange(len(self.ordine))
+
+    def _colonne_vicine(self, celle: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Inizio in `ordinati` e numero di punti delle 9 colonne di 3 celle attorno a ogni cella.
+
+        Returns:
+            tuple: (inizi, lunghezze), entrambi Ux9.
+        """
+        nx, ny, nz = self.dimensioni
+        inizi = np.empty((len(celle), 9), dtype=np.int64)
+        lunghezze = np.empty_like(inizi)
+        sotto = np.maximum(celle[:, 2] - 1, 0)
+        sopra = np.minimum(celle[:, 2] + 1, nz - 1)
+        for o, (dx, dy) in enumerate(itertools.product((-1, 0, 1), repeat=2)):
+            x, y = celle[:, 0] + dx, celle[:, 1] + dy
+            colonna = (x * ny + y) * nz
+            inizi[:, o] = np.searchsorted(self.chiavi, colonna + sotto, side="left")
+            fini = np.searchsorted(self.chiavi, colonna + sopra, side="right")
+            fuori = (x < 0) | (x >= nx) | (y < 0) | (y >= ny)
+            lunghezze[:, o] = np.where(fuori, 0, fini - inizi[:, o])
+        return inizi, lunghezze
+
+    def blocchi(self, query: np.ndarray):
+        """Genera (query, candidate, d2) per blocchi di query (indici 0-based dei punti).
+
+        `candidate` è una matrice QxM di posizioni in `ordinati` (-1 dove la riga è più corta)
+        con i punti delle 27 celle attorno a ogni query, `d2` le distanze al quadrato (inf per il
+        riempimento e per la query stessa). Le candidate sono raccolte una volta per cella e
+        condivise dalle sue query; Q x M resta entro CANDIDATE_PER_BLOCCO (salvo una query da sola).
+        """
+        posizioni = np.sort(self.posizione[query])
+        chiavi = self.chiavi[posizioni]
+        nuova = np.empty(len(posizioni), dtype=bool)
+        nuova[:1] = True
+        nuova[1:] = chiavi[1:] != chiavi[:-1]
+        cella_di = np.cumsum(nuova) - 1
+        inizi, lunghezze = self._colonne_vicine(self.celle[posizioni[nuova]])
+        totali = lunghezze.sum(axis=1)[cella_di]
+        # Query ordinate per numero di candidate (stabile: quelle di una cella restano vicine),
+        # così nei blocchi le righe hanno lunghezza simile
+        per_totale = np.argsort(totali, kind="stable")
+        a = 0
+        while a < len(posizioni):
+            b = min(len(posizioni), a + max(1, CANDIDATE_PER_BLOCCO // max(int(totali[per_totale[a]]), 1)))
+            while b - a > 1 and (b - a) * int(totali[per_totale[b - 1]]) > CANDIDATE_PER_BLOCCO:
+                b = a + (b - a) // 2
+            righe = per_totale[a:b]
+            celle_blocco, inversa = np.unique(cella_di[righe], return_inverse=True)
+            matrice = self._matrice(inizi[celle_blocco], lunghezze[celle_blocco])
+            posizioni_blocco = posizioni[righe]
+            candidate = matrice[inversa]
+            sicure = np.maximum(matrice, 0)
+            d2 = np.zeros(candidate.shape)
+            for asse in range(3):
+                colonna = self.ordinati[:, asse]
+                d2 += (colonna[sicure][inversa] - colonna[posizioni_blocco][:, None]) ** 2
+            d2[(candidate < 0) | (candidate == posizioni_blocco[:, None])] = np.inf
+            yield self.ordine[posizioni_blocco], candidate, d2
+            a = b
+
+    @staticmethod
+    def _matrice(inizi: np.ndarray, lunghezze: np.ndarray) -> np.ndarray:
+        """Dispone gli intervalli (Ux9) in una matrice UxM di posizioni, -1 come riempimento."""
+        colonne = np.cumsum(lunghezze, axis=1) - lunghezze
+        matrice = np.full((len(inizi), max(int(lunghezze.sum(axis=1).max()), 1)), -1, dtype=np.int64)
+        lunghezze = lunghezze.ravel()
+        totale = int(lunghezze.sum())
+        if totale:
+            intervallo = np.repeat(np.arange(len(lunghezze)), lunghezze)
+            dentro = np.arange(totale) - np.repeat(np.cumsum(lunghezze) - lunghezze, lunghezze)
+            righe = intervallo // inizi.shape[1]
+            matrice[righe, colonne.ravel()[intervallo] + dentro] = inizi.ravel()[intervallo] + dentro
+        return matrice
+
+
+def _cella_iniziale(punti: np.ndarray, occupazione: float) -> float:
+    """Lato di cella con circa `occupazione` punti per cella occupata.
+
+    Si parte dal volume del riquadro e si corregge sul numero reale di celle occupate: per una
+    superficie scandita (punti su una varietà 2D) le celle piene sono molte meno di quelle del
+    riquadro e la stima volumetrica darebbe celle troppo affollate.
+    """
+    n = len(punti)
+    estensione = np.ptp(punti, axis=0)
+    scala = float(estensione.max())
+    if scala == 0.0:
+        return 1.0
+    cella = scala * (occupazione / n) ** (1 / 3)
+    for _ in range(4):
+        celle = ((punti - punti.min(axis=0)) // cella).astype(np.int64)
+        dimensioni = celle.max(axis=0) + 1
+        if float(np.prod(dimensioni.astype(np.float64))) >= 2.0 ** 62:
+            break
+        occupate = len(np.unique((celle[:, 0] * dimensioni[1] + celle[:, 1]) * dimensioni[2] + celle[:, 2]))
+        media = n / occupate
+        if occupazione / 2 <= media <= occupazione * 2:
+            break
+        # Esponente 1/2: converge sia per nuvole volumetriche (d=3) sia per superfici e linee
+        cella *= (occupazione / media) ** 0.5
+    return cella
+
+
+# =============================================================================
+# K VICINI PIÙ PROSSIMI
+# =============================================================================
+def vicini_piu_prossimi(punti, k: int, avanzamento=None) -> tuple[np.ndarray, np.ndarray]:
+    """Per ogni punto, i `k` punti più vicini (escluso se stesso), dal più vicino.
+
+    Le candidate di un punto sono quelle delle 27 celle attorno alla sua: se la k-esima distanza
+    trovata non supera il lato di cella il risultato è esatto (ogni punto più vicino cade in quelle
+    celle). I punti per cui non vale (zone rade, punti isolati) sono ricalcolati su griglie di
+    lato doppio, finché la condizione vale per tutti.
+
+    Args:
+        punti: array Nx3.
+        k: numero di vicini (ridotto a N-1 se maggiore).
+        avanzamento: callback opzionale avanzamento(fatto, totale).
+
+    Returns:
+        tuple: (indici Nxk 0-based, distanze Nxk).
+
+    Raises:
+        ValueError: con meno di due punti, k < 1 o coordinate non finite.
+    """
+    punti = _come_punti(punti)
+    n = len(punti)
+    if k < 1:
+        raise ValueError("Il numero di vicini deve essere almeno 1.")
+    if n < 2:
+        raise ValueError("Servono almeno due punti.")
+    k = min(int(k), n - 1)
+
+    indici = np.empty((n, k), dtype=np.int64)
+    distanze = np.empty((n, k))
+    cella = _cella_iniziale(punti, max(2.0, OCCUPAZIONE_CELLA * k))
+    griglia = _Griglia3D(punti, cella)
+    in_sospeso = np.arange(n)
+    risolti = 0
+    while len(in_sospeso):
+        irrisolti = []
+        for query, candidate, d2 in griglia.blocchi(in_sospeso):
+            if d2.shape[1] > k:
+                parziale = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            else:
+                parziale = np.broadcast_to(np.arange(d2.shape[1]), d2.shape).copy()
+            d2_k = np.take_along_axis(d2, parziale, axis=1)
+            ordine = np.argsort(d2_k, axis=1)
+            d2_k = np.take_along_axis(d2_k, ordine, axis=1)
+            scelti = griglia.ordine[np.take_along_axis(candidate, np.take_along_axis(parziale, ordine, axis=1), axis=1)]
+
+            # Meno di k candidate: nessuna query del blocco è risolta a questo livello
+            esatti = np.zeros(len(query), dtype=bool)
+            if d2_k.shape[1] == k:
+                esatti = d2_k[:, -1] <= griglia.cella ** 2
+                indici[query[esatti]] = scelti[esatti]
+                distanze[query[esatti]] = np.sqrt(d2_k[esatti])
+            irrisolti.append(query[~esatti])
+            risolti += int(esatti.sum())
+            if avanzamento is not None:
+                avanzamento(risolti, n)
+        in_sospeso = np.concatenate(irrisolti)
+        if len(in_sospeso):
+            griglia = _Griglia3D(punti, griglia.cella * 2)
+    return indici, distanze
+
+
+def spigoli_knn(punti, k: int = K_VICINI, avanzamento=None) -> np.ndarray:
+    """Grafo dei k vicini: coppie (i,j) 0-based, i < j, senza duplicati (vicini reciproci una volta)."""
+    indici, _ = vicini_piu_prossimi(punti, k, avanzamento)
+    return _coppie_uniche(np.repeat(np.arange(len(indici)), indici.shape[1]), indici.ravel())
+
+
+# =============================================================================
+# GRAFO DI RAGGIO
+# =============================================================================
+def spigoli_raggio(punti, raggio: float, massimo_spigoli: int | None = None, avanzamento=None) -> np.ndarray:
+    """Tutte le coppie (i,j) 0-based, i < j, con distanza <= `raggio`.
+
+    Con celle di lato `raggio` i punti entro il raggio stanno nelle 27 celle attorno: il costo
+    è proporzionale a N per i punti medi in quelle celle.
+
+    Raises:
+        ValueError: se il raggio non è positivo o se le coppie superano `massimo_spigoli`.
+    """
+    punti = _come_punti(punti)
+    if not raggio > 0:
+        raise ValueError("Il raggio deve essere > 0.")
+    n = len(punti)
+    if n < 2:
+        return np.empty((0, 2), dtype=np.int64)
+
+    griglia = _Griglia3D(punti, raggio)
+    raggio2 = float(raggio) ** 2
+    prime, seconde = [], []
+    trovati = fatti = 0
+    for query, candidate, d2 in griglia.blocchi(np.arange(n)):
+        righe, colonne = np.nonzero(d2 <= raggio2)
+        vicini = griglia.ordine[candidate[righe, colonne]]
+        # Ogni coppia compare dalle due parti: si tiene solo quella con i < j
+        tenute = vicini > query[righe]
+        prime.append(query[righe[tenute]])
+        seconde.append(vicini[tenute])
+        trovati += int(tenute.sum())
+        if massimo_spigoli is not None and trovati > massimo_spigoli:
+            raise ValueError(
+                f"Il raggio {raggio:g} genera più di {massimo_spigoli} spigoli: scegli un raggio più piccolo."
+            )
+        fatti += len(query)
+        if avanzamento is not None:
+            avanzamento(fatti, n)
+    coppie = np.column_stack((np.concatenate(prime), np.concatenate(seconde)))
+    chiavi = np.sort((coppie[:, 0] << 32) | coppie[:, 1])
+    return np.column_stack((chiavi >> 32, chiavi & 0xFFFFFFFF))
+
+
+# =============================================================================
+# INVILUPPO CONVESSO (QUICKHULL)
+# =============================================================================
+def _piano(punti: np.ndarray, a: int, b: int, c: int) -> tuple[np.ndarray, float]:
+    """Normale unitaria (regola della mano destra su a, b, c) e termine noto del piano."""
+    normale = np.cross(punti[b] - punti[a], punti[c] - punti[a])
+    normale /= np.linalg.norm(normale)
+    return normale, float(normale @ punti[a])
+
+
+def _tetraedro_iniziale(punti: np.ndarray, tolleranza: float) -> tuple[int, int, int, int]:
+    """Quattro punti estremi non complanari da cui parte il quickhull.
+
+    Raises:
+        ValueError: se i punti sono tutti coincidenti, allineati o complanari.
+    """
+    estremi = np.unique(np.concatenate((punti.argmin(axis=0), punti.argmax(axis=0))))
+    e = punti[estremi]
+    d2 = ((e[:, None, :] - e[None, :, :]) ** 2).sum(axis=-1)
+    i, j = np.unravel_index(np.argmax(d2), d2.shape)
+    a, b = int(estremi[i]), int(estremi[j])
+    if d2[i, j] <= tolleranza ** 2:
+        raise ValueError("I punti coincidono: l'inviluppo convesso è degenere.")
+
+    asse = punti[b] - punti[a]
+    dalla_retta = np.linalg.norm(np.cross(punti - punti[a], asse), axis=1) / np.linalg.norm(asse)
+    c = int(np.argmax(dalla_retta))
+    if dalla_retta[c] <= tolleranza:
+        raise ValueError("I punti sono allineati: l'inviluppo convesso 3D è degenere.")
+
+    normale, termine = _piano(punti, a, b, c)
+    dal_piano = np.abs(punti @ normale - termine)
+    d = int(np.argmax(dal_piano))
+    if dal_piano[d] <= tolleranza:
+        raise ValueError("I punti sono complanari: l'inviluppo convesso 3D è degenere.")
+    return a, b, c, d
+
+
+def inviluppo_convesso(punti, avanzamento=None) -> np.ndarray:
+    """Facce triangolari dell'inviluppo convesso (quickhull), orientate con la normale verso l'esterno.
+
+    Ogni faccia tiene l'insieme dei punti che vede (sopra il suo piano): a ogni passo il punto
+    più lontano di una faccia diventa un vertice, le facce che esso vede sono sostituite dal
+    ventaglio che lo collega al loro orizzonte e i loro punti sono ridistribuiti in blocco sulle
+    facce nuove (scartando quelli ormai interni). Il ciclo è in Python ma gira una volta per
+    vertice dell'inviluppo, non per punto.
+
+    Returns:
+        np.ndarray: array Fx3 di indici 0-based (a, b, c), antiorari visti dall'esterno.
+
+    Raises:
+        ValueError: con meno di quattro punti o se sono complanari (inviluppo degenere).
+    """
+    punti = _come_punti(punti)
+    n = len(punti)
+    if n < 4:
+        raise ValueError("Servono almeno quattro punti per l'inviluppo convesso 3D.")
+    centro = punti.mean(axis=0)
+    punti = punti - centro  # tolleranza riferita all'estensione, non alla distanza dall'origine
+    tolleranza = TOLLERANZA_INVILUPPO * max(float(np.abs(punti).max()), np.finfo(float).tiny) * 3
+
+    vertici: list[tuple[int, int, int]] = []
+    normali: list[np.ndarray] = []
+    termini: list[float] = []
+    esterni: list[np.ndarray] = []
+    viva: list[bool] = []
+    faccia_di: dict[tuple[int, int], int] = {}  # spigolo orientato (u, v) -> faccia che lo percorre
+
+    def nuova_faccia(a: int, b: int, c: int) -> int:
+        f = len(vertici)
+        normale, termine = _piano(punti, a, b, c)
+        vertici.append((a, b, c))
+        normali.append(normale)
+        termini.append(termine)
+        esterni.append(np.empty(0, dtype=np.int64))
+        viva.append(True)
+        faccia_di[(a, b)] = faccia_di[(b, c)] = faccia_di[(c, a)] = f
+        return f
+
+    def distribuisci(candidati: np.ndarray, facce: list[int]) -> None:
+        """Assegna ogni candidato alla faccia nuova da cui è più lontano (se la vede)."""
+        if not len(candidati) or not facce:
+            return
+        distanze = punti[candidati] @ np.array([normali[f] for f in facce]).T - np.array([termini[f] for f in facce])
+        migliore = np.argmax(distanze, axis=1)
+        fuori = distanze[np.arange(len(candidati)), migliore] > tolleranza
+        candidati, migliore = candidati[fuori], migliore[fuori]
+        ordine = np.argsort(migliore, kind="stable")
+        confini = np.searchsorted(migliore[ordine], np.arange(len(facce) + 1))
+        for posizione, f in enumerate(facce):
+            esterni[f] = candidati[ordine[confini[posizione]:confini[posizione + 1]]]
+
+    a, b, c, d = _tetraedro_iniziale(punti, tolleranza)
+    iniziali = []
+    for faccia, opposto in (((a, b, c), d), ((a, c, d), b), ((a, d, b), c), ((b, d, c), a)):
+        normale = np.cross(punti[faccia[1]] - punti[faccia[0]], punti[faccia[2]] - punti[faccia[0]])
+        if normale @ (punti[opposto] - punti[faccia[0]]) > 0:
+            faccia = (faccia[0], faccia[2], faccia[1])
+        iniziali.append(faccia)
+    facce = [nuova_faccia(*faccia) for faccia in iniziali]
+    resto = np.setdiff1d(np.arange(n), (a, b, c, d))
+    distribuisci(resto, facce)
+
+    da_espandere = [f for f in facce if len(esterni[f])]
+    vertici_inviluppo = 4
+    while da_espandere:
+        f = da_espandere.pop()
+        if not viva[f] or not len(esterni[f]):
+            continue
+        candidati = esterni[f]
+        apice = int(candidati[np.argmax(punti[candidati] @ normali[f])])
+        p = punti[apice]
+
+        # Facce visibili dall'apice (visita in ampiezza dalla faccia f) e orizzonte
+        visibile = {f: True}
+        visibili = [f]
+        orizzonte: list[tuple[int, int]] = []
+        coda = [f]
+        while coda:
+            g = coda.pop()
+            u, v, w = vertici[g]
+            for spigolo in ((u, v), (v, w), (w, u)):
+                h = faccia_di[(spigolo[1], spigolo[0])]
+                if h not in visibile:
+                    visibile[h] = bool(normali[h] @ p - termini[h] > tolleranza)
+                    if visibile[h]:
+                        visibili.append(h)
+                        coda.append(h)
+                if not visibile[h]:
+                    orizzonte.append(spigolo)
+
+        orfani = np.concatenate([esterni[g] for g in visibili])
+        for g in visibili:
+            viva[g] = False
+            esterni[g] = np.empty(0, dtype=np.int64)
+            u, v, w = vertici[g]
+            for spigolo in ((u, v), (v, w), (w, u)):
+                if faccia_di.get(spigolo) == g:
+                    del faccia_di[spigolo]
+        nuove = [nuova_faccia(u, v, apice) for u, v in orizzonte]
+        distribuisci(orfani[orfani != apice], nuove)
+        da_espandere.extend(g for g in nuove if len(esterni[g]))
+
+        vertici_inviluppo += 1
+        if avanzamento is not None and vertici_inviluppo % 64 == 0:
+            avanzamento(n - sum(len(esterni[g]) for g in da_espandere if viva[g]), n)
+
+    return np.array([vertici[f] for f in range(len(vertici)) if viva[f]], dtype=np.int64).reshape(-1, 3)
+
+
+def spigoli_inviluppo(punti, avanzamento=None) -> np.ndarray:
+    """Reticolo dell'inviluppo convesso: coppie (i,j) 0-based, i < j.
+
+    Uno spigolo tra due triangoli complanari (diagonale di una faccia piana, es. di un cubo)
+    non fa parte del reticolo ed è scartato.
+    """
+    punti = _come_punti(punti)
+    facce = inviluppo_convesso(punti, avanzamento)
+    a, b, c = punti[facce[:, 0]], punti[facce[:, 1]], punti[facce[:, 2]]
+    normali = np.cross(b - a, c - a)
+    normali /= np.linalg.norm(normali, axis=1, keepdims=True)
+
+    # Ogni spigolo è percorso da due facce in versi opposti: chiave (min, max) -> le due facce
+    u = facce.ravel()
+    v = np.roll(facce, -1, axis=1).ravel()
+    faccia = np.repeat(np.arange(len(facce)), 3)
+    chiavi = (np.minimum(u, v) << 32) | np.maximum(u, v)
+    ordine = np.argsort(chiavi, kind="stable")
+    chiavi, faccia = chiavi[ordine].reshape(-1, 2), faccia[ordine].reshape(-1, 2)
+    coseni = (normali[faccia[:, 0]] * normali[faccia[:, 1]]).sum(axis=1)
+    chiavi = chiavi[coseni < COSENO_COMPLANARE, 0]
+    return np.column_stack((chiavi >> 32, chiavi & 0xFFFFFFFF))
@@ -0,0 +1,198 @@
+# Test dell'interfaccia (CoordCode): le parti della GUI verificabili senza display.
+# Eseguire con:  python -m pytest -q  (dalla cartella Versione2-Definitiva)
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from CoordCode import ApplicazioneCoordCode, INTERVALLO_CURSORI_MS, TabellaVirtuale
+from CoordCodeCore import Camera, Scena
+
+
+class AlberoFinto:
+    """Sostituto minimo del Treeview: tiene gli item del pool e i loro valori."""
+
+    def __init__(self) -> None:
+        self.valori: dict[str, tuple] = {}
+        self.inseriti = 0
+
+    def insert(self, _genitore, _posizione) -> str:
+        self.inseriti += 1
+        item = f"I{self.inseriti}"
+        self.valori[item] = ()
+        return item
+
+    def delete(self, *items) -> None:
+        for item in items:
+            del self.valori[item]
+
+    def item(self, item, values) -> None:
+        self.valori[item] = tuple(values)
+
+
+def tabella_finta(totale: int, visibili: int) -> tuple[TabellaVirtuale, list[tuple[int, int]]]:
+    """TabellaVirtuale senza widget Tk: `visibili` righe in altezza e un fornitore che registra le richieste."""
+    richieste = []
+
+    def fornitore(inizio, fine):
+        richieste.append((inizio, fine))
+        return [(i + 1,) for i in range(inizio, fine)]
+
+    tabella = TabellaVirtuale.__new__(TabellaVirtuale)
+    tabella.conteggio = lambda: totale
+    tabella.fornitore = fornitore
+    tabella.primo = 0
+    tabella.righe = []
+    tabella.albero = AlberoFinto()
+    tabella.barra = SimpleNamespace(set=lambda inizio, fine: setattr(tabella, "cursore", (inizio, fine)))
+    tabella.righe_visibili = lambda: visibili
+    return tabella, richieste
+
+
+# -----------------------------------------------------------------------------
+# Tabella virtuale dei punti
+# -----------------------------------------------------------------------------
+def test_tabella_virtuale_chiede_solo_le_righe_visibili():
+    tabella, richieste = tabella_finta(1_000_000, 10)
+    tabella.aggiorna()
+    assert richieste == [(0, 10)] and len(tabella.albero.valori) == 10
+
+    tabella.sposta(3, "pages")
+    tabella.scorri("scroll", "-1", "units")
+    tabella.scorri("moveto", "0.5")
+    assert richieste[1:] == [(30, 40), (29, 39), (500_000, 500_010)]
+    assert tabella.cursore == (0.5, 0.50001)
+    # Il pool di righe non cresce con lo scorrimento
+    assert tabella.albero.inseriti == 10
+    assert [tabella.albero.valori[item] for item in tabella.righe] == [(i,) for i in range(500_001, 500_011)]
+
+
+def test_tabella_virtuale_ai_bordi():
+    tabella, richieste = tabella_finta(25, 10)
+    tabella.mostra_ultima()
+    tabella.sposta(5, "units")
+    assert richieste == [(15, 25), (15, 25)]
+    tabella.vai_in_cima()
+    tabella.sposta(-4, "pages")
+    assert richieste[2:] == [(0, 10), (0, 10)]
+
+    # Meno righe che spazio: il pool si riduce alle sole righe esistenti
+    tabella.conteggio = lambda: 3
+    tabella.aggiorna()
+    assert richieste[-1] == (0, 3) and len(tabella.righe) == len(tabella.albero.valori) == 3
+    tabella.conteggio = lambda: 0
+    tabella.aggiorna()
+    assert tabella.righe == [] and tabella.cursore == (0.0, 1.0)
+
+
+def test_righe_tabella_dall_archivio():
+    scena = Scena(Camera(800.0, 320.0, 240.0))
+    scena.punti_3d.estendi(np.array([[1.0, 2.0, 4.0], [0.5, -0.25, 2.0], [0.0, 0.0, 8.0]]))
+    app = SimpleNamespace(scena=scena)
+    assert ApplicazioneCoordCode.righe_tabella(app, 1, 3) == [
+        (2, "0.5", "-0.25", "2", "520.0000", "140.0000"),
+        (3, "0", "0", "8", "320.0000", "240.0000"),
+    ]
+    assert ApplicazioneCoordCode.righe_tabella(app, 3, 3) == []
+
+
+class Valore:
+    """Sostituto di tk.DoubleVar/StringVar."""
+
+    def __init__(self, valore=None) -> None:
+        self.valore = valore
+
+    def get(self):
+        return self.valore
+
+    def set(self, valore) -> None:
+        self.valore = valore
+
+
+class RadiceFinta:
+    """Sostituto di tk.Tk per `after`/`after_cancel`: i callback pianificati restano in `pianificati`."""
+
+    def __init__(self) -> None:
+        self.pianificati: dict[str, tuple[int, object]] = {}
+        self.contatore = 0
+
+    def after(self, ritardo, callback) -> str:
+        identificativo = f"after#{self.contatore}"
+        self.contatore += 1
+        self.pianificati[identificativo] = (ritardo, callback)
+        return identificativo
+
+    def after_cancel(self, identificativo) -> None:
+        del self.pianificati[identificativo]
+
+
+class AppCursori(ApplicazioneCoordCode):
+    """Applicazione senza finestra: solo lo stato usato dai cursori degli intrinseci."""
+
+    def __init__(self, scena: Scena) -> None:
+        self.scena = scena
+        self.radice = RadiceFinta()
+        self.var_f, self.var_cx, self.var_cy = Valore(), Valore(), Valore()
+        self.var_intrinseci_testo = Valore()
+        self.modalita_vista = Valore("2D")
+        self.cursori_intrinseci = {nome: SimpleNamespace(configure=lambda **_: None) for nome in ("f", "cx", "cy")}
+        self.tabella_punti = SimpleNamespace(aggiorna=lambda: None)
+        self.etichetta_stato = SimpleNamespace(configure=lambda **_: None)
+        self.aggiornamento_cursori_pianificato = False
+        self.fine_cursore_id = None
+        self.disegni = []
+        self.configura_cursori_intrinseci()
+
+    def ridisegna_2d(self, autoscale: bool = False, dal_vivo: bool = False) -> None:
+        self.disegni.append("dal vivo" if dal_vivo else "completo")
+
+    def ridisegna_corrente(self, autoscale: bool = True) -> None:
+        self.disegni.append("completo")
+
+
+# -----------------------------------------------------------------------------
+# Cursori degli intrinseci
+# -----------------------------------------------------------------------------
+def test_cursori_fondono_gli_eventi_e_riproiettano():
+    camera = Camera(800.0, 320.0, 240.0, rotazione=(3.0, -2.0, 1.0), traslazione=(0.1, 0.0, 0.2),
+                    distorsione=(-0.1, 0.01, 0.0, 0.0, 0.0))
+    scena = Scena(camera)
+    scena.punti_3d.estendi(np.random.default_rng(6).uniform(-1, 1, (50, 3)) + (0, 0, 5))
+    app = AppCursori(scena)
+    assert (app.var_f.get(), app.var_cx.get(), app.var_cy.get()) == (800.0, 320.0, 240.0)
+
+    # Molti eventi di trascinamento prima del frame successivo: un solo aggiornamento pianificato
+    for f in (810.0, 850.0, 900.0):
+        app.var_f.set(f)
+        app.al_movimento_cursore()
+    app.var_cx.set(300.0)
+    app.al_movimento_cursore()
+    assert len(app.radice.pianificati) == 1
+    (ritardo, applica), = app.radice.pianificati.values()
+    assert ritardo == INTERVALLO_CURSORI_MS
+    del app.radice.pianificati["after#0"]
+    applica()
+
+    # Posa e distorsione restano; le proiezioni seguono i nuovi intrinseci
+    attesa = Camera(900.0, 300.0, 240.0, rotazione=camera.rotazione, traslazione=camera.traslazione,
+                    distorsione=camera.distorsione)
+    assert app.scena.camera == attesa and app.disegni == ["dal vivo"]
+    np.testing.assert_allclose(app.scena.punti_2d.array, attesa.proietta(scena.punti_3d.array)[0])
+
+    # Un nuovo frame rimanda il ridisegno completo di fine trascinamento invece di accodarne un altro
+    app.var_cy.set(250.0)
+    app.al_movimento_cursore()
+    app.radice.pianificati.pop("after#2")[1]()
+    assert list(app.radice.pianificati) == ["after#3"] and app.disegni == ["dal vivo", "dal vivo"]
+    app.radice.pianificati.pop("after#3")[1]()
+    assert app.disegni[-1] == "completo" and app.fine_cursore_id is None
+
+
+def test_cursori_ignorano_valori_invariati_o_non_validi():
+    scena = Scena(Camera(800.0, 320.0, 240.0))
+    scena.punti_3d.aggiungi(0.0, 0.0, 2.0)
+    app = AppCursori(scena)
+    app.applica_intrinseci_cursori()  # valori appena impostati da configura_cursori_intrinseci
+    app.var_f.set(0.0)
+    app.applica_intrinseci_cursori()
+    assert app.scena.camera == Camera(800.0, 320.0, 240.0) and app.disegni == []
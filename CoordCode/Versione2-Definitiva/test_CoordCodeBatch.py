@@ -0,0 +1,56 @@
+# Test dell'elaborazione in blocco (CoordCodeBatch): giro di pose.
+# Eseguire con:  python -m pytest -q  (dalla cartella Versione2-Definitiva)
+
+import numpy as np
+import pytest
+
+from CoordCodeBatch import conflitti_uscita, giro_pose, main
+from CoordCodeCore import Camera, Scena, angoli_da_rotazione, scrivi_txt
+
+
+def scrivi_scena(percorso) -> None:
+    scena = Scena(Camera(800.0, 320.0, 240.0))
+    scena.punti_3d.estendi(np.random.default_rng(0).uniform(-1, 1, (12, 3)) + (0, 0, 5))
+    percorso.parent.mkdir(parents=True, exist_ok=True)
+    scrivi_txt(scena, str(percorso))
+
+
+def test_giro_pose_applica_e_salva_la_distorsione(tmp_path):
+    distorsione = (-0.2, 0.05, 0.001, -0.002, 0.01)
+    scena = Scena(Camera(800.0, 320.0, 240.0, distorsione=distorsione))
+    scena.punti_3d.estendi(np.random.default_rng(0).uniform(-1, 1, (12, 3)) + (0, 0, 5))
+    destinazione = tmp_path / "pose.npz"
+
+    assert giro_pose(scena, str(destinazione), 4, raggio=5.0) == 4 * 12
+    risultato = np.load(destinazione)
+    np.testing.assert_array_equal(risultato["distorsione"], distorsione)
+    for R, t, uv in zip(risultato["rotazioni"], risultato["traslazioni"], risultato["uv"]):
+        camera = Camera(800.0, 320.0, 240.0, rotazione=tuple(angoli_da_rotazione(R)), traslazione=tuple(t),
+                        distorsione=distorsione)
+        np.testing.assert_allclose(uv, camera.proietta(scena.punti_3d.array)[0], atol=1e-9)
+
+
+def test_uscita_uguale_alla_sorgente_rifiutata(tmp_path):
+    sorgente = tmp_path / "scena.txt"
+    scrivi_scena(sorgente)
+    originale = sorgente.read_bytes()
+
+    with pytest.raises(SystemExit) as uscita:
+        main([str(tmp_path), "-o", str(tmp_path), "--cx", "640"])
+    assert uscita.value.code == 2
+    assert sorgente.read_bytes() == originale
+    # Con --pose le uscite sono .npz: la stessa cartella va bene
+    assert conflitti_uscita([str(sorgente)], str(tmp_path), pose=4) == []
+
+
+def test_stesso_nome_da_cartelle_diverse_rifiutato(tmp_path):
+    for cartella in ("a", "b"):
+        scrivi_scena(tmp_path / cartella / "scena.txt")
+    scrivi_scena(tmp_path / "b" / "altra.txt")
+    file = [str(tmp_path / c / n) for c, n in (("a", "scena.txt"), ("b", "scena.txt"), ("b", "altra.txt"))]
+
+    problemi = conflitti_uscita(file, str(tmp_path / "uscita"))
+    assert len(problemi) == 1 and file[0] in problemi[0] and file[1] in problemi[0]
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "a"), str(tmp_path / "b"), "-o", str(tmp_path / "uscita")])
+    assert not (tmp_path / "uscita").exists()
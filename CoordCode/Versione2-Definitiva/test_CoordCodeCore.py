@@ -0,0 +1,666 @@
+# Test del nucleo di calcolo (CoordCodeCore): archivi, formati di file e proiezione.
+# Eseguire con:  python -m pytest -q  (dalla cartella Versione2-Definitiva)
+
+import gzip
+import struct
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import CoordCodeCore
+from CoordCodeCore import (
+    ArchivioPunti, ArchivioSpigoli, Camera, IndiceGriglia, IndiceSegmenti, Scena, angoli_da_rotazione,
+    correggi_distorsione, distorci, leggi_binario, leggi_mesh, leggi_obj, leggi_ply, leggi_txt, leggi_xyz,
+    matrice_rotazione, pose_orbita, proietta_pose, proietta_punti, ritaglia_segmenti, scrivi_binario, scrivi_txt,
+)
+
+
+def scena_di_prova(n_punti: int = 5, spigoli=()) -> Scena:
+    """Scena con `n_punti` punti davanti alla camera e gli spigoli (1-based) indicati."""
+    rng = np.random.default_rng(0)
+    scena = Scena(Camera(800.0, 320.0, 240.0))
+    scena.punti_3d.estendi(rng.uniform(-1, 1, (n_punti, 3)) + (0, 0, 5))
+    for i, j in spigoli:
+        scena.aggiungi_spigolo(i, j)
+    return scena
+
+
+# -----------------------------------------------------------------------------
+# Proiezione vettoriale
+# -----------------------------------------------------------------------------
+def test_proietta_punti_coincide_con_la_formula_per_punto():
+    rng = np.random.default_rng(2)
+    punti = rng.uniform(-2, 2, (50, 3))
+    punti[:5, 2] = [0.0, -1.0, -1e-9, 1e-9, 3.0]  # Z nulla o negativa: non proiettabili
+    uv, valido = proietta_punti(punti, 800.0, 320.0, 240.0)
+    assert uv.shape == (50, 2)
+    for (x, y, z), (u, v), ok in zip(punti, uv, valido):
+        assert ok == (z > 0)
+        if ok:
+            assert u == pytest.approx(800.0 * x / z + 320.0)
+            assert v == pytest.approx(800.0 * y / z + 240.0)
+        else:
+            assert np.isnan(u) and np.isnan(v)
+
+
+def test_proietta_punti_singolo_e_vuoto():
+    uv, valido = proietta_punti((1.0, 2.0, 4.0), 100.0, 10.0, 20.0)
+    np.testing.assert_allclose(uv, [[35.0, 70.0]])
+    assert valido.tolist() == [True]
+
+    uv, valido = proietta_punti(np.empty((0, 3)), 100.0, 10.0, 20.0)
+    assert uv.shape == (0, 2) and valido.shape == (0,)
+
+
+# -----------------------------------------------------------------------------
+# Archivio dei punti
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_archivio_punti_cresce_come_una_lista(dtype):
+    rng = np.random.default_rng(3)
+    archivio = ArchivioPunti(3, dtype=dtype, capacita=1)
+    attesi = []
+    for k in range(200):  # append singoli e blocchi alternati, oltre molti raddoppi
+        if k % 3:
+            punto = tuple(rng.uniform(-1, 1, 3).astype(dtype).tolist())
+            archivio.aggiungi(*punto)
+            attesi.append(punto)
+        else:
+            blocco = rng.uniform(-1, 1, (k % 7, 3)).astype(dtype)
+            archivio.estendi(blocco)
+            attesi.extend(map(tuple, blocco.tolist()))
+
+    assert len(archivio) == len(attesi) and archivio.dtype == dtype
+    assert list(archivio) == attesi
+    assert archivio[5] == attesi[5] and archivio[-1] == attesi[-1]
+    np.testing.assert_array_equal(archivio.array, np.asarray(attesi, dtype=dtype))
+    # array e colonne sono viste sullo stesso buffer, senza copia
+    assert np.shares_memory(archivio.array, archivio.colonne)
+    assert archivio.colonne.shape == (3, len(attesi)) and archivio.colonne[0].flags.c_contiguous
+
+
+def test_archivio_punti_generazione_e_errori():
+    archivio = ArchivioPunti.da_array([[1.0, 2.0], [3.0, 4.0]])
+    assert archivio.dimensione == 2
+    generazione = archivio.generazione
+    archivio.aggiungi(5.0, 6.0)
+    archivio.estendi(np.zeros((3, 2)))
+    assert archivio.generazione == generazione  # gli append non invalidano i dati derivati
+    archivio.sostituisci([[7.0, 8.0]])
+    assert archivio.generazione > generazione and list(archivio) == [(7.0, 8.0)]
+
+    with pytest.raises(ValueError):
+        archivio.aggiungi(1.0, 2.0, 3.0)
+    with pytest.raises(IndexError):
+        archivio[1]
+    archivio.svuota()
+    assert len(archivio) == 0 and archivio.array.shape == (0, 2)
+
+
+# -----------------------------------------------------------------------------
+# Archivio degli spigoli
+# -----------------------------------------------------------------------------
+def spigoli_senza_duplicati(blocchi) -> list[tuple[int, int]]:
+    """Riferimento riga per riga: coppie normalizzate (i < j), senza anelli, nell'ordine del primo arrivo."""
+    visti, coppie = set(), []
+    for blocco in blocchi:
+        for i, j in np.asarray(blocco).tolist():
+            chiave = (min(i, j), max(i, j))
+            if i != j and chiave not in visti:
+                visti.add(chiave)
+                coppie.append(chiave)
+    return coppie
+
+
+# Blocchi piccoli (confronto con il set) e un blocco grande, oltre BLOCCO_MASSIMO_SET_SPIGOLI (confronto vettoriale)
+@pytest.mark.parametrize("dimensioni", [(40, 40, 40), (40, 20_000, 40)])
+def test_archivio_spigoli_scarta_duplicati_e_anelli(dimensioni):
+    rng = np.random.default_rng(4)
+    blocchi = [rng.integers(1, 120, (n, 2)) for n in dimensioni]
+    blocchi[1][:5] = [[7, 7], [3, 9], [9, 3], [3, 9], [1, 1]]  # anelli e duplicati anche invertiti
+    archivio = ArchivioSpigoli()
+    for blocco in blocchi:
+        archivio.estendi(blocco)
+
+    attesi = spigoli_senza_duplicati(blocchi)
+    assert archivio.array.tolist() == [list(c) for c in attesi]
+    np.testing.assert_array_equal(archivio.indici, np.asarray(attesi) - 1)
+    # Il set delle coppie resta coerente con il buffer dopo entrambi i percorsi
+    assert (9, 3) in archivio and (7, 7) not in archivio
+    assert not archivio.aggiungi(9, 3) and not archivio.aggiungi(5, 5)
+    nuovo = next((i, i + 1) for i in range(1, 200) if (i, i + 1) not in archivio)
+    assert archivio.aggiungi(*nuovo) and archivio.pop() == nuovo and nuovo not in archivio
+
+
+def test_archivio_spigoli_da_array():
+    archivio = ArchivioSpigoli.da_array([(2, 1), (1, 2), (3, 3), (4, 2)])
+    assert archivio.array.tolist() == [[1, 2], [2, 4]]
+    assert archivio.indici.tolist() == [[0, 1], [1, 3]]
+
+
+# -----------------------------------------------------------------------------
+# Formato .txt
+# -----------------------------------------------------------------------------
+ESEMPI = Path(__file__).parent / "Esempi"
+
+
+def assert_scene_uguali(letta: Scena, attesa: Scena) -> None:
+    assert letta.camera == attesa.camera
+    np.testing.assert_array_equal(letta.punti_3d.array, attesa.punti_3d.array)
+    np.testing.assert_array_equal(letta.spigoli_manuali.array, attesa.spigoli_manuali.array)
+
+
+@pytest.mark.parametrize("nome", sorted(p.name for p in ESEMPI.glob("*.txt")))
+def test_txt_esempi_andata_e_ritorno(tmp_path, nome):
+    scena = leggi_txt(str(ESEMPI / nome))
+    assert len(scena) and len(scena.spigoli_manuali)
+    # Blocchi minuscoli: intestazioni e righe spezzate a ogni confine di blocco
+    assert_scene_uguali(leggi_txt(str(ESEMPI / nome), dimensione_blocco=37), scena)
+
+    percorso = tmp_path / nome
+    scrivi_txt(scena, str(percorso))
+    riletta = leggi_txt(str(percorso))
+    assert_scene_uguali(riletta, scena)
+    # Una seconda scrittura (u,v ormai coerenti con la camera) riproduce lo stesso file
+    scrivi_txt(riletta, str(tmp_path / "copia.txt"))
+    assert (tmp_path / "copia.txt").read_bytes() == percorso.read_bytes()
+
+
+@pytest.mark.parametrize("nome", ["grande.txt", "grande.txt.gz"])
+def test_txt_oltre_il_confine_di_blocco(tmp_path, nome):
+    rng = np.random.default_rng(5)
+    scena = Scena(Camera(900.0, 400.0, 300.0))
+    # Coordinate intere: il formato %.6g le riscrive esatte
+    scena.punti_3d.estendi(np.column_stack((rng.integers(-999, 999, (20_000, 2)), rng.integers(1000, 9999, 20_000))))
+    scena.spigoli_manuali.estendi(rng.integers(1, 20_001, (5_000, 2)))
+    percorso = tmp_path / nome
+    scrivi_txt(scena, str(percorso))
+    dati = percorso.read_bytes()
+    assert len(gzip.decompress(dati) if nome.endswith(".gz") else dati) > 1 << 20  # più di un blocco
+
+    chiamate = []
+    letta = leggi_txt(str(percorso), avanzamento=lambda fatto, totale: chiamate.append((fatto, totale)))
+    assert len(chiamate) > 2 and chiamate[-1][0] == percorso.stat().st_size
+    assert_scene_uguali(letta, scena)
+    assert_scene_uguali(leggi_txt(str(percorso), dimensione_blocco=4096), scena)
+
+
+def test_txt_righe_fuori_formato(tmp_path):
+    # Commenti, spaziature diverse, virgola decimale, formato a colonne "|" e spigoli "i-j" / "i,j"
+    percorso = tmp_path / "misto.txt"
+    percorso.write_text(
+        "[Camera]\n"
+        "f = 500   # focale\n"
+        "cx=100\n"
+        "  cy = 80,5\n"
+        "\n"
+        "[Punti]\n"
+        "  # indice | X | Y | Z || u | v\n"
+        "1) X=1 Y=2 Z=4 ==> u=0 v=0\n"
+        "   2)  X=-1.5   Y=0,25   Z=10   ==>   u=1   v=2\n"
+        "# punto scritto a mano\n"
+        "3 | 0 | 0 | 2 | 0 | 0\n"
+        "riga non valida\n"
+        "[SpigoliManuali]\n"
+        "  (1, 2)\n"
+        "2-3\n"
+        "3,1\n"
+        "  (2, 1)\n"
+        "  (3, 3)\n",
+        encoding="utf-8",
+    )
+    attesa = Scena(Camera(500.0, 100.0, 80.5))
+    attesa.punti_3d.estendi([[1.0, 2.0, 4.0], [-1.5, 0.25, 10.0], [0.0, 0.0, 2.0]])
+    attesa.spigoli_manuali.estendi([(1, 2), (2, 3), (1, 3)])
+    for dimensione_blocco in (1 << 20, 16):
+        assert_scene_uguali(leggi_txt(str(percorso), dimensione_blocco=dimensione_blocco), attesa)
+
+
+def test_txt_punto_dietro_la_camera(tmp_path):
+    percorso = tmp_path / "dietro.txt"
+    percorso.write_text("[Camera]\nf = 500\ncx = 0\ncy = 0\n[Punti]\n1) X=0 Y=0 Z=-1 ==> u=0 v=0\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Z deve essere > 0"):
+        leggi_txt(str(percorso))
+
+
+def test_scrivi_txt_a_blocchi_come_riga_per_riga(tmp_path):
+    scena = scena_di_prova(23, [(1, 2), (4, 9), (23, 7)])
+    scena.punti_3d.aggiungi(-12345.678, 0.000123, 98765.4321)
+    chiamate = []
+    scrivi_txt(scena, str(tmp_path / "blocchi.txt"), righe_per_blocco=5,
+               avanzamento=lambda fatto, totale: chiamate.append((fatto, totale)))
+    assert chiamate[-1] == (27, 27) and len(chiamate) > 2
+
+    # Righe come le scriveva l'esportazione storica, una f-string per punto e per spigolo
+    punti = "".join(
+        f"  {i:>2})  X={x:<10.6g} Y={y:<10.6g} Z={z:<10.6g}  ==>  u={u:<10.4f} v={v:.4f}\n"
+        for i, ((x, y, z), (u, v)) in enumerate(zip(scena.punti_3d, scena.punti_2d), start=1)
+    )
+    spigoli = "".join(f"  ({i}, {j})\n" for i, j in scena.spigoli_manuali)
+    testo = (tmp_path / "blocchi.txt").read_text(encoding="utf-8")
+    assert "  # indice | X | Y | Z || u | v\n" + punti + "\n[SpigoliManuali]\n" in testo
+    assert "con indici i e j\n" + spigoli + "=====" in testo
+
+    scrivi_txt(scena, str(tmp_path / "unico.txt"))
+    assert (tmp_path / "unico.txt").read_bytes() == (tmp_path / "blocchi.txt").read_bytes()
+
+
+@pytest.mark.parametrize("estensione", [".gz", ".zst"])
+def test_scrivi_txt_compresso(tmp_path, estensione):
+    if estensione == ".zst":
+        zstandard = pytest.importorskip("zstandard")
+        decomprimi = zstandard.ZstdDecompressor().decompressobj().decompress
+    else:
+        decomprimi = gzip.decompress
+    scena = leggi_txt(str(ESEMPI / "Icosaedro.txt"))
+    scrivi_txt(scena, str(tmp_path / "scena.txt"))
+    compresso = tmp_path / ("scena.txt" + estensione)
+    scrivi_txt(scena, str(compresso))
+
+    # Il contenuto decompresso è identico byte per byte al file non compresso
+    assert decomprimi(compresso.read_bytes()) == (tmp_path / "scena.txt").read_bytes()
+    assert_scene_uguali(leggi_txt(str(compresso)), scena)
+
+
+def test_scrivi_txt_zstd_non_disponibile(tmp_path, monkeypatch):
+    monkeypatch.setattr(CoordCodeCore, "zstandard", None)
+    with pytest.raises(ValueError, match="zstandard"):
+        scrivi_txt(scena_di_prova(), str(tmp_path / "scena.txt.zst"))
+
+
+# -----------------------------------------------------------------------------
+# Formato binario .ccb
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("mappa_memoria", [True, False])
+def test_binario_andata_e_ritorno(tmp_path, mappa_memoria):
+    scena = scena_di_prova(6, [(1, 2), (2, 5), (3, 6)])
+    scena.camera = Camera(700.0, 300.0, 200.0, rotazione=(5.0, -3.0, 1.0), traslazione=(0.1, 0.2, 0.3),
+                          distorsione=(-0.1, 0.01, 0.001, -0.002, 0.0))
+    percorso = tmp_path / "scena.ccb"
+    scrivi_binario(scena, str(percorso))
+
+    letta = leggi_binario(str(percorso), mappa_memoria=mappa_memoria)
+    assert letta.camera == scena.camera
+    np.testing.assert_array_equal(letta.punti_3d.array, scena.punti_3d.array)
+    np.testing.assert_array_equal(letta.spigoli_manuali.array, scena.spigoli_manuali.array)
+    np.testing.assert_allclose(letta.punti_2d.array, scena.punti_2d.array)
+
+
+@pytest.mark.parametrize("mappa_memoria", [True, False])
+def test_binario_aggiunte_dopo_la_lettura(tmp_path, mappa_memoria):
+    # Scena senza spigoli: il blocco vuoto diventa un buffer di capacità 0 che deve poter crescere
+    percorso = tmp_path / "senza_spigoli.ccb"
+    scrivi_binario(scena_di_prova(2), str(percorso))
+
+    letta = leggi_binario(str(percorso), mappa_memoria=mappa_memoria)
+    assert letta.aggiungi_spigolo(1, 2) == (1, 2)
+    letta.aggiungi_punto(0.0, 0.0, 4.0)
+    assert len(letta) == 3
+    assert letta.spigoli_manuali.array.tolist() == [[1, 2]]
+
+
+def test_binario_scena_vuota(tmp_path):
+    percorso = tmp_path / "vuota.ccb"
+    scrivi_binario(scena_di_prova(0), str(percorso))
+
+    letta = leggi_binario(str(percorso))
+    assert len(letta) == 0
+    u, v = letta.aggiungi_punto(0.0, 0.0, 2.0)
+    assert (u, v) == (320.0, 240.0)
+
+
+@pytest.mark.parametrize("mappa_memoria", [True, False])
+def test_binario_avanzamento_e_interruzione(tmp_path, monkeypatch, mappa_memoria):
+    monkeypatch.setattr(CoordCodeCore, "BYTE_PER_BLOCCO_BINARIO", 256)
+    scena = scena_di_prova(100, [(1, 2), (3, 4)])
+    percorso = tmp_path / "scena.ccb"
+    chiamate = []
+    scrivi_binario(scena, str(percorso), avanzamento=lambda fatto, totale: chiamate.append((fatto, totale)))
+    totale = 100 * 5 * 8 + 2 * 2 * 8
+    assert len(chiamate) > 3 and chiamate[-1] == (totale, totale)
+    assert [fatto for fatto, _ in chiamate] == sorted(fatto for fatto, _ in chiamate)
+
+    chiamate.clear()
+    letta = leggi_binario(str(percorso), mappa_memoria, avanzamento=lambda fatto, totale: chiamate.append((fatto, totale)))
+    assert chiamate[-1] == (totale, totale)
+    np.testing.assert_array_equal(letta.punti_3d.array, scena.punti_3d.array)
+
+    def interrompi(fatto, totale):
+        raise KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        scrivi_binario(scena, str(tmp_path / "interrotta.ccb"), avanzamento=interrompi)
+    with pytest.raises(KeyboardInterrupt):
+        leggi_binario(str(percorso), mappa_memoria, avanzamento=interrompi)
+
+
+def test_binario_troncato(tmp_path):
+    percorso = tmp_path / "scena.ccb"
+    scrivi_binario(scena_di_prova(10, [(1, 2)]), str(percorso))
+    percorso.write_bytes(percorso.read_bytes()[:-8])
+    with pytest.raises(ValueError):
+        leggi_binario(str(percorso), mappa_memoria=False)
+
+
+def test_archivio_adottato_vuoto_cresce():
+    archivio = ArchivioPunti.da_colonne(np.empty((3, 0)))
+    archivio.aggiungi(1.0, 2.0, 3.0)
+    archivio.estendi(np.ones((4, 3)))
+    assert len(archivio) == 5
+    assert archivio[0] == (1.0, 2.0, 3.0)
+
+
+# -----------------------------------------------------------------------------
+# Cache delle proiezioni
+# -----------------------------------------------------------------------------
+def test_cache_proiezioni_coincide_con_il_calcolo_diretto():
+    scena = scena_di_prova(20)
+    np.testing.assert_allclose(scena.punti_2d.array, scena.camera.proietta(scena.punti_3d.array)[0])
+
+    # Punti accodati: proiettati in coda alla voce esistente
+    scena.punti_3d.estendi(np.array([[0.0, 0.0, 3.0], [0.5, -0.5, 6.0]]))
+    np.testing.assert_allclose(scena.punti_2d.array, scena.camera.proietta(scena.punti_3d.array)[0])
+
+    # Cambiare posa o distorsione (non solo f, cx, cy) deve cambiare le proiezioni
+    for camera in (
+        Camera(800.0, 320.0, 240.0, rotazione=(0.0, 2.0, 0.0)),
+        Camera(800.0, 320.0, 240.0, distorsione=(0.1, 0.0, 0.0, 0.0, 0.0)),
+    ):
+        scena.camera = camera
+        np.testing.assert_allclose(scena.punti_2d.array, camera.proietta(scena.punti_3d.array)[0])
+
+
+def test_cache_proiezioni_archivio_modificato():
+    scena = scena_di_prova(4)
+    _ = scena.punti_2d
+    scena.punti_3d.sostituisci(np.array([[1.0, 1.0, 2.0]]))
+    np.testing.assert_allclose(scena.punti_2d.array, [[720.0, 640.0]])
+
+
+# -----------------------------------------------------------------------------
+# Distorsione
+# -----------------------------------------------------------------------------
+def test_correzione_inverte_la_distorsione():
+    rng = np.random.default_rng(1)
+    x, y = rng.uniform(-0.4, 0.4, (2, 200))
+    distorsione = (-0.25, 0.08, 0.002, -0.001, -0.01)
+    xd, yd = distorci(x, y, distorsione)
+    assert not np.allclose(xd, x)
+    xc, yc = correggi_distorsione(xd, yd, distorsione)
+    np.testing.assert_allclose(xc, x, atol=1e-8)
+    np.testing.assert_allclose(yc, y, atol=1e-8)
+
+
+# -----------------------------------------------------------------------------
+# Posa della camera e giro di pose
+# -----------------------------------------------------------------------------
+def test_angoli_e_matrice_di_rotazione():
+    angoli = (12.0, -40.0, 75.0)
+    R = matrice_rotazione(*angoli)
+    np.testing.assert_allclose(R @ R.T, np.eye(3), atol=1e-12)
+    np.testing.assert_allclose(angoli_da_rotazione(R), angoli)
+
+
+@pytest.mark.parametrize("distorsione", [None, (-0.2, 0.05, 0.001, -0.002, 0.01)])
+def test_proietta_pose_coincide_con_le_singole_camere(distorsione):
+    punti = scena_di_prova(30).punti_3d.array
+    rotazioni, traslazioni = pose_orbita(punti.mean(axis=0), 5.0, 7, elevazione=20.0)
+    uv, valido = proietta_pose(punti, rotazioni, traslazioni, 800.0, 320.0, 240.0, distorsione)
+    assert uv.shape == (7, 30, 2) and valido.all()
+    for R, t, atteso in zip(rotazioni, traslazioni, uv):
+        camera = Camera(800.0, 320.0, 240.0, rotazione=tuple(angoli_da_rotazione(R)), traslazione=tuple(t),
+                        distorsione=distorsione or (0.0,) * 5)
+        np.testing.assert_allclose(camera.proietta(punti)[0], atteso, atol=1e-9)
+
+
+def test_pose_orbita_guarda_il_centro():
+    centro = np.array([1.0, -2.0, 10.0])
+    rotazioni, traslazioni = pose_orbita(centro, 4.0, 5, elevazione=10.0)
+    camera = rotazioni @ centro + traslazioni  # centro nel riferimento di ogni posa
+    np.testing.assert_allclose(camera[:, :2], 0.0, atol=1e-12)
+    np.testing.assert_allclose(camera[:, 2], 4.0)
+
+
+# -----------------------------------------------------------------------------
+# Ritaglio dei segmenti
+# -----------------------------------------------------------------------------
+def test_ritaglia_segmenti():
+    a = np.array([[-5.0, 5.0], [2.0, 2.0], [5.0, -5.0], [20.0, 0.0], [3.0, 12.0]])
+    b = np.array([[15.0, 5.0], [8.0, 8.0], [5.0, 15.0], [20.0, 10.0], [3.0, 12.0]])
+    t0, t1 = ritaglia_segmenti(a, b - a, (0.0, 0.0, 10.0, 10.0))
+    # Attraversa in orizzontale, interno, attraversa in verticale, verticale fuori, punto fuori
+    np.testing.assert_allclose(t0[:3], [0.25, 0.0, 0.25])
+    np.testing.assert_allclose(t1[:3], [0.75, 1.0, 0.75])
+    assert (t1[3:] < t0[3:]).all()
+
+
+# -----------------------------------------------------------------------------
+# Indici spaziali per il picking
+# -----------------------------------------------------------------------------
+def piu_vicino_forza_bruta(distanze: np.ndarray, raggio: float) -> float | None:
+    """Distanza minima entro `raggio` (NaN ignorati), o None."""
+    entro = distanze[distanze <= raggio]
+    return float(entro.min()) if len(entro) else None
+
+
+def controlla_indice_punti(indice: IndiceGriglia, xy: np.ndarray, identificativi: np.ndarray, rng) -> None:
+    for punto, raggio in zip(rng.uniform(-50, 650, (300, 2)), rng.choice([0.5, 4.0, 12.0, 40.0], 300)):
+        distanze = np.hypot(*(xy - punto).T)
+        attesa = piu_vicino_forza_bruta(distanze, raggio)
+        trovato = indice.piu_vicino(punto, raggio)
+        if attesa is None:
+            assert trovato is None
+            continue
+        identificativo, distanza = trovato
+        assert distanza == pytest.approx(attesa)
+        assert distanze[identificativi == identificativo][0] == pytest.approx(attesa)
+
+        trovati, distanze_trovate = indice.vicini(punto, raggio)
+        entro = distanze <= raggio
+        assert sorted(trovati.tolist()) == sorted(identificativi[entro].tolist())
+        np.testing.assert_allclose(np.sort(distanze_trovate), np.sort(distanze[entro]))
+
+
+def test_indice_griglia_coincide_con_la_forza_bruta():
+    rng = np.random.default_rng(7)
+    xy = rng.uniform(0, 600, (5_000, 2))
+    xy[:20] = xy[20:40] + 0.01  # punti quasi sovrapposti
+    xy[40:45] = np.nan          # punti non proiettabili: mai restituiti
+    identificativi = np.arange(len(xy)) + 100
+    indice = IndiceGriglia(xy, 8.0, identificativi)
+    assert len(indice) == len(xy) - 5
+    controlla_indice_punti(indice, xy, identificativi, rng)
+
+    # Aggiunte in coda (scandite linearmente) e oltre la soglia della coda (riordino completo)
+    for n in (7, 30, CoordCodeCore.CODA_MASSIMA_INDICE + 1):
+        nuovi = rng.uniform(-40, 640, (n, 2))
+        nuovi_id = np.arange(n) + identificativi.max() + 1
+        indice.estendi(nuovi, nuovi_id)
+        xy, identificativi = np.concatenate((xy, nuovi)), np.concatenate((identificativi, nuovi_id))
+        controlla_indice_punti(indice, xy, identificativi, rng)
+    assert len(indice.coda_xy) == 0
+
+
+def test_indice_griglia_vuoto():
+    indice = IndiceGriglia(np.empty((0, 2)), 8.0)
+    assert len(indice) == 0 and indice.piu_vicino((1.0, 1.0), 50.0) is None
+    indice.estendi([[3.0, 4.0]], [9])
+    assert indice.piu_vicino((0.0, 0.0), 5.0) == (9, 5.0)
+
+
+def distanze_segmenti(segmenti: np.ndarray, punto: np.ndarray) -> np.ndarray:
+    """Distanza di `punto` da ogni segmento per proiezione ortogonale (NaN per i segmenti non finiti)."""
+    a, d = segmenti[:, 0], segmenti[:, 1] - segmenti[:, 0]
+    lunghezze = np.einsum("ij,ij->i", d, d)
+    t = np.einsum("ij,ij->i", punto - a, d) / np.where(lunghezze > 0, lunghezze, 1.0)
+    return np.linalg.norm(a + np.clip(t, 0.0, 1.0)[:, None] * d - punto, axis=1)
+
+
+@pytest.mark.parametrize("riquadro", [None, (100.0, 100.0, 500.0, 400.0)])
+def test_indice_segmenti_coincide_con_la_forza_bruta(riquadro):
+    rng = np.random.default_rng(8)
+    a = rng.uniform(-200, 800, (400, 2))
+    segmenti = np.stack((a, a + rng.normal(0, 80, (400, 2))), axis=1)
+    segmenti[:5, 1] = segmenti[:5, 0]  # segmenti degeneri (un punto)
+    segmenti[5, 0] = np.nan
+    indice = IndiceSegmenti(segmenti[:300], 6.0, riquadro)
+    indice.estendi(segmenti[300:])
+    assert len(indice) == 400
+
+    # Con un riquadro le interrogazioni restano ad almeno `raggio` dal bordo: il punto più vicino
+    # di ogni segmento entro il raggio cade nella parte visibile
+    x0, y0, x1, y1 = riquadro or (-200.0, -200.0, 800.0, 800.0)
+    for raggio in (2.0, 10.0, 30.0):
+        for punto in rng.uniform((x0 + raggio, y0 + raggio), (x1 - raggio, y1 - raggio), (150, 2)):
+            distanze = distanze_segmenti(segmenti, punto)
+            attesa = piu_vicino_forza_bruta(distanze, raggio)
+            trovato = indice.piu_vicino(punto, raggio)
+            if attesa is None:
+                assert trovato is None
+            else:
+                assert trovato[1] == pytest.approx(attesa) and distanze[trovato[0]] == pytest.approx(attesa)
+
+
+# -----------------------------------------------------------------------------
+# Importazione di mesh e nuvole di punti
+# -----------------------------------------------------------------------------
+OBJ = b"""# quadrato e triangolo con riferimenti a texture/normali e indici negativi
+v 0 0 0
+v 1 0 0
+v 1 1 0
+v 0 1 0
+vt 0 0
+vn 0 0 1
+f 1/1/1 2/1/1 3/1/1 4/1/1
+v 0 0 1
+f -4//1 -3//1 -1//1
+l 4 5
+"""
+
+# Tetraedro con una proprietà in più per vertice, facce e un elemento edge
+VERTICI_PLY = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)]
+FACCE_PLY = [(0, 2, 1), (0, 1, 3), (1, 2, 3, 0)]
+SPIGOLI_PLY = [(2, 3)]
+
+
+def scrivi_ply(
+    percorso, formato: str, vertici=VERTICI_PLY, facce=FACCE_PLY, spigoli=SPIGOLI_PLY, conteggio: str = "uchar",
+    materiale: bool = False, proprieta_spigolo=("vertex1", "vertex2"),
+) -> None:
+    """PLY con proprietà red per vertice; con `materiale` ogni faccia ha un int prima della lista."""
+    intestazione = (
+        f"ply\nformat {formato} 1.0\ncomment di prova\n"
+        f"element vertex {len(vertici)}\nproperty float x\nproperty float y\nproperty float z\n"
+        "property uchar red\n"
+        f"element face {len(facce)}\n" + ("property int materiale\n" if materiale else "")
+        + f"property list {conteggio} int vertex_indices\n"
+        f"element edge {len(spigoli)}\n" + "".join(f"property int {nome}\n" for nome in proprieta_spigolo)
+        + "end_header\n"
+    ).encode()
+    prefisso = (7,) if materiale else ()
+    if formato == "ascii":
+        righe = [f"{x} {y} {z} 255" for x, y, z in vertici]
+        righe += [" ".join(map(str, prefisso + (len(faccia),) + tuple(faccia))) for faccia in facce]
+        righe += [f"{i} {j}" for i, j in spigoli]
+        dati = ("\n".join(righe) + "\n").encode()
+    else:
+        ordine = "<" if formato == "binary_little_endian" else ">"
+        tipo_conteggio = {"uchar": "B", "ushort": "H", "int": "i"}[conteggio]
+        dati = b"".join(struct.pack(ordine + "fffB", *vertice, 255) for vertice in vertici)
+        dati += b"".join(
+            struct.pack(f"{ordine}{'i' * len(prefisso)}{tipo_conteggio}{len(faccia)}i", *prefisso, len(faccia), *faccia)
+            for faccia in facce
+        )
+        dati += b"".join(struct.pack(ordine + "ii", *spigolo) for spigolo in spigoli)
+    percorso.write_bytes(intestazione + dati)
+
+
+@pytest.mark.parametrize("comprimi", [False, True])
+def test_leggi_obj(tmp_path, comprimi):
+    percorso = tmp_path / ("mesh.obj.gz" if comprimi else "mesh.obj")
+    percorso.write_bytes(gzip.compress(OBJ) if comprimi else OBJ)
+
+    punti, spigoli, facce = leggi_obj(str(percorso))
+    np.testing.assert_array_equal(punti.array, [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0, 0, 1]])
+    # Il quadrilatero è triangolato a ventaglio; gli spigoli sono i lati dei poligoni e la linea
+    assert sorted(map(tuple, spigoli.array.tolist())) == [(1, 2), (1, 4), (2, 3), (2, 5), (3, 4), (3, 5), (4, 5)]
+    assert facce.array.tolist() == [[1, 2, 3], [1, 3, 4], [2, 3, 5]]
+
+
+def test_leggi_obj_vertice_inesistente(tmp_path):
+    percorso = tmp_path / "errato.obj"
+    percorso.write_bytes(b"v 0 0 0\nv 1 0 0\nf 1 2 3\n")
+    with pytest.raises(ValueError):
+        leggi_obj(str(percorso))
+
+
+@pytest.mark.parametrize("formato", ["ascii", "binary_little_endian", "binary_big_endian"])
+def test_leggi_ply(tmp_path, formato):
+    percorso = tmp_path / "tetraedro.ply"
+    scrivi_ply(percorso, formato)
+
+    punti, spigoli, facce = leggi_ply(str(percorso))
+    np.testing.assert_array_equal(punti.array, VERTICI_PLY)
+    assert facce.array.tolist() == [[1, 3, 2], [1, 2, 4], [2, 3, 4], [2, 4, 1]]
+    assert sorted(map(tuple, spigoli.array.tolist())) == [(1, 2), (1, 3), (1, 4), (2, 3), (2, 4), (3, 4)]
+
+
+@pytest.mark.parametrize("conteggio, materiale", [("uchar", False), ("ushort", True), ("int", False)])
+def test_leggi_ply_binario_con_facce_miste(tmp_path, conteggio, materiale):
+    # Triangoli e quadrilateri alternati (anche pentagoni): ogni faccia ha lunghezza diversa dalla precedente
+    rng = np.random.default_rng(5)
+    vertici = [tuple(v) for v in rng.uniform(-1, 1, (60, 3)).astype(np.float32).tolist()]
+    facce = [tuple(rng.choice(60, 3 + k % 2 + (k % 7 == 0), replace=False).tolist()) for k in range(500)]
+    letti = {}
+    for formato in ("ascii", "binary_little_endian", "binary_big_endian"):
+        percorso = tmp_path / f"{formato}.ply"
+        scrivi_ply(percorso, formato, vertici, facce, [], conteggio, materiale)
+        letti[formato] = leggi_ply(str(percorso))
+
+    attese = [(f[0], f[k], f[k + 1]) for f in facce for k in range(1, len(f) - 1)]
+    for punti, spigoli, triangoli in letti.values():
+        np.testing.assert_array_equal(punti.array, vertici)
+        np.testing.assert_array_equal(triangoli.array - 1, attese)
+        np.testing.assert_array_equal(spigoli.array, letti["ascii"][1].array)
+
+
+def test_leggi_ply_troncato(tmp_path):
+    percorso = tmp_path / "troncato.ply"
+    scrivi_ply(percorso, "binary_little_endian")
+    percorso.write_bytes(percorso.read_bytes()[:-12])
+    with pytest.raises(ValueError):
+        leggi_ply(str(percorso))
+
+
+@pytest.mark.parametrize("formato", ["ascii", "binary_little_endian"])
+def test_leggi_ply_spigoli_senza_vertici(tmp_path, formato):
+    percorso = tmp_path / "spigoli_colorati.ply"
+    scrivi_ply(percorso, formato, proprieta_spigolo=("red", "green"))
+    with pytest.raises(ValueError, match="vertex1/vertex2"):
+        leggi_ply(str(percorso))
+
+
+@pytest.mark.parametrize("contenuto, atteso", [
+    (b"X Y Z\n1 2 3\n# commento\n4\t5\t6 0.5 0.5\n", [[1, 2, 3], [4, 5, 6]]),
+    (b"1.5,2,3,255\n4,5.25,6,0\n", [[1.5, 2, 3], [4, 5.25, 6]]),
+    (b"X;Y;Z\n1,5;2;3\n4;5,25;6\n", [[1.5, 2, 3], [4, 5.25, 6]]),
+])
+def test_leggi_xyz(tmp_path, contenuto, atteso):
+    percorso = tmp_path / "nuvola.xyz"
+    percorso.write_bytes(contenuto)
+    np.testing.assert_array_equal(leggi_xyz(str(percorso)).array, atteso)
+
+
+def test_leggi_mesh_inquadra_la_camera(tmp_path):
+    percorso = tmp_path / "mesh.obj"
+    percorso.write_bytes(OBJ)
+    camera = Camera(800.0, 320.0, 240.0)
+
+    scena = leggi_mesh(str(percorso), camera)
+    assert len(scena) == 5 and len(scena.facce) == 3
+    assert scena.camera.focale == camera.focale and scena.camera.traslazione != camera.traslazione
+    assert (scena.camera.profondita(scena.punti_3d.array) > 0).all()
+    with pytest.raises(ValueError):
+        leggi_mesh(str(percorso), camera, inquadra=False)
+    with pytest.raises(ValueError):
+        leggi_mesh(str(tmp_path / "mesh.stl"), camera)
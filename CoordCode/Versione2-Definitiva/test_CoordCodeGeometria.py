@@ -0,0 +1,152 @@
+# Test dei problemi inversi della proiezione (CoordCodeGeometria): calibrazione, PnP, triangolazione.
+# Eseguire con:  python -m pytest -q  (dalla cartella Versione2-Definitiva)
+
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from CoordCodeCore import Camera, Scena, scrivi_txt
+from CoordCodeGeometria import calibra, risolvi_pnp, triangola, triangola_viste
+
+ESEMPI = Path(__file__).parent / "Esempi"
+
+CAMERA_VERA = Camera(
+    900.0, 330.0, 250.0, rotazione=(8.0, -15.0, 4.0), traslazione=(0.3, -0.2, 6.0),
+    distorsione=(-0.05, 0.01, 0.0, 0.0, 0.0),
+)
+
+
+def corrispondenze(camera: Camera, n: int = 40, rumore: float = 0.0, seme: int = 0):
+    """Punti in un cubo attorno all'origine (davanti a `camera`) e le loro proiezioni, con rumore in pixel."""
+    rng = np.random.default_rng(seme)
+    punti = rng.uniform(-1.0, 1.0, (n, 3))
+    uv, valido = camera.proietta(punti)
+    assert valido.all()
+    return punti, uv + rng.normal(0.0, rumore, uv.shape)
+
+
+def confronta_camere(stimata: Camera, attesa: Camera, tolleranza: float) -> None:
+    np.testing.assert_allclose(
+        (stimata.focale, stimata.cx, stimata.cy), (attesa.focale, attesa.cx, attesa.cy), rtol=tolleranza
+    )
+    np.testing.assert_allclose(stimata.rotazione, attesa.rotazione, atol=100 * tolleranza)
+    np.testing.assert_allclose(stimata.traslazione, attesa.traslazione, atol=10 * tolleranza)
+
+
+# -----------------------------------------------------------------------------
+# Calibrazione (DLT + Levenberg–Marquardt)
+# -----------------------------------------------------------------------------
+def test_calibra_ritrova_la_camera():
+    punti, uv = corrispondenze(CAMERA_VERA)
+    risultato = calibra(punti, uv, camera_iniziale=Camera(1.0, 0.0, 0.0, distorsione=CAMERA_VERA.distorsione))
+    assert risultato.rms < 1e-6
+    confronta_camere(risultato.camera, CAMERA_VERA, 1e-6)
+
+
+def test_calibra_con_rumore():
+    punti, uv = corrispondenze(CAMERA_VERA, n=200, rumore=0.3)
+    risultato = calibra(punti, uv, camera_iniziale=Camera(1.0, 0.0, 0.0, distorsione=CAMERA_VERA.distorsione))
+    assert risultato.rms <= risultato.rms_lineare
+    assert risultato.rms == pytest.approx(0.3 * np.sqrt(2), rel=0.1)  # rumore di 0.3 px per coordinata
+    confronta_camere(risultato.camera, CAMERA_VERA, 1e-2)
+
+
+def test_calibra_solo_intrinseci_a_posa_nota():
+    punti, uv = corrispondenze(CAMERA_VERA, n=10)
+    iniziale = Camera(
+        500.0, 300.0, 200.0, rotazione=CAMERA_VERA.rotazione, traslazione=CAMERA_VERA.traslazione,
+        distorsione=CAMERA_VERA.distorsione,
+    )
+    risultato = calibra(punti, uv, stima_posa=False, camera_iniziale=iniziale)
+    confronta_camere(risultato.camera, CAMERA_VERA, 1e-6)
+
+
+def test_calibra_corrispondenze_insufficienti():
+    punti, uv = corrispondenze(CAMERA_VERA, n=5)
+    with pytest.raises(ValueError):
+        calibra(punti, uv)
+
+
+# -----------------------------------------------------------------------------
+# Posa a intrinseci noti (PnP)
+# -----------------------------------------------------------------------------
+def test_pnp_senza_ransac_ritrova_la_posa():
+    punti, uv = corrispondenze(CAMERA_VERA)
+    iniziale = replace(CAMERA_VERA, rotazione=(0.0, 0.0, 0.0), traslazione=(0.0, 0.0, 0.0))
+    risultato = risolvi_pnp(punti, uv, iniziale, ransac=False)
+    assert risultato.consenso.all() and risultato.ipotesi == 0
+    confronta_camere(risultato.camera, CAMERA_VERA, 1e-6)
+
+
+@pytest.mark.parametrize("processi", [None, 2])
+def test_pnp_ransac_scarta_le_corrispondenze_errate(processi):
+    punti, uv = corrispondenze(CAMERA_VERA, n=100, rumore=0.2)
+    errate = np.arange(0, 100, 4)  # un quarto delle corrispondenze spostate di decine di pixel
+    uv[errate] += np.random.default_rng(1).uniform(30.0, 80.0, (len(errate), 2))
+    iniziale = replace(CAMERA_VERA, rotazione=(0.0, 0.0, 0.0), traslazione=(0.0, 0.0, 0.0))
+
+    risultato = risolvi_pnp(punti, uv, iniziale, processi=processi, seme=3)
+    atteso = np.ones(100, dtype=bool)
+    atteso[errate] = False
+    np.testing.assert_array_equal(risultato.consenso, atteso)
+    assert risultato.ipotesi > 0 and risultato.rms < 0.5
+    confronta_camere(risultato.camera, CAMERA_VERA, 1e-2)
+
+
+# -----------------------------------------------------------------------------
+# Triangolazione
+# -----------------------------------------------------------------------------
+VISTE = [
+    Camera(800.0, 320.0, 240.0, rotazione=(0.0, ry, 0.0), traslazione=(tx, 0.0, 6.0),
+           distorsione=(-0.08, 0.01, 0.0005, 0.0, 0.0))
+    for ry, tx in ((-12.0, 1.2), (0.0, 0.0), (15.0, -1.5))
+]
+
+
+def test_triangola_ritrova_i_punti():
+    punti = np.random.default_rng(2).uniform(-1.0, 1.0, (50, 3))
+    risultato = triangola(VISTE, [camera.proietta(punti)[0] for camera in VISTE])
+    assert risultato.valido.all()
+    np.testing.assert_allclose(risultato.punti_3d, punti, atol=1e-8)
+    assert risultato.rms.max() < 1e-6
+
+
+def test_triangola_parallasse_insufficiente():
+    # Due viste dallo stesso centro ottico: i raggi coincidono e la profondità non è determinata
+    punti = np.random.default_rng(2).uniform(-1.0, 1.0, (5, 3))
+    viste = [VISTE[1], replace(VISTE[1], focale=1000.0)]
+    risultato = triangola(viste, [camera.proietta(punti)[0] for camera in viste])
+    assert not risultato.valido.any()
+
+
+def test_triangola_viste_da_file(tmp_path):
+    punti = np.random.default_rng(4).uniform(-1.0, 1.0, (20, 3))
+    percorsi = []
+    for i, camera in enumerate(VISTE):
+        scena = Scena(camera)
+        scena.punti_3d.estendi(punti)
+        percorsi.append(str(tmp_path / f"vista_{i}.txt"))
+        scrivi_txt(scena, percorsi[-1])
+
+    risultato, camere, riferimento = triangola_viste(percorsi)
+    assert camere == VISTE
+    # Il .txt conserva 6 cifre significative: coordinate e (u,v) sono approssimati di conseguenza
+    np.testing.assert_allclose(riferimento, punti, atol=1e-6)
+    np.testing.assert_allclose(risultato.punti_3d, punti, atol=1e-4)
+
+
+def test_triangola_viste_esempio():
+    viste = [str(ESEMPI / "CuboVistaSinistra.txt"), str(ESEMPI / "CuboVistaDestra.txt")]
+    risultato, camere, riferimento = triangola_viste(viste)
+    assert camere[0].traslazione != camere[1].traslazione
+    assert risultato.valido.all() and risultato.rms.max() < 1e-3
+    np.testing.assert_allclose(risultato.punti_3d, riferimento, atol=1e-2)
+
+
+def test_triangola_viste_incompatibili():
+    with pytest.raises(ValueError):
+        triangola(VISTE[:1], [np.zeros((3, 2))])
+    with pytest.raises(ValueError):
+        triangola(VISTE[:2], [np.zeros((3, 2)), np.zeros((4, 2))])
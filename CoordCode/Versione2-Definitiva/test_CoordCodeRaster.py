@@ -0,0 +1,135 @@
+# Test della rasterizzazione (CoordCodeRaster): buffer di profondità, immagini e PNG.
+# Eseguire con:  python -m pytest -q  (dalla cartella Versione2-Definitiva)
+
+import itertools
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from CoordCodeCore import Camera, Scena
+from CoordCodeRaster import (
+    COLORE_SPIGOLI, PASSO_CAMPIONI, BufferProfondita, disegna, disegna_scena, salva_immagine, scrivi_png,
+)
+from CoordCodeSpigoli import inviluppo_convesso
+
+CAMERA = Camera(800.0, 320.0, 240.0)
+
+
+def cubo(centro=(0.0, 0.0, 5.0), lato: float = 1.0):
+    """Vertici (gli ultimi quattro sulla faccia posteriore, Z maggiore) e triangoli 0-based di un cubo."""
+    vertici = np.array(list(itertools.product((-0.5, 0.5), repeat=3)))[:, ::-1] * lato + centro
+    return vertici, inviluppo_convesso(vertici)
+
+
+def leggi_png(percorso) -> np.ndarray:
+    """Decodifica i PNG scritti da scrivi_png (8 bit, un solo IDAT, righe senza filtro)."""
+    dati = percorso.read_bytes()
+    assert dati[:8] == b"\x89PNG\r\n\x1a\n"
+    blocchi, posizione = {}, 8
+    while posizione < len(dati):
+        lunghezza_blocco, tipo = struct.unpack(">I4s", dati[posizione:posizione + 8])
+        contenuto = dati[posizione + 8:posizione + 8 + lunghezza_blocco]
+        (crc,) = struct.unpack(">I", dati[posizione + 8 + lunghezza_blocco:posizione + 12 + lunghezza_blocco])
+        assert crc == zlib.crc32(tipo + contenuto)
+        blocchi[tipo] = contenuto
+        posizione += 12 + lunghezza_blocco
+    assert b"IEND" in blocchi
+    larghezza, altezza, bit, tipo_colore = struct.unpack(">IIBB", blocchi[b"IHDR"][:10])
+    assert bit == 8
+    canali = {0: 1, 2: 3, 6: 4}[tipo_colore]
+    righe = np.frombuffer(zlib.decompress(blocchi[b"IDAT"]), dtype=np.uint8).reshape(altezza, -1)
+    assert (righe[:, 0] == 0).all()
+    return righe[:, 1:].reshape((altezza, larghezza, canali)[:2 if canali == 1 else 3])
+
+
+def lunghezza(tratti: np.ndarray) -> float:
+    return float(np.linalg.norm(tratti[:, 1] - tratti[:, 0], axis=1).sum())
+
+
+# -----------------------------------------------------------------------------
+# Buffer di profondità
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("risoluzione", [64, 1024])
+def test_cubo_di_fronte_nasconde_la_faccia_posteriore(risoluzione):
+    vertici, triangoli = cubo()
+    uv, _ = CAMERA.proietta(vertici)
+    buffer = BufferProfondita(uv, CAMERA.profondita(vertici), triangoli, risoluzione)
+    assert buffer.punti_visibili().tolist() == [True] * 4 + [False] * 4
+
+    anteriori = np.array([(0, 1), (1, 3), (3, 2), (2, 0)])
+    visibili = buffer.segmenti_visibili(anteriori)
+    assert lunghezza(visibili) == pytest.approx(lunghezza(uv[anteriori]), rel=1e-9)
+    assert lunghezza(buffer.segmenti_visibili(anteriori + 4)) == 0.0
+    # Gli spigoli laterali vanno verso il fondo dietro la faccia anteriore: visibile al più il primo campione
+    laterali = buffer.segmenti_visibili([(i, i + 4) for i in range(4)])
+    assert len(laterali) <= 4
+    assert (np.linalg.norm(laterali[:, 1] - laterali[:, 0], axis=1) <= PASSO_CAMPIONI / buffer.scala + 1e-9).all()
+
+
+def test_punti_davanti_e_fuori_dalla_superficie_restano_visibili():
+    vertici, triangoli = cubo()
+    extra = np.array([[0.0, 0.0, 3.0], [0.0, 0.0, 9.0], [3.0, 0.0, 9.0], [0.0, 0.0, -1.0]])
+    punti = np.vstack((vertici, extra))
+    uv, _ = CAMERA.proietta(punti)
+    visibili = BufferProfondita(uv, CAMERA.profondita(punti), triangoli).punti_visibili()
+    # Davanti al cubo, dietro al cubo, dietro ma fuori dal suo contorno, dietro la camera
+    assert visibili[8:].tolist() == [True, False, True, False]
+
+
+def test_senza_facce_nulla_e_nascosto():
+    vertici, _ = cubo()
+    uv, _ = CAMERA.proietta(vertici)
+    buffer = BufferProfondita(uv, CAMERA.profondita(vertici), np.empty((0, 3), dtype=np.int64))
+    assert buffer.punti_visibili().all()
+    coppie = np.array([(0, 7), (1, 6)])
+    assert lunghezza(buffer.segmenti_visibili(coppie)) == pytest.approx(lunghezza(uv[coppie]))
+
+
+# -----------------------------------------------------------------------------
+# Immagini e PNG
+# -----------------------------------------------------------------------------
+def test_copertura_antialias_di_un_segmento():
+    # Segmento orizzontale al centro della riga 5, spesso 1.5 px: riga piena e un quarto sopra e sotto
+    uv = np.array([[2.0, 5.5], [18.0, 5.5]])
+    immagine = disegna(uv, [(0, 1)], 20, 10, raggio_punti=0.0)
+    assert immagine[3:8, 10, 1].tolist() == [255, 201, 39, 201, 255]
+    assert immagine[5, 10].tolist() == list(COLORE_SPIGOLI)
+    netta = disegna(uv, [(0, 1)], 20, 10, raggio_punti=0.0, antialias=False)
+    assert netta[3:8, 10, 1].tolist() == [255, 255, 39, 255, 255]
+
+
+def test_segmenti_oltre_i_bordi_sono_ritagliati():
+    immagine = disegna(np.array([[-50.0, 5.5], [500.0, 5.5], [np.nan, 0.0]]), [(0, 1), (1, 2)], 20, 10, raggio_punti=0.0)
+    assert (immagine[5, :, 1] == COLORE_SPIGOLI[1]).all()
+    assert (immagine[[0, 1, 2, 8, 9]] == 255).all()
+
+
+@pytest.mark.parametrize("forma", [(7, 5), (7, 5, 3), (7, 5, 4)])
+def test_png_andata_e_ritorno(tmp_path, forma):
+    immagine = np.random.default_rng(0).integers(0, 256, forma, dtype=np.uint8)
+    percorso = tmp_path / "immagine.png"
+    scrivi_png(str(percorso), immagine)
+    np.testing.assert_array_equal(leggi_png(percorso), immagine)
+
+
+def test_png_forma_non_supportata(tmp_path):
+    with pytest.raises(ValueError):
+        scrivi_png(str(tmp_path / "errata.png"), np.zeros((4, 4, 2), dtype=np.uint8))
+
+
+def test_salva_immagine_della_scena(tmp_path):
+    scena = Scena(CAMERA)
+    vertici, _ = cubo()
+    scena.punti_3d.estendi(vertici)
+    scena.aggiungi_spigolo(1, 2)
+    immagine = disegna_scena(scena)
+    assert immagine.shape == (480, 640, 3) and (immagine != 255).any()
+
+    salva_immagine(str(tmp_path / "scena.png"), immagine)
+    salva_immagine(str(tmp_path / "scena.npy"), immagine)
+    np.testing.assert_array_equal(leggi_png(tmp_path / "scena.png"), immagine)
+    np.testing.assert_array_equal(np.load(tmp_path / "scena.npy"), immagine)
+    with pytest.raises(ValueError):
+        salva_immagine(str(tmp_path / "scena.jpg"), immagine)
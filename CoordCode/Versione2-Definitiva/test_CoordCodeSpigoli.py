@@ -0,0 +1,86 @@
+# Test della generazione automatica degli spigoli (CoordCodeSpigoli): kNN, raggio, inviluppo convesso.
+# Eseguire con:  python -m pytest -q  (dalla cartella Versione2-Definitiva)
+
+import itertools
+
+import numpy as np
+import pytest
+
+from CoordCodeSpigoli import inviluppo_convesso, spigoli_inviluppo, spigoli_knn, spigoli_raggio, vicini_piu_prossimi
+
+
+def nuvola(n: int = 400, seme: int = 0) -> np.ndarray:
+    """Nuvola non uniforme: un ammasso denso, uno rado e qualche punto isolato lontano."""
+    rng = np.random.default_rng(seme)
+    return np.vstack((
+        rng.normal(0.0, 0.05, (n // 2, 3)),
+        rng.uniform(-3.0, 3.0, (n // 2 - 3, 3)),
+        [[40.0, 0.0, 0.0], [0.0, -55.0, 10.0], [0.0, 0.0, 90.0]],
+    ))
+
+
+def distanze_complete(punti: np.ndarray) -> np.ndarray:
+    d = np.linalg.norm(punti[:, None, :] - punti[None, :, :], axis=2)
+    np.fill_diagonal(d, np.inf)
+    return d
+
+
+# -----------------------------------------------------------------------------
+# Vicini più prossimi e grafo di raggio (confronto con la forza bruta)
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("k", [1, 6])
+def test_vicini_coincidono_con_la_forza_bruta(k):
+    punti = nuvola()
+    indici, distanze = vicini_piu_prossimi(punti, k)
+    attese = np.sort(distanze_complete(punti), axis=1)[:, :k]
+    np.testing.assert_allclose(distanze, attese)
+    np.testing.assert_allclose(np.linalg.norm(punti[indici] - punti[:, None, :], axis=2), attese)
+
+
+def test_spigoli_knn_senza_duplicati():
+    punti = nuvola(100)
+    coppie = spigoli_knn(punti, 3)
+    assert (coppie[:, 0] < coppie[:, 1]).all()
+    assert len(np.unique(coppie, axis=0)) == len(coppie)
+    indici, _ = vicini_piu_prossimi(punti, 3)
+    attese = {tuple(sorted((i, int(j)))) for i, riga in enumerate(indici) for j in riga}
+    assert set(map(tuple, coppie.tolist())) == attese
+
+
+def test_spigoli_raggio_coincidono_con_la_forza_bruta():
+    punti = nuvola()
+    coppie = spigoli_raggio(punti, 0.4)
+    i, j = np.nonzero(np.triu(distanze_complete(punti) <= 0.4))
+    np.testing.assert_array_equal(coppie, np.column_stack((i, j)))
+
+
+def test_spigoli_raggio_limiti():
+    with pytest.raises(ValueError):
+        spigoli_raggio(nuvola(), 0.0)
+    with pytest.raises(ValueError):
+        spigoli_raggio(nuvola(), 10.0, massimo_spigoli=100)
+
+
+# -----------------------------------------------------------------------------
+# Inviluppo convesso
+# -----------------------------------------------------------------------------
+def test_inviluppo_contiene_tutti_i_punti():
+    punti = np.random.default_rng(1).normal(size=(500, 3))
+    facce = inviluppo_convesso(punti)
+    a, b, c = punti[facce[:, 0]], punti[facce[:, 1]], punti[facce[:, 2]]
+    normali = np.cross(b - a, c - a)
+    # Normali verso l'esterno: ogni punto sta dal lato interno (o sul piano) di ogni faccia
+    assert (np.einsum("fk,nk->fn", normali, punti) - np.einsum("fk,fk->f", normali, a)[:, None] <= 1e-9).all()
+    # Superficie chiusa: ogni spigolo orientato compare una volta in ciascun verso
+    orientati = facce[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    assert len(set(map(tuple, orientati.tolist()))) == len(orientati)
+    assert set(map(tuple, orientati.tolist())) == set(map(tuple, orientati[:, ::-1].tolist()))
+
+
+def test_spigoli_inviluppo_del_cubo():
+    vertici = np.array(list(itertools.product((0.0, 1.0), repeat=3)))
+    interni = np.random.default_rng(2).uniform(0.1, 0.9, (50, 3))
+    coppie = spigoli_inviluppo(np.vstack((vertici, interni)))
+    # I 12 spigoli del cubo: vertici che differiscono in una sola coordinata, senza diagonali delle facce
+    attese = [(i, j) for i, j in itertools.combinations(range(8), 2) if np.abs(vertici[i] - vertici[j]).sum() == 1]
+    assert sorted(map(tuple, coppie.tolist())) == attese